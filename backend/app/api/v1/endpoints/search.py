@@ -1,15 +1,34 @@
-from typing import List
-from fastapi import APIRouter, Query, Depends
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Query, Depends, HTTPException, Response
+from pydantic import TypeAdapter
 from app.dependencies.jwt import get_current_mechanic_id_from_cookie
 
+from app.search.circuit_breaker import CircuitOpenError
 from app.services.search_engine_service import search_service
-from app.schemas.search import SearchResult
+from app.schemas.search import MultiSearchRequest, SearchPage, SearchResult, SearchSuggestion
 
 router = APIRouter()
 
+# The endpoints below return their results as JSON bytes serialized by pydantic-core.
+# Returning a Response skips FastAPI's response_model handling, which would validate the
+# results again and encode them through the json module; response_model still documents
+# the shape.
+_SEARCH_RESULTS = TypeAdapter(List[SearchResult])
+_SUGGESTIONS = TypeAdapter(List[SearchSuggestion])
+_SEARCH_PAGES = TypeAdapter(List[SearchPage])
+
+
+def _json_response(adapter: TypeAdapter, value, headers: Optional[dict] = None) -> Response:
+    return Response(content=adapter.dump_json(value), media_type="application/json", headers=headers)
+
+
 @router.get("/", response_model=List[SearchResult])
-def perform_search(
+async def perform_search(
     q: str = Query(..., description="The search query string."),
+    size: int = Query(10, ge=1, le=50, description="Number of results per page."),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page."),
+    doc_type: Optional[Literal["client", "vehicle"]] = Query(None, alias="type", description="Only return this type."),
+    hydrate: bool = Query(False, description="Include the full client/vehicle record in each result."),
     mechanic_id: int = Depends(get_current_mechanic_id_from_cookie)
 ):
     """
@@ -17,6 +36,57 @@ def perform_search(
     - Fuzzy matching is enabled for typo tolerance.
     - Searches across client names, phone numbers, vehicle makes, models, and VINs.
     - Results are filtered by mechanic_id for multi-tenancy.
+    - When more results exist, the X-Next-Cursor response header holds the cursor for the next page.
+    - The first page also has an X-Type-Counts header with the number of matches per type, e.g. "client=3,vehicle=12".
+    - With hydrate=true, results carry the details otherwise fetched with GET /clients/{id} or /vehicles/{id}.
+    """
+    try:
+        page = await search_service.search(q, mechanic_id, size=size, cursor=cursor, doc_type=doc_type, hydrate=hydrate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CircuitOpenError:
+        raise HTTPException(status_code=503, detail="Search is temporarily unavailable")
+    headers = {}
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    if page.type_counts is not None:
+        headers["X-Type-Counts"] = ",".join(f"{name}={count}" for name, count in page.type_counts.items())
+    return _json_response(_SEARCH_RESULTS, page.results, headers)
+
+@router.get("/suggest", response_model=List[SearchSuggestion])
+async def suggest(
+    q: str = Query(..., description="The text typed so far."),
+    size: int = Query(5, ge=1, le=20, description="Number of suggestions."),
+    doc_type: Optional[Literal["client", "vehicle"]] = Query(None, alias="type", description="Only suggest this type."),
+    mechanic_id: int = Depends(get_current_mechanic_id_from_cookie)
+):
+    """
+    Typeahead suggestions for the search box.
+    - Matches the query as a prefix of client names, vehicle makes/models, phone numbers and VINs.
+    - No typo tolerance; use the main search endpoint for an explicit search.
+    - Results are filtered by mechanic_id for multi-tenancy.
+    """
+    try:
+        suggestions = await search_service.suggest(q, mechanic_id, size=size, doc_type=doc_type)
+    except CircuitOpenError:
+        raise HTTPException(status_code=503, detail="Search is temporarily unavailable")
+    return _json_response(_SUGGESTIONS, suggestions)
+
+@router.post("/multi", response_model=List[SearchPage])
+async def multi_search(
+    request: MultiSearchRequest,
+    mechanic_id: int = Depends(get_current_mechanic_id_from_cookie)
+):
+    """
+    Runs several searches and typeahead lookups in one request, e.g. the client and vehicle lists of a screen.
+    - Each query has its own kind ("search" or "suggest"), q, size, type and cursor.
+    - Everything goes to Elasticsearch in one round trip; cached answers are not sent again.
+    - Returns one page per query, in order; suggest pages hold suggestions and no cursor.
     """
-    results = search_service.search(q, mechanic_id)
-    return results
+    try:
+        pages = await search_service.multi_search(request.queries, mechanic_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CircuitOpenError:
+        raise HTTPException(status_code=503, detail="Search is temporarily unavailable")
+    return _json_response(_SEARCH_PAGES, pages)
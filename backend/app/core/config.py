@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -22,6 +24,47 @@ class Settings(BaseSettings):
     MAIL_STARTTLS: bool
     MAIL_SSL_TLS: bool
 
+    # Pooled connections per Elasticsearch node for the async search client
+    ELASTIC_ASYNC_CONNECTIONS_PER_NODE: int = 25
+
+    # Search outbox dispatcher
+    SEARCH_OUTBOX_BATCH_SIZE: int = 500
+    SEARCH_OUTBOX_POLL_INTERVAL: float = 1.0  # seconds between polls when idle
+    SEARCH_OUTBOX_MAX_ATTEMPTS: int = 10
+
+    # Micro-batching of search writes: a _bulk request goes out after this window or
+    # once this many operations are waiting
+    SEARCH_BULK_FLUSH_INTERVAL: float = 0.05  # seconds
+    SEARCH_BULK_MAX_OPERATIONS: int = 500
+    SEARCH_BULK_MAX_PENDING: int = 10000  # writers block beyond this many buffered operations
+    SEARCH_BULK_ENQUEUE_TIMEOUT: float = 5.0  # seconds a writer blocks before giving up
+
+    # Per-mechanic search result cache
+    SEARCH_CACHE_MAX_ENTRIES: int = 10000
+    SEARCH_CACHE_TTL: float = 30.0  # seconds; also bounds staleness across worker processes
+
+    # In-process search used while Elasticsearch is unavailable
+    SEARCH_FALLBACK_MAX_DOCUMENTS: int = 50000
+    SEARCH_FALLBACK_TTL: float = 300.0  # seconds before a mechanic's documents are reloaded
+
+    # DB-to-Elasticsearch drift check (also runnable as scripts/check_drift.py)
+    SEARCH_DRIFT_CHECK_INTERVAL: float = 0.0  # seconds between periodic checks; 0 disables them
+    SEARCH_DRIFT_CHUNK_SIZE: int = 1000
+
+    # Latency budget and circuit breaker for Elasticsearch calls
+    SEARCH_REQUEST_TIMEOUT: float = 2.0  # seconds the client waits for a search or suggest
+    SEARCH_ES_TIMEOUT: str = "1500ms"  # Elasticsearch returns partial results after this
+    SEARCH_TERMINATE_AFTER: int = 10000  # documents collected per shard before a search stops early
+    SEARCH_WRITE_TIMEOUT: float = 10.0  # seconds the client waits for a _bulk or count request
+    SEARCH_BREAKER_FAILURE_THRESHOLD: int = 5  # consecutive failures that open the circuit
+    SEARCH_BREAKER_RESET_TIMEOUT: float = 30.0  # seconds before a probe request is let through
+    SEARCH_BREAKER_OPEN_MODE: Literal["fallback", "fail_fast"] = "fallback"  # "fallback" serves the fallback index, "fail_fast" errors
+
+    # Cheaper query plans while Elasticsearch is under pressure
+    SEARCH_DEGRADE_LATENCY: float = 0.3  # seconds of average search latency that count as pressure
+    SEARCH_DEGRADE_IN_FLIGHT: int = 50  # concurrent searches that count as pressure
+    SEARCH_DEGRADE_COOLDOWN: float = 10.0  # seconds between steps back to the full plan
+
     class Config:
         env_file = ".env"
 
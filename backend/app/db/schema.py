@@ -0,0 +1,26 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+# Tables that got an `updated_at` column for the incremental search re-index
+UPDATED_AT_TABLES = ("clients", "vehicles", "repairs")
+
+
+def add_missing_columns(engine: Engine) -> None:
+    """
+    Adds `updated_at` to tables created before the column existed; `create_all` only
+    creates missing tables. Runs on startup and does nothing once the columns are there.
+
+    Existing rows keep NULL until they are next updated, which the first incremental
+    re-index does not mind since it sends everything.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in UPDATED_AT_TABLES:
+            if not inspector.has_table(table):
+                continue
+            if any(column["name"] == "updated_at" for column in inspector.get_columns(table)):
+                continue
+            # IF NOT EXISTS covers another worker adding it first (PostgreSQL; SQLite lacks it)
+            if_not_exists = "IF NOT EXISTS " if connection.dialect.name == "postgresql" else ""
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {if_not_exists}updated_at TIMESTAMP"))
+            connection.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table}_updated_at ON {table} (updated_at)"))
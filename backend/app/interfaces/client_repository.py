@@ -22,6 +22,10 @@ class IClientRepository(ABC):
     def get_client_by_pesel(self, pesel: str, mechanic_id: int = None) -> Optional[Clients]:
         pass
 
+    @abstractmethod
+    def get_clients_by_ids(self, client_ids: list[int], mechanic_id: int) -> list[Clients]:
+        pass
+
     @abstractmethod
     def get_client_by_name_and_last_name(self, name: str, last_name: str, mechanic_id: int = None) -> Optional[Clients]:
         pass
@@ -31,7 +35,7 @@ class IClientRepository(ABC):
         pass
 
     @abstractmethod
-    def delete_client(self, client_id: int, mechanic_id: int) -> bool:
+    def delete_client(self, client_id: int, mechanic_id: int) -> Optional[list[int]]:
         pass
     
     @abstractmethod
@@ -16,6 +16,10 @@ class IVehicleRepository(ABC):
     def get_vehicle_by_id(self, vehicle_id: int, mechanic_id: int = None) -> Optional[Vehicles]:
         pass
 
+    @abstractmethod
+    def get_vehicles_by_ids(self, vehicle_ids: List[int], mechanic_id: int) -> List[Vehicles]:
+        pass
+
     @abstractmethod
     def get_recently_viewed_vehicles(self, limit: int, page: int, mechanic_id: int = None) -> List[Vehicles]:
         pass
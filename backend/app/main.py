@@ -2,11 +2,14 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.api_router import api_router
 from app.db.base import Base
+from app.db.schema import add_missing_columns
 from app.db.session import engine
+from app.search.client import close_async_es_client
 from app.services.search_engine_service import search_service
 from prometheus_fastapi_instrumentator import Instrumentator
 
 import app.models  # noqa
+import app.search.outbox  # noqa  (registers the search outbox session listeners)
 
 app = FastAPI()
 app.include_router(api_router, prefix="/api/v1")
@@ -23,6 +26,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Type-Counts"],
 )
 
 Instrumentator().instrument(app).expose(app)
@@ -30,4 +34,16 @@ Instrumentator().instrument(app).expose(app)
 @app.on_event("startup")
 def on_startup():
     Base.metadata.create_all(bind=engine)
-    search_service.create_index_if_not_exists()
+    # create_all leaves existing tables alone, so columns added since are put in here
+    add_missing_columns(engine)
+    # Creating the index is left to the outbox dispatcher so startup does not wait on Elasticsearch
+    search_service.start_bulk_buffer()
+    search_service.start_outbox_dispatcher()
+    search_service.start_drift_check()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    search_service.stop_outbox_dispatcher()
+    search_service.stop_drift_check()
+    search_service.stop_bulk_buffer()
+    await close_async_es_client()
@@ -3,3 +3,5 @@ from .repairs import Repairs as Repairs
 from .clients import Clients as Clients
 from .mechanics import Mechanics as Mechanics
 from .password_reset_tokens import PasswordResetTokens as PasswordResetTokens
+from .search_outbox import SearchOutbox as SearchOutbox
+from .search_sync_checkpoint import SearchSyncCheckpoint as SearchSyncCheckpoint
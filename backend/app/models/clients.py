@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, UniqueConstraint
 from sqlalchemy.orm import relationship
+from datetime import datetime
 
 from app.db.base import Base
 from app.core.security import EncryptedType
@@ -12,6 +13,7 @@ class Clients(Base):
     phone: str = Column(String, index=True, nullable=True)
     pesel: str = Column(EncryptedType, nullable=True)
     mechanic_id = Column(Integer, ForeignKey("mechanics.id"), nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Drives incremental re-index
 
     #Reletionship
     mechanic = relationship("Mechanics", back_populates="clients")
@@ -1,5 +1,6 @@
 from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float
 from sqlalchemy.orm import relationship
+from datetime import datetime
 
 from app.db.base import Base
 
@@ -13,6 +14,7 @@ class Repairs(Base):
     repair_date = Column(DateTime, nullable=False)
     last_seen = Column(DateTime)        # To sort by an earlier date
     vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Drives incremental re-index
 
     #Reletionship
     vehicle = relationship("Vehicles", back_populates="repairs")
\ No newline at end of file
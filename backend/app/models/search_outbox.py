@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+from app.db.base import Base
+
+class SearchOutbox(Base):
+    """
+    A client or vehicle whose search document must be re-synced with Elasticsearch.
+
+    Rows are written in the same transaction as the entity change and drained by the
+    outbox dispatcher, so a committed change is never lost when Elasticsearch is down.
+    """
+    __tablename__ = "search_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity_type = Column(String(16), nullable=False)  # 'client' or 'vehicle'
+    entity_id = Column(Integer, nullable=False)
+    mechanic_id = Column(Integer, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    available_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)  # Retry backoff
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from app.db.base import Base
+
+class SearchSyncCheckpoint(Base):
+    """
+    Progress of the incremental search re-index (scripts/reindex.py --incremental).
+
+    Rows changed up to `synced_until` are in Elasticsearch. While a run is in progress,
+    `window_end` is the upper bound it works towards and `resume_type`/`resume_id` the
+    last document it finished, so a crashed run continues where it stopped.
+    """
+    __tablename__ = "search_sync_checkpoints"
+
+    name = Column(String(64), primary_key=True)  # 'incremental' or 'incremental:mechanic-<id>'
+    synced_until = Column(DateTime, nullable=True)
+    window_end = Column(DateTime, nullable=True)
+    resume_type = Column(String(16), nullable=True)  # 'client' or 'vehicle'
+    resume_id = Column(Integer, nullable=True)
@@ -1,5 +1,6 @@
 from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, UniqueConstraint, Float
 from sqlalchemy.orm import relationship
+from datetime import datetime
 
 from app.db.base import Base
 from app.core.security import EncryptedType
@@ -18,6 +19,7 @@ class Vehicles(Base):
     last_view_data = Column(DateTime)
     client_id: int = Column(Integer, ForeignKey("clients.id"), nullable=False)
     mechanic_id: int = Column(Integer, ForeignKey("mechanics.id"), nullable=False)  
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Drives incremental re-index
 
     #Reletionship
     repairs = relationship("Repairs", back_populates="vehicle", cascade="all, delete-orphan")
@@ -53,17 +53,30 @@ class ClientRepository(IClientRepository):
         self.db.refresh(client)
         return client
 
-    def delete_client(self, client_id: int, mechanic_id: int) -> bool:
+    def delete_client(self, client_id: int, mechanic_id: int) -> Optional[list[int]]:
+        """
+        Deletes the client; returns the ids of the vehicles deleted with them,
+        or None if the client does not exist.
+        """
         # With cascade="all, delete-orphan" in the model, deleting the client
         # will automatically delete all associated vehicles and their repairs
         client = self.get_client_by_id(client_id, mechanic_id)
         if not client:
-            return False
-        
+            return None
+        vehicle_ids = [vehicle.id for vehicle in client.vehicles]
+
         # Use ORM delete to trigger cascade delete
         self.db.delete(client)
         self.db.commit()
-        return True
+        return vehicle_ids
+
+    def get_clients_by_ids(self, client_ids: list[int], mechanic_id: int) -> list[Clients]:
+        """
+        Loads several clients of a mechanic with one IN query, in no particular order.
+        """
+        if not client_ids:
+            return []
+        return self.db.query(Clients).filter(Clients.id.in_(client_ids), Clients.mechanic_id == mechanic_id).all()
 
     def get_client_by_name_and_last_name(self, name: str, last_name: str, mechanic_id: int = None) -> Optional[Clients]:
         # Case-insensitive search for duplicate checking
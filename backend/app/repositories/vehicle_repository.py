@@ -17,6 +17,9 @@ class VehicleRepository(IVehicleRepository):
 
     def update_last_view_column_in_vehicles(self, vehicle: Vehicles) -> None:
         vehicle.last_view_data = datetime.utcnow()
+        # Assigning the column itself keeps `onupdate` from bumping updated_at, so a view
+        # does not make the incremental re-index send the vehicle again
+        vehicle.updated_at = Vehicles.updated_at
         self.db.commit()
         self.db.refresh(vehicle)
 
@@ -56,6 +59,20 @@ class VehicleRepository(IVehicleRepository):
             query = query.join(Clients).filter(Clients.mechanic_id == mechanic_id)
         return query.first()
 
+    def get_vehicles_by_ids(self, vehicle_ids: List[int], mechanic_id: int) -> List[Vehicles]:
+        """
+        Loads several vehicles of a mechanic, with their clients, with one IN query,
+        in no particular order.
+        """
+        if not vehicle_ids:
+            return []
+        return (
+            self.db.query(Vehicles)
+            .options(joinedload(Vehicles.client))
+            .filter(Vehicles.id.in_(vehicle_ids), Vehicles.mechanic_id == mechanic_id)
+            .all()
+        )
+
     def get_recently_viewed_vehicles(self, limit: int, page: int, mechanic_id: int = None) -> List[Vehicles]:
         query = self.db.query(Vehicles)
         if mechanic_id is not None:
@@ -1,5 +1,8 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, conint, conlist
+from typing import Literal, Optional
+
+from app.schemas.client import ClientExtendedInfo
+from app.schemas.vehicle import VehicleExtendedInfo
 
 class ElasticSearchEntry(BaseModel):
     id: int
@@ -14,6 +17,7 @@ class ElasticSearchEntry(BaseModel):
     vin: Optional[str] = None
     mark: Optional[str] = None
     model: Optional[str] = None
+    registration_number: Optional[str] = None
     
     # Client info for vehicles
     client_id: Optional[int] = None
@@ -35,11 +39,43 @@ class SearchResult(BaseModel):
     mark: Optional[str] = None
     model: Optional[str] = None
     vin: Optional[str] = None
+    registration_number: Optional[str] = None
     
     # Client info for vehicles
     client_id: Optional[int] = None
     client_name: Optional[str] = None
     client_last_name: Optional[str] = None
+
+    # Full database record, only with hydrate=true
+    client: Optional[ClientExtendedInfo] = None
+    vehicle: Optional[VehicleExtendedInfo] = None
     
     class Config:
         from_attributes = True
+
+class SearchSuggestion(BaseModel):
+    id: int
+    type: str  # 'client' or 'vehicle'
+    name: Optional[str] = None
+    phone: Optional[str] = None
+    vin: Optional[str] = None
+
+class SearchPage(BaseModel):
+    results: list[SearchResult]
+    # Opaque search_after cursor for the next page; None on the last page
+    next_cursor: Optional[str] = None
+    # Matches per type ("client"/"vehicle") regardless of the type filter; first page only
+    type_counts: Optional[dict[str, int]] = None
+
+class SearchQuery(BaseModel):
+    # "search" for ranked results like GET /search, "suggest" for typeahead like GET /search/suggest
+    kind: Literal["search", "suggest"] = "search"
+    q: str
+    # Defaults to 10 results or 5 suggestions; suggestions are capped at 20
+    size: Optional[conint(ge=1, le=50)] = None
+    # Searches only: X-Next-Cursor / next_cursor of the previous page
+    cursor: Optional[str] = None
+    type: Optional[Literal["client", "vehicle"]] = None
+
+class MultiSearchRequest(BaseModel):
+    queries: conlist(SearchQuery, min_length=1, max_length=10)
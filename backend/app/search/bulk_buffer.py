@@ -0,0 +1,143 @@
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Hashable
+
+from app.search.metrics import BULK_BUFFER_PENDING, BULK_FLUSHES, BULK_OPERATIONS
+
+logger = logging.getLogger(__name__)
+
+
+def coalesce(actions: list[dict]) -> list[dict]:
+    """
+    Keeps only the last action per (index, id): a document written and then deleted
+    within one window only needs the delete. Actions without an `_index` are keyed by
+    id alone, their indices are picked when they are sent.
+    """
+    latest = {}
+    for action in actions:
+        key = (action.get("_index"), action["_id"])
+        latest.pop(key, None)
+        latest[key] = action
+    return list(latest.values())
+
+
+class BulkBuffer:
+    """
+    Collects `_bulk` actions from request threads and sends them in batches.
+
+    A batch is sent `flush_interval` seconds after its first action arrives, or as soon as
+    `max_operations` actions are waiting, whichever comes first. `add` blocks while
+    `max_pending` actions are waiting, so producers slow down to what Elasticsearch takes
+    instead of growing the queue; after `timeout` seconds it raises queue.Full.
+
+    `send(actions, tenants)` gets the coalesced actions and the tenant keys that were
+    passed to `add` with them, on the flusher thread. It must not raise for failed
+    items; an exception drops the batch (the drift check repairs what was lost).
+    """
+
+    def __init__(self, send: Callable[[list[dict], set[Hashable]], None], max_operations: int,
+                 flush_interval: float, max_pending: int, clock: Callable[[], float] = time.monotonic):
+        self._send = send
+        self._max_operations = max_operations
+        self._flush_interval = flush_interval
+        self._max_pending = max(max_pending, max_operations)
+        self._clock = clock
+        self._condition = threading.Condition()
+        self._actions: list[dict] = []
+        self._tenants: set[Hashable] = set()
+        self._first_added_at: float | None = None
+        # Serializes sends between the flusher thread and explicit flushes
+        self._send_lock = threading.Lock()
+        self._stop = False
+        self._thread: threading.Thread | None = None
+
+    def add(self, actions: list[dict], tenant: Hashable, timeout: float | None = None) -> None:
+        if not actions:
+            return
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: len(self._actions) + len(actions) <= self._max_pending or not self._actions, timeout
+            ):
+                raise queue.Full(f"{len(self._actions)} search index operations are already waiting")
+            if not self._actions:
+                self._first_added_at = self._clock()
+            self._actions += actions
+            self._tenants.add(tenant)
+            BULK_BUFFER_PENDING.set(len(self._actions))
+            self._condition.notify_all()
+
+    def flush(self) -> int:
+        """
+        Sends everything that is waiting now; returns the number of actions sent.
+        """
+        sent = 0
+        while True:
+            with self._condition:
+                actions, tenants = self._take()
+            if not actions:
+                return sent
+            sent += self._send_batch(actions, tenants)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="search-bulk-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stops the flusher thread and sends what is still waiting.
+        """
+        with self._condition:
+            self._stop = True
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._actions or self._stop)
+                if self._stop:
+                    return
+                # Wait out the window unless the batch fills up first
+                deadline = self._first_added_at + self._flush_interval
+                self._condition.wait_for(
+                    lambda: len(self._actions) >= self._max_operations or self._stop,
+                    max(0.0, deadline - self._clock()),
+                )
+                if self._stop:
+                    return
+                actions, tenants = self._take()
+            self._send_batch(actions, tenants)
+
+    def _take(self) -> tuple[list[dict], set[Hashable]]:
+        actions, self._actions = self._actions[:self._max_operations], self._actions[self._max_operations:]
+        tenants = self._tenants
+        if self._actions:
+            # The rest starts a new window; tenants stay flagged until it is sent too
+            self._first_added_at = self._clock()
+        else:
+            self._tenants = set()
+            self._first_added_at = None
+        BULK_BUFFER_PENDING.set(len(self._actions))
+        self._condition.notify_all()
+        return actions, set(tenants)
+
+    def _send_batch(self, actions: list[dict], tenants: set[Hashable]) -> int:
+        batch = coalesce(actions)
+        with self._send_lock:
+            try:
+                self._send(batch, tenants)
+            except Exception:
+                logger.exception("Dropping %d search index operations", len(batch))
+                BULK_FLUSHES.labels(result="error").inc()
+                return 0
+        BULK_FLUSHES.labels(result="ok").inc()
+        BULK_OPERATIONS.inc(len(batch))
+        return len(batch)
@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from app.search.metrics import CACHE_ENTRIES, CACHE_EVICTIONS, CACHE_HITS, CACHE_MISSES
+
+
+def normalize_query(query: str) -> str:
+    """
+    Collapses whitespace so trivially different keystrokes share a cache entry.
+
+    Case is kept because keyword fields such as `vin` and `phone` match case-sensitively.
+    """
+    return " ".join(query.split())
+
+
+class SearchResultCache:
+    """
+    Bounded LRU cache of search results with a TTL, partitioned by mechanic.
+
+    Writes for a mechanic invalidate all of that mechanic's entries. Each tenant has a
+    generation number: a result computed before an invalidation is not stored, and for
+    `settle_time` seconds after one nothing is stored, since Elasticsearch only shows the
+    write after its next refresh.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, settle_time: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._settle_time = settle_time
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (mechanic_id, key) -> (expires_at, value), least recently used first
+        self._entries: OrderedDict[tuple[int, Hashable], tuple[float, Any]] = OrderedDict()
+        self._tenant_keys: dict[int, set[Hashable]] = {}
+        self._generations: dict[int, int] = {}
+        self._invalidated_at: dict[int, float] = {}
+
+    def get(self, mechanic_id: int, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._entries.get((mechanic_id, key))
+            if entry is None:
+                CACHE_MISSES.inc()
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                self._remove(mechanic_id, key)
+                CACHE_EVICTIONS.labels(reason="expired").inc()
+                CACHE_MISSES.inc()
+                return None
+            self._entries.move_to_end((mechanic_id, key))
+            CACHE_HITS.inc()
+            return value
+
+    def generation(self, mechanic_id: int) -> int:
+        """
+        Token to take before running a search and hand back to `put`.
+        """
+        with self._lock:
+            return self._generations.get(mechanic_id, 0)
+
+    def put(self, mechanic_id: int, key: Hashable, value: Any, generation: int) -> None:
+        with self._lock:
+            now = self._clock()
+            if generation != self._generations.get(mechanic_id, 0):
+                return
+            if now - self._invalidated_at.get(mechanic_id, float("-inf")) < self._settle_time:
+                return
+            self._entries[(mechanic_id, key)] = (now + self._ttl, value)
+            self._entries.move_to_end((mechanic_id, key))
+            self._tenant_keys.setdefault(mechanic_id, set()).add(key)
+            while len(self._entries) > self._max_entries:
+                (old_mechanic_id, old_key), _ = next(iter(self._entries.items()))
+                self._remove(old_mechanic_id, old_key)
+                CACHE_EVICTIONS.labels(reason="capacity").inc()
+            CACHE_ENTRIES.set(len(self._entries))
+
+    def invalidate(self, mechanic_id: int) -> None:
+        with self._lock:
+            self._generations[mechanic_id] = self._generations.get(mechanic_id, 0) + 1
+            self._invalidated_at[mechanic_id] = self._clock()
+            keys = self._tenant_keys.pop(mechanic_id, set())
+            for key in keys:
+                self._entries.pop((mechanic_id, key), None)
+            if keys:
+                CACHE_EVICTIONS.labels(reason="invalidated").inc(len(keys))
+            CACHE_ENTRIES.set(len(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tenant_keys.clear()
+            CACHE_ENTRIES.set(0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, mechanic_id: int, key: Hashable) -> None:
+        self._entries.pop((mechanic_id, key), None)
+        keys = self._tenant_keys.get(mechanic_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._tenant_keys[mechanic_id]
+        CACHE_ENTRIES.set(len(self._entries))
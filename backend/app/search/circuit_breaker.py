@@ -0,0 +1,107 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+from app.search.metrics import BREAKER_REJECTED, BREAKER_STATE
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling Elasticsearch while the circuit is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Stops calling Elasticsearch after `failure_threshold` consecutive failures.
+
+    While open, calls are rejected with CircuitOpenError. After `reset_timeout` seconds
+    the circuit is half-open: one call at a time is let through as a probe, and its
+    outcome closes the circuit again or keeps it open for another `reset_timeout`. A probe
+    that never reports back frees its slot after `reset_timeout`, so a lost probe cannot
+    keep the circuit half-open forever.
+
+    `is_failure(error)` tells failures of Elasticsearch apart from errors of the caller;
+    a rejected bad request still proves Elasticsearch is up.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, is_failure: Callable[[Exception], bool],
+                 clock: Callable[[], float] = time.monotonic):
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._is_failure = is_failure
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at: float | None = None
+        BREAKER_STATE.set(_STATE_VALUES[CLOSED])
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self._reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go to Elasticsearch now; a True in the half-open state makes
+        the caller the probe, which must report back through record_success/record_failure.
+        """
+        with self._lock:
+            now = self._clock()
+            if self._state == OPEN and now - self._opened_at >= self._reset_timeout:
+                self._set_state(HALF_OPEN)
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and (
+                self._probe_started_at is None or now - self._probe_started_at >= self._reset_timeout
+            ):
+                self._probe_started_at = now
+                return True
+            BREAKER_REJECTED.inc()
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probe_started_at = None
+            self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_started_at = None
+            if self._state == HALF_OPEN or self._failures >= self._failure_threshold:
+                self._opened_at = self._clock()
+                self._set_state(OPEN)
+
+    @contextmanager
+    def guard(self):
+        """
+        Runs the block as one Elasticsearch call: raises CircuitOpenError if it may not
+        run, and records its outcome otherwise.
+        """
+        if not self.allow():
+            raise CircuitOpenError("Elasticsearch circuit is open")
+        try:
+            yield
+        except Exception as e:
+            if self._is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        self.record_success()
+
+    def _set_state(self, state: str) -> None:
+        self._state = state
+        BREAKER_STATE.set(_STATE_VALUES[state])
@@ -1,7 +1,28 @@
-from elasticsearch import Elasticsearch
+from elasticsearch import AsyncElasticsearch, Elasticsearch
 from app.core.config import settings
 
-# A single, reusable client instance
+# A single, reusable client instance (scripts and the outbox dispatcher thread)
 es_client = Elasticsearch(
     hosts=[settings.ELASTIC_HOST]
 )
+
+# Client for request handlers. Its connection pool belongs to the event loop, so it is
+# created on first use inside the app and closed on shutdown.
+_async_es_client: AsyncElasticsearch | None = None
+
+
+def get_async_es_client() -> AsyncElasticsearch:
+    global _async_es_client
+    if _async_es_client is None:
+        _async_es_client = AsyncElasticsearch(
+            hosts=[settings.ELASTIC_HOST],
+            connections_per_node=settings.ELASTIC_ASYNC_CONNECTIONS_PER_NODE,
+        )
+    return _async_es_client
+
+
+async def close_async_es_client():
+    global _async_es_client
+    if _async_es_client is not None:
+        await _async_es_client.close()
+        _async_es_client = None
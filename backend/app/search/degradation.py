@@ -0,0 +1,83 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+from app.search.metrics import SEARCH_DEGRADATION_LEVEL
+
+# Query plans, from the full one to the cheapest
+NORMAL = 0
+# No fuzziness
+REDUCED = 1
+# No fuzziness, only the main name fields, smaller pages
+MINIMAL = 2
+
+# Weight of the newest request in the moving average of the latency
+_SMOOTHING = 0.2
+# A level is left only once the pressure is this far below the threshold that raised it,
+# so a load hovering around a threshold does not flip the plan on every request
+_HYSTERESIS = 0.75
+
+
+class DegradationController:
+    """
+    Picks how cheap search queries should be from the recent load on Elasticsearch.
+
+    The pressure is the larger of the average request latency over `latency_threshold`
+    and the number of requests in flight over `max_in_flight`. A pressure of 1 moves the
+    plan to REDUCED, 2 to MINIMAL; the level goes up at once but down one step at a time,
+    at most every `cooldown` seconds and only when the pressure is clearly lower.
+    """
+
+    def __init__(self, latency_threshold: float, max_in_flight: int, cooldown: float,
+                 clock: Callable[[], float] = time.monotonic):
+        self._latency_threshold = latency_threshold
+        self._max_in_flight = max(1, max_in_flight)
+        self._cooldown = cooldown
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._latency = 0.0
+        self._in_flight = 0
+        self._level = NORMAL
+        self._changed_at = clock()
+        SEARCH_DEGRADATION_LEVEL.set(NORMAL)
+
+    @property
+    def level(self) -> int:
+        return self._level
+
+    @contextmanager
+    def track(self):
+        """
+        Counts the block as one request in flight and feeds its duration into the average,
+        whether it succeeds or not: a timeout is load too.
+        """
+        with self._lock:
+            self._in_flight += 1
+            self._update()
+        started = self._clock()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._latency += _SMOOTHING * (self._clock() - started - self._latency)
+                self._update()
+
+    def _pressure(self) -> float:
+        return max(self._latency / self._latency_threshold, self._in_flight / self._max_in_flight)
+
+    def _update(self) -> None:
+        pressure = self._pressure()
+        target = min(int(pressure), MINIMAL)
+        now = self._clock()
+        if target > self._level:
+            self._set_level(target, now)
+        elif (target < self._level and pressure < self._level * _HYSTERESIS
+              and now - self._changed_at >= self._cooldown):
+            self._set_level(self._level - 1, now)
+
+    def _set_level(self, level: int, now: float) -> None:
+        self._level = level
+        self._changed_at = now
+        SEARCH_DEGRADATION_LEVEL.set(level)
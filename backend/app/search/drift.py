@@ -0,0 +1,263 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Callable, Iterable, NamedTuple
+
+from elasticsearch import helpers
+from sqlalchemy import text
+from sqlalchemy.orm import Session, joinedload
+
+from app.models.clients import Clients
+from app.models.vehicles import Vehicles
+from app.search.metrics import DRIFT_CHUNKS_MISMATCHED, DRIFT_LAST_RUN, DRIFT_REPAIRED, DRIFT_SCANNED
+
+logger = logging.getLogger(__name__)
+
+# Stored in every search document; summed per chunk to compare a chunk with the database
+CHECKSUM_FIELD = "sync_hash"
+# Checksums have 40 bits, so the sum over a chunk of up to MAX_CHUNK_SIZE documents is still
+# exact in the double an Elasticsearch `sum` aggregation returns (2^40 * 2^13 = 2^53)
+MAX_CHUNK_SIZE = 8192
+# Largest page Elasticsearch returns without scrolling (index.max_result_window)
+_MAX_HITS = 10000
+
+MODELS = {"client": Clients, "vehicle": Vehicles}
+
+# Key of the PostgreSQL advisory lock that keeps workers from running the periodic check twice
+_LOCK_KEY = 0x5EA2C4D1
+
+
+def document_checksum(document: dict) -> int:
+    """
+    A 40-bit hash of the indexed fields of a search document.
+    """
+    fields = {key: value for key, value in document.items() if key != CHECKSUM_FIELD}
+    raw = json.dumps(fields, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return int.from_bytes(hashlib.blake2b(raw, digest_size=5).digest(), "big")
+
+
+class ChunkDigest(NamedTuple):
+    count: int
+    checksum_sum: int
+
+
+def chunk_digest(documents: Iterable[dict]) -> ChunkDigest:
+    count = total = 0
+    for document in documents:
+        count += 1
+        total += document.get(CHECKSUM_FIELD) or 0
+    return ChunkDigest(count, total)
+
+
+def plan_repairs(db_documents: dict[str, dict], es_hits: list[dict],
+                 home_indices: Callable[[int], set[str]]) -> tuple[set[str], list[tuple[str, str, int]]]:
+    """
+    Compares one chunk document by document.
+
+    Returns the ids to re-index (missing or outdated in Elasticsearch) and the
+    (index, id, mechanic_id) copies to delete: rows that no longer exist, and copies left
+    in an index the tenant does not live in any more.
+    """
+    to_index = set()
+    to_delete = []
+    found = set()
+    for hit in es_hits:
+        doc_id, source = hit["_id"], hit["_source"]
+        document = db_documents.get(doc_id)
+        if document is None or hit["_index"] not in home_indices(document["mechanic_id"]):
+            to_delete.append((hit["_index"], doc_id, source["mechanic_id"]))
+            continue
+        found.add(doc_id)
+        if source.get(CHECKSUM_FIELD) != document[CHECKSUM_FIELD]:
+            to_index.add(doc_id)
+    to_index |= db_documents.keys() - found
+    return to_index, to_delete
+
+
+class DriftReport(NamedTuple):
+    scanned: int
+    mismatched_chunks: int
+    indexed: int
+    deleted: int
+    seconds: float
+
+
+class DriftChecker:
+    """
+    Finds and repairs differences between the database and the search index.
+
+    Rows are walked in primary-key chunks. For each chunk, the document count and the sum
+    of the stored checksums are compared with one aggregation; only chunks that differ
+    are fetched and compared document by document. `service` is the SearchService, which
+    builds documents and knows where each tenant's documents live.
+    """
+
+    def __init__(self, service, es, session_factory: Callable[[], Session], chunk_size: int = 1000,
+                 repair: bool = True):
+        self._service = service
+        self._es = es
+        self._session_factory = session_factory
+        self._chunk_size = max(1, min(chunk_size, MAX_CHUNK_SIZE))
+        self._repair = repair
+
+    def run(self, mechanic_id: int | None = None, progress: Callable[[DriftReport], None] | None = None
+            ) -> DriftReport:
+        started = time.monotonic()
+        totals = [0, 0, 0, 0]
+        for doc_type in MODELS:
+            after_id = 0
+            while after_id is not None:
+                db = self._session_factory()
+                try:
+                    after_id, counts = self._check_chunk(db, doc_type, after_id, mechanic_id)
+                finally:
+                    db.close()
+                totals = [total + count for total, count in zip(totals, counts)]
+                if progress:
+                    progress(DriftReport(*totals, time.monotonic() - started))
+        DRIFT_LAST_RUN.set_to_current_time()
+        return DriftReport(*totals, time.monotonic() - started)
+
+    def _check_chunk(self, db: Session, doc_type: str, after_id: int,
+                     mechanic_id: int | None) -> tuple[int | None, tuple[int, int, int, int]]:
+        """
+        Checks the rows after `after_id`; returns where the next chunk starts (None after
+        the last one) and the (scanned, mismatched, indexed, deleted) counts.
+        """
+        documents = self._load_documents(db, doc_type, after_id, mechanic_id)
+        # The last chunk is open-ended so it also covers documents of rows deleted at the end
+        upper = None
+        if len(documents) == self._chunk_size:
+            upper = max(document["id"] for document in documents.values())
+        DRIFT_SCANNED.labels(type=doc_type).inc(len(documents))
+
+        index, routing = self._service.drift_scope(mechanic_id)
+        id_range = {"gt": after_id} if upper is None else {"gt": after_id, "lte": upper}
+        filters = [{"term": {"type": doc_type}}, {"range": {"id": id_range}}]
+        if mechanic_id is not None:
+            filters.append({"term": {"mechanic_id": mechanic_id}})
+        query = {"bool": {"filter": filters}}
+
+        response = self._es.search(
+            index=index, routing=routing, query=query, size=0, track_total_hits=True,
+            aggs={"checksum": {"sum": {"field": CHECKSUM_FIELD}}},
+        )
+        es_digest = ChunkDigest(response["hits"]["total"]["value"], int(response["aggregations"]["checksum"]["value"]))
+        if es_digest == chunk_digest(documents.values()):
+            return upper, (len(documents), 0, 0, 0)
+
+        DRIFT_CHUNKS_MISMATCHED.inc()
+        hits = self._fetch_hits(index, routing, query)
+        to_index, to_delete = plan_repairs(documents, hits, self._service.home_indices)
+        if to_index or to_delete:
+            logger.warning("Search index drift in %ss after id %s: %d to re-index, %d to delete",
+                           doc_type, after_id, len(to_index), len(to_delete))
+        if self._repair:
+            self._apply(documents, to_index, to_delete)
+        return upper, (len(documents), 1, len(to_index), len(to_delete))
+
+    def _load_documents(self, db: Session, doc_type: str, after_id: int, mechanic_id: int | None) -> dict[str, dict]:
+        model = MODELS[doc_type]
+        query = db.query(model).filter(model.id > after_id)
+        if mechanic_id is not None:
+            query = query.filter(model.mechanic_id == mechanic_id)
+        if doc_type == "vehicle":
+            query = query.options(joinedload(Vehicles.client))
+            build_document = self._service.vehicle_document
+        else:
+            build_document = self._service.client_document
+        rows = query.order_by(model.id).limit(self._chunk_size).all()
+        return {f"{doc_type}-{row.id}": build_document(row) for row in rows}
+
+    def _fetch_hits(self, index: str, routing: str | None, query: dict) -> list[dict]:
+        hits = []
+        search_after = None
+        while True:
+            response = self._es.search(
+                index=index, routing=routing, query=query, size=_MAX_HITS,
+                sort=[{"id": "asc"}], search_after=search_after,
+                source=["mechanic_id", CHECKSUM_FIELD], track_total_hits=False,
+            )
+            page = response["hits"]["hits"]
+            hits += page
+            if len(page) < _MAX_HITS:
+                return hits
+            search_after = page[-1]["sort"]
+
+    def _apply(self, documents: dict[str, dict], to_index: set[str], to_delete: list[tuple[str, str, int]]) -> None:
+        actions = []
+        for doc_id in sorted(to_index):
+            document = documents[doc_id]
+            actions += self._service.bulk_actions(doc_id, document["mechanic_id"], document)
+        for index, doc_id, mechanic_id in to_delete:
+            action = {"_op_type": "delete", "_index": index, "_id": doc_id}
+            routing = self._service.routing(index, mechanic_id)
+            if routing:
+                action["_routing"] = routing
+            actions.append(action)
+        if not actions:
+            return
+        _, failures = helpers.bulk(self._es, actions, raise_on_error=False, raise_on_exception=False)
+        for failure in failures:
+            op_type, result = next(iter(failure.items()))
+            if not (op_type == "delete" and result.get("status") == 404):
+                logger.error("Failed to repair search document %s: %s", result.get("_id"), result.get("error"))
+        DRIFT_REPAIRED.labels(action="index").inc(len(to_index))
+        DRIFT_REPAIRED.labels(action="delete").inc(len(to_delete))
+
+
+class PeriodicDriftCheck:
+    """
+    Background thread that runs a DriftChecker every `interval` seconds.
+
+    On PostgreSQL an advisory lock makes sure only one worker process runs a check at a time.
+    """
+
+    def __init__(self, checker: DriftChecker, session_factory: Callable[[], Session], interval: float):
+        self._checker = checker
+        self._session_factory = session_factory
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="search-drift-check", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            db = self._session_factory()
+            try:
+                if not self._lock(db):
+                    continue
+                try:
+                    report = self._checker.run()
+                    logger.info("Search drift check: %s", report)
+                finally:
+                    self._unlock(db)
+            except Exception:
+                logger.exception("Search drift check failed")
+            finally:
+                db.close()
+
+    @staticmethod
+    def _lock(db: Session) -> bool:
+        if db.bind.dialect.name != "postgresql":
+            return True
+        return bool(db.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": _LOCK_KEY}).scalar())
+
+    @staticmethod
+    def _unlock(db: Session) -> None:
+        if db.bind.dialect.name == "postgresql":
+            db.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _LOCK_KEY})
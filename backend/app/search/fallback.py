@@ -0,0 +1,306 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from app.search.query_classifier import PLATE, TEXT, VIN, QueryShape, classify, normalize_phone, normalize_plate
+
+# Searchable fields -> (boost, analysis). Mirrors the multi_match in SearchService.search:
+#   text     - lowercased words, matched exactly, by prefix (edge_ngram) or fuzzily
+#   joined   - the words glued together, like name.no_whitespace
+#   keyword  - the whole value as one term, like the `phone`/`vin` keyword fields
+FIELDS = {
+    "name": (2.0, "text"),
+    "client_name": (1.8, "text"),
+    "client_last_name": (1.8, "text"),
+    "name_joined": (1.0, "joined"),
+    "phone": (1.0, "keyword"),
+    "vin": (1.0, "keyword"),
+}
+# Relative weight of an exact, prefix and fuzzy term match
+EXACT, PREFIX, FUZZY = 1.0, 0.75, 0.5
+# Same boost the function_score gives clients
+CLIENT_BOOST = 2.0
+# Score of every hit of an exact VIN or phone lookup (constant_score in the ES query)
+EXACT_LOOKUP_SCORE = 1.0
+
+_WORD = re.compile(r"\w+")
+
+
+def _words(text: str) -> list[str]:
+    return _WORD.findall(text.lower())
+
+
+def _trigrams(token: str) -> set[str]:
+    padded = f"$${token}"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def auto_fuzziness(term: str) -> int:
+    """
+    Allowed edits for a term, like Elasticsearch's `fuzziness: AUTO`.
+    """
+    if len(term) <= 2:
+        return 0
+    return 1 if len(term) <= 5 else 2
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Damerau-Levenshtein (optimal string alignment) distance; stops early above `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous_row = None
+    row = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous_row, row = previous_row, row, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            row[j] = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                row[j] = min(row[j], before[j - 2] + 1)
+        if min(row) > limit:
+            return limit + 1
+    return row[-1]
+
+
+def _match(term: str, token: str, allow_prefix: bool) -> float:
+    if term == token:
+        return EXACT
+    if allow_prefix and len(term) >= 2 and token.startswith(term):
+        return PREFIX
+    edits = auto_fuzziness(term)
+    if edits and edit_distance(term, token, edits) <= edits:
+        return FUZZY
+    return 0.0
+
+
+def _analyze(document: dict) -> dict[str, list[str]]:
+    name_words = _words(document.get("name") or "")
+    fields = {
+        "name": name_words,
+        "client_name": _words(document.get("client_name") or ""),
+        "client_last_name": _words(document.get("client_last_name") or ""),
+        "name_joined": ["".join(name_words)] if name_words else [],
+    }
+    for field in ("phone", "vin"):
+        value = (document.get(field) or "").strip().lower()
+        fields[field] = [value] if value else []
+    return fields
+
+
+class _TenantIndex:
+    """
+    Documents of one mechanic with a token -> documents map and a trigram -> tokens map.
+    """
+
+    def __init__(self, documents: list[dict], built_at: float):
+        self.built_at = built_at
+        self.documents: dict[str, dict] = {}
+        self.fields: dict[str, dict[str, list[str]]] = {}
+        self.postings: dict[str, set[str]] = {}
+        self.trigrams: dict[str, set[str]] = {}
+        for document in documents:
+            self.add(document)
+
+    def add(self, document: dict) -> None:
+        doc_id = f"{document['type']}-{document['id']}"
+        self.remove(doc_id)
+        fields = _analyze(document)
+        self.documents[doc_id] = document
+        self.fields[doc_id] = fields
+        for tokens in fields.values():
+            for token in tokens:
+                if token not in self.postings:
+                    self.postings[token] = set()
+                    for gram in _trigrams(token):
+                        self.trigrams.setdefault(gram, set()).add(token)
+                self.postings[token].add(doc_id)
+
+    def remove(self, doc_id: str) -> None:
+        fields = self.fields.pop(doc_id, None)
+        self.documents.pop(doc_id, None)
+        if not fields:
+            return
+        for tokens in fields.values():
+            for token in tokens:
+                doc_ids = self.postings.get(token)
+                if doc_ids is None:
+                    continue
+                doc_ids.discard(doc_id)
+                if not doc_ids:
+                    del self.postings[token]
+                    for gram in _trigrams(token):
+                        grams = self.trigrams.get(gram)
+                        if grams is not None:
+                            grams.discard(token)
+                            if not grams:
+                                del self.trigrams[gram]
+
+    def candidates(self, term: str) -> set[str]:
+        """
+        Documents that contain a token sharing at least one trigram with `term`.
+        """
+        tokens = set()
+        for gram in _trigrams(term):
+            tokens |= self.trigrams.get(gram, set())
+        doc_ids = set()
+        for token in tokens:
+            doc_ids |= self.postings[token]
+        return doc_ids
+
+    def score(self, doc_id: str, queries: dict[str, list[str]]) -> float:
+        """
+        best_fields with operator=and: every term must match within the same field.
+        """
+        best = 0.0
+        for field, tokens in self.fields[doc_id].items():
+            if not tokens:
+                continue
+            boost, analysis = FIELDS[field]
+            total = 0.0
+            for term in queries[analysis]:
+                weight = max(_match(term, token, analysis == "text") for token in tokens)
+                if not weight:
+                    break
+                total += weight
+            else:
+                best = max(best, total * boost)
+        if best and self.documents[doc_id]["type"] == "client":
+            best *= CLIENT_BOOST
+        return best
+
+
+class FallbackSearchIndex:
+    """
+    In-process search over client and vehicle documents, used when Elasticsearch is down.
+
+    Tenants are loaded lazily with `loader(mechanic_id)` and kept current through `upsert`
+    and `remove`. At most `max_documents` documents are held in total; the least recently
+    searched tenants are dropped first, and a tenant is reloaded after `ttl` seconds so
+    writes handled by other worker processes are eventually picked up.
+    """
+
+    def __init__(self, loader: Callable[[int], list[dict]], max_documents: int, ttl: float,
+                 clock: Callable[[], float] = time.monotonic):
+        self._loader = loader
+        self._max_documents = max_documents
+        self._ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tenants: OrderedDict[int, _TenantIndex] = OrderedDict()
+
+    def search(self, query: str, mechanic_id: int, size: int, search_after: list | None = None,
+               doc_type: str | None = None, as_text: bool = False) -> list[tuple[list, dict]]:
+        """
+        Returns up to `size` (sort values, document) pairs ordered like the ES query:
+        score descending, then type and id. With `as_text`, a plate-shaped query is matched
+        as free text instead of looked up.
+        """
+        hits = self._matches(self._tenant(mechanic_id), query, doc_type, as_text)
+        hits.sort(key=lambda hit: (-hit[0][0], hit[0][1], hit[0][2]))
+
+        if search_after:
+            after = (-search_after[0], search_after[1], search_after[2])
+            hits = [hit for hit in hits if (-hit[0][0], hit[0][1], hit[0][2]) > after]
+        return hits[:size]
+
+    def type_counts(self, query: str, mechanic_id: int, as_text: bool = False) -> dict[str, int]:
+        """
+        Number of matches per document type, like the `types` aggregation of the ES query.
+        """
+        counts = {"client": 0, "vehicle": 0}
+        for _, document in self._matches(self._tenant(mechanic_id), query, None, as_text):
+            counts[document["type"]] += 1
+        return counts
+
+    def _matches(self, tenant: _TenantIndex, query: str, doc_type: str | None,
+                 as_text: bool) -> list[tuple[list, dict]]:
+        shape = classify(query)
+        if shape.kind == TEXT or as_text:
+            return self._fuzzy(tenant, query, doc_type)
+        return self._lookup(tenant, shape, doc_type)
+
+    def _lookup(self, tenant: _TenantIndex, shape: QueryShape, doc_type: str | None) -> list[tuple[list, dict]]:
+        """
+        Exact VIN or plate match, or phone numbers starting with the digits, like the ES query.
+        """
+        hits = []
+        with self._lock:
+            for document in tenant.documents.values():
+                if doc_type and document["type"] != doc_type:
+                    continue
+                if shape.kind == VIN:
+                    matched = (document.get("vin") or "").upper() == shape.value
+                elif shape.kind == PLATE:
+                    matched = normalize_plate(document.get("registration_number") or "") == shape.value
+                else:
+                    matched = normalize_phone(document.get("phone") or "").startswith(shape.value)
+                if matched:
+                    hits.append(([EXACT_LOOKUP_SCORE, document["type"], document["id"]], document))
+        return hits
+
+    def _fuzzy(self, tenant: _TenantIndex, query: str, doc_type: str | None) -> list[tuple[list, dict]]:
+        normalized = query.strip().lower()
+        queries = {
+            "text": _words(query),
+            "joined": ["".join(_words(query))],
+            "keyword": [normalized],
+        }
+        if not normalized or not queries["text"]:
+            return []
+
+        hits = []
+        with self._lock:
+            doc_ids = set()
+            for term in {*queries["text"], *queries["joined"], *queries["keyword"]}:
+                doc_ids |= tenant.candidates(term)
+            for doc_id in doc_ids:
+                document = tenant.documents[doc_id]
+                if doc_type and document["type"] != doc_type:
+                    continue
+                score = tenant.score(doc_id, queries)
+                if score:
+                    hits.append(([score, document["type"], document["id"]], document))
+        return hits
+
+    def upsert(self, document: dict) -> None:
+        with self._lock:
+            tenant = self._tenants.get(document["mechanic_id"])
+            if tenant is not None:
+                tenant.add(document)
+
+    def remove(self, mechanic_id: int, doc_id: str) -> None:
+        with self._lock:
+            tenant = self._tenants.get(mechanic_id)
+            if tenant is not None:
+                tenant.remove(doc_id)
+
+    def remove_client_vehicles(self, mechanic_id: int, client_id: int) -> None:
+        with self._lock:
+            tenant = self._tenants.get(mechanic_id)
+            if tenant is not None:
+                for doc_id, document in list(tenant.documents.items()):
+                    if document["type"] == "vehicle" and document.get("client_id") == client_id:
+                        tenant.remove(doc_id)
+
+    def _tenant(self, mechanic_id: int) -> _TenantIndex:
+        with self._lock:
+            tenant = self._tenants.get(mechanic_id)
+            if tenant is not None and self._clock() - tenant.built_at < self._ttl:
+                self._tenants.move_to_end(mechanic_id)
+                return tenant
+
+        tenant = _TenantIndex(self._loader(mechanic_id), built_at=self._clock())
+        if len(tenant.documents) > self._max_documents:
+            # Too big to keep around; serve this search without caching the tenant
+            return tenant
+
+        with self._lock:
+            self._tenants[mechanic_id] = tenant
+            self._tenants.move_to_end(mechanic_id)
+            while sum(len(t.documents) for t in self._tenants.values()) > self._max_documents:
+                self._tenants.popitem(last=False)
+        return tenant
@@ -0,0 +1,176 @@
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Metrics are registered in the default registry, so they are served by the
+# existing /metrics endpoint exposed through prometheus_fastapi_instrumentator.
+
+OUTBOX_PENDING = Gauge(
+    "search_outbox_pending",
+    "Search outbox rows waiting to be sent to Elasticsearch",
+)
+OUTBOX_LAG = Gauge(
+    "search_outbox_lag_seconds",
+    "Age of the oldest search outbox row that has not been dispatched yet",
+)
+OUTBOX_DISPATCHED = Counter(
+    "search_outbox_dispatched_total",
+    "Search outbox rows successfully applied to Elasticsearch",
+)
+OUTBOX_FAILED = Counter(
+    "search_outbox_failed_total",
+    "Search outbox dispatch attempts that failed and were rescheduled",
+)
+
+CACHE_HITS = Counter(
+    "search_cache_hits_total",
+    "Search requests answered from the per-mechanic result cache",
+)
+CACHE_MISSES = Counter(
+    "search_cache_misses_total",
+    "Search requests that had to query Elasticsearch",
+)
+CACHE_EVICTIONS = Counter(
+    "search_cache_evictions_total",
+    "Search result cache entries dropped, by reason (capacity, expired, invalidated)",
+    ["reason"],
+)
+CACHE_ENTRIES = Gauge(
+    "search_cache_entries",
+    "Search result cache entries currently held",
+)
+
+DRIFT_SCANNED = Counter(
+    "search_drift_scanned_total",
+    "Database rows compared with the search index by the drift checker, by type",
+    ["type"],
+)
+DRIFT_CHUNKS_MISMATCHED = Counter(
+    "search_drift_chunks_mismatched_total",
+    "Drift checker chunks whose checksum did not match and were compared document by document",
+)
+DRIFT_REPAIRED = Counter(
+    "search_drift_repaired_total",
+    "Search documents re-indexed or deleted by the drift checker, by action",
+    ["action"],
+)
+DRIFT_LAST_RUN = Gauge(
+    "search_drift_last_run_timestamp_seconds",
+    "Unix time the last full drift check finished",
+)
+
+BULK_BUFFER_PENDING = Gauge(
+    "search_bulk_buffer_pending",
+    "Search index operations buffered in this process, waiting for the next _bulk request",
+)
+BULK_FLUSHES = Counter(
+    "search_bulk_flushes_total",
+    "_bulk requests sent from the in-process write buffer, by result (ok, error)",
+    ["result"],
+)
+BULK_OPERATIONS = Counter(
+    "search_bulk_operations_total",
+    "Search index operations sent from the in-process write buffer, after coalescing",
+)
+
+SEARCH_OPERATION_SECONDS = Histogram(
+    "search_service_operation_seconds",
+    "Time spent in a SearchService operation, as seen by the caller",
+    ["operation"],
+)
+SEARCH_OPERATION_ERRORS = Counter(
+    "search_service_operation_errors_total",
+    "SearchService operations that raised, by exception type",
+    ["operation", "error"],
+)
+SEARCH_OPERATION_IN_PROGRESS = Gauge(
+    "search_service_operations_in_progress",
+    "SearchService operations currently running",
+    ["operation"],
+)
+ES_REQUEST_SECONDS = Histogram(
+    "search_es_request_seconds",
+    "Round trip of an Elasticsearch search request, as seen by the client",
+    ["operation"],
+)
+ES_TOOK_SECONDS = Histogram(
+    "search_es_took_seconds",
+    "Time Elasticsearch reports it spent on a search request (`took`)",
+    ["operation"],
+)
+SEARCH_HITS = Histogram(
+    "search_hits",
+    "Hits returned per search request",
+    ["operation"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 1000),
+)
+
+QUERY_SHAPES = Counter(
+    "search_query_shapes_total",
+    "Search queries by detected shape (vin, phone, text); vin and phone skip fuzzy matching",
+    ["shape"],
+)
+
+BREAKER_STATE = Gauge(
+    "search_breaker_state",
+    "State of the Elasticsearch circuit breaker (0 closed, 1 half-open, 2 open)",
+)
+BREAKER_REJECTED = Counter(
+    "search_breaker_rejected_total",
+    "Elasticsearch calls rejected without being sent because the circuit was open",
+)
+
+SEARCH_DEGRADATION_LEVEL = Gauge(
+    "search_degradation_level",
+    "Query plan searches currently use under load (0 full, 1 no fuzziness, 2 minimal)",
+)
+
+
+@contextmanager
+def track(operation: str):
+    """
+    Records latency, errors and in-flight count of the block under `operation`.
+    """
+    in_progress = SEARCH_OPERATION_IN_PROGRESS.labels(operation=operation)
+    in_progress.inc()
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        SEARCH_OPERATION_ERRORS.labels(operation=operation, error=type(e).__name__).inc()
+        raise
+    finally:
+        SEARCH_OPERATION_SECONDS.labels(operation=operation).observe(time.perf_counter() - started)
+        in_progress.dec()
+
+
+def instrumented(operation: str):
+    """
+    Decorator that wraps a plain or async method in `track(operation)`.
+    """
+    def decorate(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with track(operation):
+                    return await func(*args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with track(operation):
+                    return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def observe_search_response(operation: str, response, seconds: float) -> None:
+    """
+    Records a search response: the client-observed round trip `seconds` next to the
+    `took` Elasticsearch reports, and the number of hits returned.
+    """
+    ES_REQUEST_SECONDS.labels(operation=operation).observe(seconds)
+    ES_TOOK_SECONDS.labels(operation=operation).observe(response["took"] / 1000)
+    SEARCH_HITS.labels(operation=operation).observe(len(response["hits"]["hits"]))
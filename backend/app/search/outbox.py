@@ -0,0 +1,121 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import event, func, insert
+from sqlalchemy.orm import Session, attributes
+
+from app.models.clients import Clients
+from app.models.search_outbox import SearchOutbox
+from app.models.vehicles import Vehicles
+from app.search.metrics import OUTBOX_LAG, OUTBOX_PENDING
+
+logger = logging.getLogger(__name__)
+
+# Fields that end up in the search documents; changes to anything else
+# (e.g. last_view_data) do not need a re-index.
+INDEXED_FIELDS = {
+    Clients: ("name", "last_name", "phone", "mechanic_id"),
+    Vehicles: ("mark", "model", "vin", "registration_number", "client_id", "mechanic_id"),
+}
+ENTITY_TYPES = {Clients: "client", Vehicles: "vehicle"}
+
+# Set after a commit that wrote outbox rows, so the dispatcher wakes up immediately
+outbox_signal = threading.Event()
+
+
+def _needs_reindex(obj, is_new: bool) -> bool:
+    if is_new:
+        return True
+    return any(attributes.get_history(obj, field).has_changes() for field in INDEXED_FIELDS[type(obj)])
+
+
+@event.listens_for(Session, "after_flush")
+def enqueue_search_updates(session: Session, flush_context):
+    """
+    Writes an outbox row for every client/vehicle whose indexed fields changed.
+
+    Runs inside the flush, so the rows commit or roll back together with the entity.
+    Deletes are not captured here; they are removed from the index by the services.
+    """
+    rows = []
+    for is_new, objects in ((True, session.new), (False, session.dirty)):
+        for obj in objects:
+            if type(obj) in INDEXED_FIELDS and _needs_reindex(obj, is_new):
+                rows.append({
+                    "entity_type": ENTITY_TYPES[type(obj)],
+                    "entity_id": obj.id,
+                    "mechanic_id": obj.mechanic_id,
+                })
+    if rows:
+        session.connection().execute(insert(SearchOutbox), rows)
+        session.info["search_outbox_written"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _signal_dispatcher(session: Session):
+    if session.info.pop("search_outbox_written", False):
+        outbox_signal.set()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_outbox_rows(session: Session):
+    session.info.pop("search_outbox_written", None)
+
+
+def update_outbox_metrics(db: Session) -> None:
+    oldest, pending = db.query(func.min(SearchOutbox.created_at), func.count(SearchOutbox.id)).one()
+    OUTBOX_PENDING.set(pending)
+    OUTBOX_LAG.set((datetime.utcnow() - oldest).total_seconds() if oldest else 0)
+
+
+class OutboxDispatcher:
+    """
+    Background thread that drains the search outbox through `dispatch`.
+
+    `dispatch(db)` processes one batch and returns how many rows it handled; the thread
+    keeps calling it while there is work and otherwise sleeps until the next commit or poll.
+    After waking up it waits `linger` seconds more, so commits that arrive close together
+    (e.g. a new client and their vehicle) go out in one `_bulk` request.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], dispatch: Callable[[Session], int],
+                 poll_interval: float, linger: float = 0.0):
+        self._session_factory = session_factory
+        self._dispatch = dispatch
+        self._poll_interval = poll_interval
+        self._linger = linger
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="search-outbox-dispatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        outbox_signal.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            # Cleared before draining so a commit during the batch still wakes the next loop
+            outbox_signal.clear()
+            handled = 0
+            db = self._session_factory()
+            try:
+                handled = self._dispatch(db)
+                update_outbox_metrics(db)
+            except Exception:
+                logger.exception("Search outbox dispatch failed")
+                db.rollback()
+            finally:
+                db.close()
+            if not handled and outbox_signal.wait(self._poll_interval) and self._linger:
+                self._stop.wait(self._linger)
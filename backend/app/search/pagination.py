@@ -0,0 +1,51 @@
+import base64
+import binascii
+import json
+from typing import NamedTuple
+
+# Last element of the cursor of a plate-shaped query that ran as free text
+TEXT_MARKER = "text"
+# Document types in the second sort value
+DOC_TYPES = ("client", "vehicle")
+
+
+class Cursor(NamedTuple):
+    search_after: list
+    # The query looks like a plate but found nothing as one, so its pages are text searches
+    as_text: bool = False
+
+
+def encode_cursor(sort_values: list, as_text: bool = False) -> str:
+    """
+    Turns the `sort` values of the last hit on a page into an opaque cursor.
+    """
+    payload = [*sort_values, TEXT_MARKER] if as_text else sort_values
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    Reverses `encode_cursor`; raises ValueError for anything that is not a valid cursor.
+
+    The sort values must match SearchService.SEARCH_SORT: `[score, type, id]`.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort_values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError("Invalid search cursor")
+    if not isinstance(sort_values, list):
+        raise ValueError("Invalid search cursor")
+    as_text = len(sort_values) == 4 and sort_values[-1] == TEXT_MARKER
+    if as_text:
+        sort_values = sort_values[:-1]
+    if len(sort_values) != 3:
+        raise ValueError("Invalid search cursor")
+    score, doc_type, doc_id = sort_values
+    # bool is an int subclass, and JSON true/false are no scores or ids
+    if (isinstance(score, bool) or not isinstance(score, (int, float))
+            or doc_type not in DOC_TYPES
+            or isinstance(doc_id, bool) or not isinstance(doc_id, int)):
+        raise ValueError("Invalid search cursor")
+    return Cursor(sort_values, as_text)
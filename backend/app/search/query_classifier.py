@@ -0,0 +1,59 @@
+import re
+from typing import NamedTuple
+
+# Query shapes with an exact lookup path; everything else is free text for the fuzzy query
+VIN = "vin"
+PHONE = "phone"
+PLATE = "plate"
+TEXT = "text"
+
+# 17 characters, letters I, O and Q are never used in a VIN
+_VIN = re.compile(r"[A-HJ-NPR-Z0-9]{17}")
+# Digits with the separators people type in phone numbers
+_PHONE = re.compile(r"\+?[\d\s().\-/]+")
+_NON_DIGIT = re.compile(r"\D")
+# Shorter digit strings are more likely a model ("308") or a year than a phone number
+MIN_PHONE_DIGITS = 7
+# Registration plates: letters first, then at least one digit ("WA 12345", "KR-4G712")
+_PLATE = re.compile(r"[A-Z]{1,3}\d[A-Z0-9]{2,5}")
+
+
+class QueryShape(NamedTuple):
+    kind: str
+    # Normalized value for the exact kinds, the query itself for TEXT
+    value: str
+
+
+def normalize_plate(plate: str) -> str:
+    """
+    Uppercase without whitespace and dashes, like the `registration_number` normalizer.
+    """
+    return "".join(plate.split()).replace("-", "").upper()
+
+
+def normalize_phone(phone: str) -> str:
+    """
+    Digits only, like the `phone.digits` subfield.
+    """
+    return _NON_DIGIT.sub("", phone)
+
+
+def classify(query: str) -> QueryShape:
+    """
+    Tells VINs, phone numbers and registration plates apart from free text, so they can
+    skip fuzzy matching.
+
+    Plate-shaped text can also be a model name ("Q5 TFSI"), so a plate lookup that finds
+    nothing is expected to be retried as TEXT.
+    """
+    compact = normalize_plate(query)
+    if _VIN.fullmatch(compact) and any(c.isdigit() for c in compact) and any(c.isalpha() for c in compact):
+        return QueryShape(VIN, compact)
+    stripped = query.strip()
+    if _PHONE.fullmatch(stripped):
+        digits = normalize_phone(stripped)
+        if len(digits) >= MIN_PHONE_DIGITS:
+            return QueryShape(PHONE, digits)
+    if _PLATE.fullmatch(compact):
+        return QueryShape(PLATE, compact)
+    return QueryShape(TEXT, query)
@@ -0,0 +1,67 @@
+from typing import NamedTuple
+
+# Stored in the mapping `_meta` of indices whose documents are routed by mechanic_id
+ROUTING_META = {"routing": "mechanic_id"}
+
+
+class IndexLayout(NamedTuple):
+    """
+    Snapshot of the search aliases and of which indices route documents by mechanic_id.
+
+    Indices created before routing was introduced spread every tenant over all shards;
+    they are written and searched without routing until a rebuild replaces them.
+    """
+    # alias -> indices behind it
+    aliases: dict[str, list[str]]
+    # indices whose documents are routed by mechanic_id
+    routed: set[str]
+
+
+def parse_layout(response) -> IndexLayout:
+    """
+    Builds the layout from `GET <indices>?filter_path=*.aliases,*.mappings._meta`.
+    """
+    aliases: dict[str, list[str]] = {}
+    routed = set()
+    for index in response:
+        info = response[index]
+        for alias in info.get("aliases") or {}:
+            aliases.setdefault(alias, []).append(index)
+        meta = (info.get("mappings") or {}).get("_meta") or {}
+        if meta.get("routing") == ROUTING_META["routing"]:
+            routed.add(index)
+    return IndexLayout(aliases, routed)
+
+
+def routing_for(layout: IndexLayout, target: str, mechanic_id: int) -> str | None:
+    """
+    The routing value for `target` (an alias or index), or None if any index behind it
+    is not routed.
+    """
+    indices = layout.aliases.get(target, [target])
+    if indices and all(index in layout.routed for index in indices):
+        return str(mechanic_id)
+    return None
+
+
+def read_target(layout: IndexLayout, shared_alias: str, tenant_alias: str,
+                mechanic_id: int) -> tuple[str, str | None]:
+    """
+    The alias a mechanic's searches go to (their dedicated one if it exists) and its routing.
+    """
+    family = tenant_alias if tenant_alias in layout.aliases else shared_alias
+    return family, routing_for(layout, family, mechanic_id)
+
+
+def write_targets(layout: IndexLayout, shared_alias: str, tenant_alias: str, mechanic_id: int,
+                  pending_suffix: str) -> list[tuple[str, str | None]]:
+    """
+    (index, routing) pairs a mechanic's documents are written to: the alias they are
+    searched through, plus any index being rebuilt for it or for the tenant.
+    """
+    family, routing = read_target(layout, shared_alias, tenant_alias, mechanic_id)
+    targets = [(family, routing)]
+    for alias in dict.fromkeys([family + pending_suffix, tenant_alias + pending_suffix]):
+        for index in layout.aliases.get(alias, []):
+            targets.append((index, routing_for(layout, index, mechanic_id)))
+    return targets
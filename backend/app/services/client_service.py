@@ -37,13 +37,8 @@ class ClientService(IClientService):
                 if existing_client.pesel and existing_client.pesel == client_dict['pesel']:
                     raise ValueError("Client with this pesel already exists.")
         
+        # The search document is written through the search outbox in the same transaction
         new_client = self.client_repo.create_client(client_dict)
-        try:
-            search_service.index_client(new_client)
-        except Exception:
-            # Do not fail the request if search indexing is unavailable
-            self._logger.exception("Failed to index client in Elasticsearch")
-        
         return ClientExtendedInfo.model_validate(new_client)
 
     def get_client_details(self, client_id: int, mechanic_id: int) -> Optional[ClientExtendedInfo]:
@@ -57,19 +52,14 @@ class ClientService(IClientService):
     def update_client_details(self, client_id: int, client_data: ClientUpdate, mechanic_id: int) -> Optional[ClientExtendedInfo]:
         updated_client = self.client_repo.update_client(client_id, client_data, mechanic_id)
         self.__validate_result(updated_client)
-        
-        try:
-            search_service.index_client(updated_client)
-        except Exception:
-            self._logger.exception("Failed to re-index client after update")
         return ClientExtendedInfo.model_validate(updated_client)
 
     def remove_client(self, client_id: int, mechanic_id: int) -> None:
-        was_deleted = self.client_repo.delete_client(client_id, mechanic_id)
-        self.__validate_result(was_deleted)
+        vehicle_ids = self.client_repo.delete_client(client_id, mechanic_id)
+        self.__validate_result(vehicle_ids is not None)
         try:
             # Delete client and all their vehicles from Elasticsearch
-            search_service.delete_client_and_vehicles(client_id)
+            search_service.delete_client_and_vehicles(client_id, mechanic_id, vehicle_ids)
         except Exception:
             self._logger.exception("Failed to remove client and vehicles from Elasticsearch index")
 
@@ -1,95 +1,444 @@
-from app.search.client import es_client
+import asyncio
+import logging
+import re
+import time
+from datetime import datetime, timedelta
+
+from elasticsearch import ApiError, NotFoundError, TransportError, helpers
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.search.bulk_buffer import BulkBuffer
+from app.search.cache import SearchResultCache, normalize_query
+from app.search.circuit_breaker import OPEN, CircuitBreaker, CircuitOpenError
+from app.search.degradation import MINIMAL, NORMAL, REDUCED, DegradationController
+from app.search.drift import CHECKSUM_FIELD, DriftChecker, PeriodicDriftCheck, document_checksum
+from app.search.fallback import FallbackSearchIndex
+from app.search.client import es_client, get_async_es_client
+from app.search.query_classifier import PHONE, PLATE, TEXT, VIN, QueryShape, classify
+from app.search.pagination import Cursor, decode_cursor, encode_cursor
+from app.search.routing import ROUTING_META, IndexLayout, parse_layout, read_target, routing_for, write_targets
+from app.search.metrics import OUTBOX_DISPATCHED, OUTBOX_FAILED, QUERY_SHAPES, instrumented, observe_search_response
+from app.search.outbox import OutboxDispatcher
 from app.models.clients import Clients
+from app.models.search_outbox import SearchOutbox
 from app.models.vehicles import Vehicles
-from app.schemas.search import ElasticSearchEntry, SearchResult
+from app.repositories.client_repository import ClientRepository
+from app.repositories.vehicle_repository import VehicleRepository
+from app.schemas.client import ClientExtendedInfo
+from app.schemas.vehicle import VehicleExtendedInfo
+from app.schemas.search import ElasticSearchEntry, SearchPage, SearchQuery, SearchResult, SearchSuggestion
+
+logger = logging.getLogger(__name__)
+
+_SEARCH_RESULTS = TypeAdapter(list[SearchResult])
+_SUGGESTIONS = TypeAdapter(list[SearchSuggestion])
+
+# Fields of the free-text multi_match, and the main name fields the MINIMAL plan keeps
+TEXT_SEARCH_FIELDS = [
+    "name^2",
+    "name.autocomplete^1.5",
+    "name.no_whitespace",
+    "phone",
+    "vin",
+    "client_name^1.8",
+    "client_name.autocomplete^1.5",
+    "client_last_name^1.8",
+    "client_last_name.autocomplete^1.5"
+]
+MINIMAL_TEXT_SEARCH_FIELDS = ["name^2", "name.autocomplete^1.5", "client_name^1.8", "client_last_name^1.8"]
 
 class SearchService:
+    # Alias that every read and write goes through; it points at a versioned index
     INDEX_NAME = "clients_and_vehicles"
+    # Alias of a tenant that was moved out of the shared index into its own
+    TENANT_ALIAS_FORMAT = "clients_and_vehicles_tenant_{mechanic_id}"
+    _TENANT_ALIAS = re.compile(r"clients_and_vehicles_tenant_(\d+)")
+    # Added to an alias to name the alias of an index being rebuilt for it, which
+    # receives mirrored writes
+    PENDING_SUFFIX = "_pending"
+    PENDING_ALIAS = INDEX_NAME + PENDING_SUFFIX
+    # Down to the microsecond, so an index created right after another gets its own name
+    INDEX_VERSION_FORMAT = "%Y%m%d%H%M%S%f"
+    # Seconds a process may keep using a stale view of the aliases (see _layout)
+    PENDING_ALIAS_TTL = 5.0
+    # Just the parts of GET /clients_and_vehicles* that _layout needs
+    LAYOUT_FILTER_PATH = "*.aliases,*.mappings._meta"
 
-    def create_index_if_not_exists(self):
+    # Results per page, and the most a client may ask for
+    DEFAULT_PAGE_SIZE = 10
+    MAX_PAGE_SIZE = 50
+    # Suggestions per typeahead request, and the most a client may ask for
+    DEFAULT_SUGGEST_SIZE = 5
+    MAX_SUGGEST_SIZE = 20
+    # Most results per page and suggestions while the MINIMAL query plan is in effect
+    DEGRADED_PAGE_SIZE = 5
+    DEGRADED_SUGGEST_SIZE = 3
+    # Fields of a SearchResult that come from the index; the rest is added by _hydrate
+    RESULT_SOURCE = [field for field in SearchResult.model_fields if field not in ("client", "vehicle")]
+    # Per-hit metadata that is never read; leaving it out saves sending and decoding it
+    SEARCH_FILTER_PATH = "-_shards,-hits.hits._index,-hits.hits._id,-hits.hits._score,-hits.hits._routing"
+    MSEARCH_FILTER_PATH = ",".join(
+        f"-responses.{path[1:]}" for path in SEARCH_FILTER_PATH.split(",")
+    )
+    # Score first; (type, id) is unique per document and makes the order stable for search_after
+    SEARCH_SORT = [{"_score": "desc"}, {"type": "asc"}, {"id": "asc"}]
+
+    # Fields a vehicle document copies from its client, plus the checksum that covers them
+    OWNER_FIELDS = ("client_name", "client_last_name", CHECKSUM_FIELD)
+
+    # Upper bound for the exponential retry backoff of failed outbox rows
+    OUTBOX_MAX_BACKOFF = timedelta(minutes=5)
+    # Seconds to wait before trying to create the search index again
+    INDEX_RETRY_INTERVAL = 30.0
+
+    def __init__(self, es=None, async_es=None):
+        # Clients default to the shared ones from app.search.client; tests and benchmarks
+        # pass the in-process fake from tests/fixtures/fake_elasticsearch.py instead
+        self._es = es or es_client
+        self._async_es = async_es
+        self._layout_cache: tuple[float, IndexLayout] | None = None
+        self._outbox_dispatcher = OutboxDispatcher(
+            SessionLocal, self.dispatch_outbox, settings.SEARCH_OUTBOX_POLL_INTERVAL,
+            linger=settings.SEARCH_BULK_FLUSH_INTERVAL,
+        )
+        self._cache = SearchResultCache(settings.SEARCH_CACHE_MAX_ENTRIES, settings.SEARCH_CACHE_TTL)
+        self._fallback = FallbackSearchIndex(
+            self._load_fallback_documents, settings.SEARCH_FALLBACK_MAX_DOCUMENTS, settings.SEARCH_FALLBACK_TTL
+        )
+        self._index_ready = False
+        self._bulk_buffer = BulkBuffer(
+            self._send_bulk,
+            max_operations=settings.SEARCH_BULK_MAX_OPERATIONS,
+            flush_interval=settings.SEARCH_BULK_FLUSH_INTERVAL,
+            max_pending=settings.SEARCH_BULK_MAX_PENDING,
+        )
+        self._drift_check = PeriodicDriftCheck(
+            DriftChecker(self, self._es, SessionLocal, settings.SEARCH_DRIFT_CHUNK_SIZE),
+            SessionLocal,
+            settings.SEARCH_DRIFT_CHECK_INTERVAL,
+        )
+        self._index_retry_at = 0.0
+        self._breaker = CircuitBreaker(
+            settings.SEARCH_BREAKER_FAILURE_THRESHOLD, settings.SEARCH_BREAKER_RESET_TIMEOUT, self._trips_breaker
+        )
+        self._degradation = DegradationController(
+            settings.SEARCH_DEGRADE_LATENCY, settings.SEARCH_DEGRADE_IN_FLIGHT, settings.SEARCH_DEGRADE_COOLDOWN
+        )
+
+    def index_definition(self) -> dict:
         """
-        Creates the search index with advanced mappings if it doesn't exist.
+        Returns the settings and mappings every new search index is created with.
         """
-        if not es_client.indices.exists(index=self.INDEX_NAME):
-            settings = {
-                "analysis": {
-                    "char_filter": {
-                        "whitespace_remove_filter": {
-                            "type": "pattern_replace",
-                            "pattern": "\\s+",
-                            "replacement": ""
-                        }
+        settings = {
+            "analysis": {
+                "char_filter": {
+                    "whitespace_remove_filter": {
+                        "type": "pattern_replace",
+                        "pattern": "\\s+",
+                        "replacement": ""
                     },
-                    "analyzer": {
-                        "autocomplete_analyzer": {
-                            "tokenizer": "autocomplete_tokenizer",
-                            "filter": ["lowercase"]
-                        },
-                        "whitespace_remove_analyzer": {
-                            "tokenizer": "standard",
-                            "filter": ["lowercase"],
-                            "char_filter": ["whitespace_remove_filter"]
-                        }
+                    "non_digit_remove_filter": {
+                        "type": "pattern_replace",
+                        "pattern": "[^0-9]",
+                        "replacement": ""
                     },
-                    "tokenizer": {
-                        "autocomplete_tokenizer": {
-                            "type": "edge_ngram",
-                            "min_gram": 2,
-                            "max_gram": 20,
-                            "token_chars": ["letter", "digit"]
-                        }
+                    "plate_separator_remove_filter": {
+                        "type": "pattern_replace",
+                        "pattern": "[\\s\\-]+",
+                        "replacement": ""
+                    }
+                },
+                "normalizer": {
+                    "digits_normalizer": {
+                        "type": "custom",
+                        "char_filter": ["non_digit_remove_filter"]
+                    },
+                    "plate_normalizer": {
+                        "type": "custom",
+                        "char_filter": ["plate_separator_remove_filter"],
+                        "filter": ["uppercase"]
+                    },
+                    "lowercase_normalizer": {
+                        "type": "custom",
+                        "filter": ["lowercase", "asciifolding"]
+                    }
+                },
+                "analyzer": {
+                    "autocomplete_analyzer": {
+                        "tokenizer": "autocomplete_tokenizer",
+                        "filter": ["lowercase"]
+                    },
+                    "whitespace_remove_analyzer": {
+                        "tokenizer": "standard",
+                        "filter": ["lowercase"],
+                        "char_filter": ["whitespace_remove_filter"]
+                    }
+                },
+                "tokenizer": {
+                    "autocomplete_tokenizer": {
+                        "type": "edge_ngram",
+                        "min_gram": 2,
+                        "max_gram": 20,
+                        "token_chars": ["letter", "digit"]
                     }
                 }
             }
-            mappings = {
-                "properties": {
-                    "type": {"type": "keyword"},
-                    "mechanic_id": {"type": "integer"},
-                    "name": {
-                        "type": "text",
-                        "fields": {
-                            "autocomplete": {
-                                "type": "text",
-                                "analyzer": "autocomplete_analyzer",
-                                "search_analyzer": "standard"
-                            },
-                            "no_whitespace": {
-                                "type": "text",
-                                "analyzer": "whitespace_remove_analyzer"
-                            }
+        }
+        mappings = {
+            # Documents live on the shard of their mechanic, so a search only hits that shard
+            "_meta": ROUTING_META,
+            "_routing": {"required": True},
+            "properties": {
+                "id": {"type": "integer"},
+                "type": {"type": "keyword"},
+                "mechanic_id": {"type": "integer"},
+                # Names, phones and VINs for the cheap prefix-only /search/suggest query
+                "suggest": {"type": "search_as_you_type"},
+                "name": {
+                    "type": "text",
+                    "copy_to": "suggest",
+                    "fields": {
+                        "autocomplete": {
+                            "type": "text",
+                            "analyzer": "autocomplete_analyzer",
+                            "search_analyzer": "standard"
+                        },
+                        "no_whitespace": {
+                            "type": "text",
+                            "analyzer": "whitespace_remove_analyzer"
                         }
-                    },
-                    "phone": {"type": "keyword"},
-                    "vin": {"type": "keyword"},
-                    "client_id": {"type": "integer"},
-                    "client_name": {
-                        "type": "text",
-                        "fields": {
-                            "autocomplete": {
-                                "type": "text",
-                                "analyzer": "autocomplete_analyzer",
-                                "search_analyzer": "standard"
-                            }
+                    }
+                },
+                # Checksum of the other fields, compared per chunk by the drift checker
+                CHECKSUM_FIELD: {"type": "long", "index": False},
+                "phone": {
+                    "type": "keyword",
+                    "copy_to": "suggest",
+                    # "+48 511-222-333" -> "48511222333", for the exact phone lookup
+                    "fields": {"digits": {"type": "keyword", "normalizer": "digits_normalizer"}}
+                },
+                "vin": {"type": "keyword", "copy_to": "suggest"},
+                # "wa 123-45" and "WA12345" are the same plate
+                "registration_number": {"type": "keyword", "normalizer": "plate_normalizer"},
+                # Exact make/model values for term and prefix queries; `name` covers free text
+                "mark": {"type": "keyword", "normalizer": "lowercase_normalizer"},
+                "model": {"type": "keyword", "normalizer": "lowercase_normalizer"},
+                "client_id": {"type": "integer"},
+                "client_name": {
+                    "type": "text",
+                    "fields": {
+                        "autocomplete": {
+                            "type": "text",
+                            "analyzer": "autocomplete_analyzer",
+                            "search_analyzer": "standard"
                         }
-                    },
-                    "client_last_name": {
-                        "type": "text",
-                        "fields": {
-                            "autocomplete": {
-                                "type": "text",
-                                "analyzer": "autocomplete_analyzer",
-                                "search_analyzer": "standard"
-                            }
+                    }
+                },
+                "client_last_name": {
+                    "type": "text",
+                    "fields": {
+                        "autocomplete": {
+                            "type": "text",
+                            "analyzer": "autocomplete_analyzer",
+                            "search_analyzer": "standard"
                         }
                     }
                 }
             }
-            es_client.indices.create(
-                index=self.INDEX_NAME,
-                body={"settings": settings, "mappings": mappings}
+        }
+        return {"settings": settings, "mappings": mappings}
+
+    def create_index_if_not_exists(self):
+        """
+        Creates the first versioned search index behind the alias if neither exists.
+        """
+        if not self._es.indices.exists(index=self.INDEX_NAME):
+            self.create_versioned_index(alias=self.INDEX_NAME)
+
+    def ensure_index(self) -> bool:
+        """
+        Like `create_index_if_not_exists`, but never raises: while Elasticsearch is
+        unreachable it retries at most every INDEX_RETRY_INTERVAL seconds.
+        """
+        if self._index_ready:
+            return True
+        now = time.monotonic()
+        if now < self._index_retry_at:
+            return False
+        try:
+            self.create_index_if_not_exists()
+        except Exception as e:
+            logger.warning("Search index is not available yet: %r", e)
+            self._index_retry_at = now + self.INDEX_RETRY_INTERVAL
+            return False
+        self._index_ready = True
+        return True
+
+    @instrumented("create_index")
+    def create_versioned_index(self, alias: str, family: str = INDEX_NAME) -> str:
+        """
+        Creates a new timestamped index with the current mappings, pointed to by `alias`.
+
+        `family` is the alias the index will eventually serve: the shared INDEX_NAME or a
+        tenant's dedicated alias.
+        """
+        index_name = f"{family}-{datetime.utcnow():{self.INDEX_VERSION_FORMAT}}"
+        body = self.index_definition()
+        body["aliases"] = {alias: {}}
+        self._es.indices.create(index=index_name, body=body)
+        self._layout_cache = None
+        return index_name
+
+    def begin_rebuild(self, family: str = INDEX_NAME) -> str:
+        """
+        Creates the index a reindex will fill and starts mirroring live writes into it.
+
+        Writes keep going to the alias and are also sent to the pending index, so changes
+        made while the rebuild runs are not lost when the alias is swapped.
+        """
+        return self.create_versioned_index(alias=family + self.PENDING_SUFFIX, family=family)
+
+    def abort_rebuild(self, index_name: str):
+        self._es.indices.delete(index=index_name, ignore=[404])
+        self._layout_cache = None
+
+    def swap_alias(self, index_name: str, family: str = INDEX_NAME, end_mirroring: bool = True):
+        """
+        Atomically points the `family` alias at `index_name` and, unless told otherwise,
+        ends write mirroring.
+        """
+        actions = []
+        if self._es.indices.exists_alias(name=family):
+            for old_index in self._es.indices.get_alias(name=family):
+                actions.append({"remove": {"index": old_index, "alias": family}})
+        elif self._es.indices.exists(index=family):
+            # Pre-alias deployments have a concrete index under the alias name
+            actions.append({"remove_index": {"index": family}})
+        if end_mirroring and index_name in self._alias_indices(family + self.PENDING_SUFFIX):
+            actions.append({"remove": {"index": index_name, "alias": family + self.PENDING_SUFFIX}})
+        actions.append({"add": {"index": index_name, "alias": family}})
+        self._es.indices.update_aliases(actions=actions)
+        self._layout_cache = None
+
+    def end_mirroring(self, index_name: str, family: str = INDEX_NAME):
+        if index_name in self._alias_indices(family + self.PENDING_SUFFIX):
+            self._es.indices.update_aliases(
+                actions=[{"remove": {"index": index_name, "alias": family + self.PENDING_SUFFIX}}]
             )
+        self._layout_cache = None
+
+    def garbage_collect_indices(self, keep: int = 1, family: str = INDEX_NAME) -> list[str]:
+        """
+        Deletes versioned indices of `family` that are no longer behind an alias.
+
+        The `keep` most recent ones are left in place so a swap can be rolled back.
+        """
+        live = set(self._alias_indices(family)) | set(self._alias_indices(family + self.PENDING_SUFFIX))
+        # Indices created before microseconds were added to the name have 14 digits
+        versioned_index = re.compile(rf"{re.escape(family)}-\d{{14}}(\d{{6}})?")
+        versioned = sorted(
+            (name for name in self._es.indices.get(index=f"{family}-*")
+             if versioned_index.fullmatch(name) and name not in live),
+            reverse=True,
+        )
+        stale = versioned[keep:]
+        for name in stale:
+            self._es.indices.delete(index=name, ignore=[404])
+        return stale
+
+    def tenant_alias(self, mechanic_id: int) -> str:
+        return self.TENANT_ALIAS_FORMAT.format(mechanic_id=mechanic_id)
+
+    def has_dedicated_index(self, mechanic_id: int) -> bool:
+        return bool(self._es.indices.exists_alias(name=self.tenant_alias(mechanic_id)))
+
+    def dedicated_tenants(self) -> set[int]:
+        """
+        Mechanics whose documents are searched in a dedicated index, not the shared one.
+        """
+        matches = (self._TENANT_ALIAS.fullmatch(alias) for alias in self._layout().aliases)
+        return {int(match.group(1)) for match in matches if match}
+
+    def remove_tenant_from_shared_index(self, mechanic_id: int):
+        """
+        Deletes a tenant's documents from the shared index once it has a dedicated one.
+        """
+        self._es.delete_by_query(
+            index=self.INDEX_NAME,
+            body={"query": {"term": {"mechanic_id": mechanic_id}}},
+            routing=routing_for(self._layout(), self.INDEX_NAME, mechanic_id),
+            conflicts="proceed",
+            ignore=[404],
+        )
+
+    def drift_scope(self, mechanic_id: int | None = None) -> tuple[str, str | None]:
+        """
+        Index expression and routing covering the live documents of one mechanic, or of
+        everyone: the shared alias plus every dedicated tenant alias.
+        """
+        layout = self._layout()
+        if mechanic_id is not None:
+            return self._read_target(layout, mechanic_id)
+        tenants = sorted(alias for alias in layout.aliases if self._TENANT_ALIAS.fullmatch(alias))
+        return ",".join([self.INDEX_NAME, *tenants]), None
+
+    def home_indices(self, mechanic_id: int) -> set[str]:
+        """
+        The indices a mechanic's documents are searched in.
+        """
+        layout = self._layout()
+        family, _ = self._read_target(layout, mechanic_id)
+        return set(layout.aliases.get(family, [family]))
+
+    def routing(self, index: str, mechanic_id: int) -> str | None:
+        return routing_for(self._layout(), index, mechanic_id)
 
-    def index_client(self, client: Clients):
+    def _alias_indices(self, alias: str) -> list[str]:
+        try:
+            return list(self._es.indices.get_alias(name=alias))
+        except NotFoundError:
+            return []
+
+    def _layout(self) -> IndexLayout:
+        """
+        Aliases and routing of all search indices; cached for PENDING_ALIAS_TTL seconds.
+        """
+        if not self._layout_is_fresh():
+            with self._breaker.guard():
+                response = self._es.options(request_timeout=settings.SEARCH_WRITE_TIMEOUT).indices.get(
+                    index=f"{self.INDEX_NAME}*", filter_path=self.LAYOUT_FILTER_PATH
+                )
+            self._layout_cache = (time.monotonic(), parse_layout(response))
+        return self._layout_cache[1]
+
+    async def _layout_async(self) -> IndexLayout:
+        if not self._layout_is_fresh():
+            with self._breaker.guard():
+                response = await self._async_client().options(
+                    request_timeout=settings.SEARCH_REQUEST_TIMEOUT
+                ).indices.get(index=f"{self.INDEX_NAME}*", filter_path=self.LAYOUT_FILTER_PATH)
+            self._layout_cache = (time.monotonic(), parse_layout(response))
+        return self._layout_cache[1]
+
+    def _layout_is_fresh(self) -> bool:
+        return (self._layout_cache is not None
+                and time.monotonic() - self._layout_cache[0] <= self.PENDING_ALIAS_TTL)
+
+    def _read_target(self, layout: IndexLayout, mechanic_id: int) -> tuple[str, str | None]:
+        return read_target(layout, self.INDEX_NAME, self.tenant_alias(mechanic_id), mechanic_id)
+
+    def _write_targets(self, mechanic_id: int) -> list[tuple[str, str | None]]:
+        return write_targets(
+            self._layout(), self.INDEX_NAME, self.tenant_alias(mechanic_id), mechanic_id, self.PENDING_SUFFIX
+        )
+
+    def client_document(self, client: Clients) -> dict:
+        """
+        Builds the search document for a client (shared by single and bulk indexing).
+        """
         doc = ElasticSearchEntry(
             id=client.id,
             type="client",
@@ -97,113 +446,828 @@ class SearchService:
             name=f"{client.name} {client.last_name}",
             phone=client.phone,
         )
-        es_client.index(
-            index=self.INDEX_NAME,
-            id=f"client-{client.id}",
-            document=doc.dict(exclude_none=True)
-        )
-
+        return self._with_checksum(doc.dict(exclude_none=True))
 
-    def index_vehicle(self, vehicle: Vehicles):
+    def vehicle_document(self, vehicle: Vehicles) -> dict:
+        """
+        Builds the search document for a vehicle (shared by single and bulk indexing).
+        """
         if not vehicle.client:
             raise ValueError("Vehicle must have a client to be indexed.")
-            
+
         doc = ElasticSearchEntry(
             id=vehicle.id,
             type="vehicle",
             mechanic_id=vehicle.mechanic_id,
             name=f"{vehicle.mark} {vehicle.model}",
             vin=vehicle.vin,
+            mark=vehicle.mark,
+            model=vehicle.model,
+            registration_number=vehicle.registration_number,
             client_id=vehicle.client_id,
             client_name=vehicle.client.name,
             client_last_name=vehicle.client.last_name
         )
-        es_client.index(
-            index=self.INDEX_NAME,
-            id=f"vehicle-{vehicle.id}",
-            document=doc.dict(exclude_none=True)
+        return self._with_checksum(doc.dict(exclude_none=True))
+
+    @staticmethod
+    def _with_checksum(document: dict) -> dict:
+        document[CHECKSUM_FIELD] = document_checksum(document)
+        return document
+
+    @instrumented("delete")
+    def delete_document(self, doc_id: str, mechanic_id: int):
+        self._fallback.remove(mechanic_id, doc_id)
+        self._buffer_write(doc_id, mechanic_id, None)
+
+    def _buffer_write(self, doc_id: str, mechanic_id: int, document: dict | None):
+        """
+        Queues the write for the next micro-batch; blocks while the buffer is full and
+        raises queue.Full if it stays full for SEARCH_BULK_ENQUEUE_TIMEOUT seconds.
+        """
+        self._bulk_buffer.add(
+            [self._pending_write(doc_id, mechanic_id, document)], mechanic_id,
+            timeout=settings.SEARCH_BULK_ENQUEUE_TIMEOUT,
         )
+        self._cache.invalidate(mechanic_id)
 
-    def delete_document(self, doc_id: str):
-        es_client.delete(index=self.INDEX_NAME, id=doc_id, ignore=[404])
+    @staticmethod
+    def _pending_write(doc_id: str, mechanic_id: int, document: dict | None) -> dict:
+        """
+        A buffered write. Its indices are only looked up when the batch is sent (see
+        _send_bulk), so request threads never wait on Elasticsearch for the layout.
+        """
+        if document is None:
+            return {"_op_type": "delete", "_id": doc_id, "mechanic_id": mechanic_id}
+        return {"_id": doc_id, "mechanic_id": mechanic_id, "_source": document}
 
-    def delete_client_and_vehicles(self, client_id: int):
+    @instrumented("bulk_flush")
+    def _send_bulk(self, writes: list[dict], mechanic_ids: set[int]):
+        """
+        Sends a batch of buffered writes from the flush thread. Writes that fail, or the
+        whole batch if Elasticsearch cannot be reached, go to the search outbox; its
+        dispatcher re-reads each entity and deletes the documents of those that are gone.
+        """
+        failed = set()
+        try:
+            actions = []
+            for write in writes:
+                actions += self.bulk_actions(write["_id"], write["mechanic_id"], write.get("_source"))
+            with self._breaker.guard():
+                _, failures = helpers.bulk(
+                    self._es.options(request_timeout=settings.SEARCH_WRITE_TIMEOUT), actions,
+                    raise_on_error=False, raise_on_exception=False,
+                )
+            for failure in failures:
+                op_type, result = next(iter(failure.items()))
+                if not (op_type == "delete" and result.get("status") == 404):
+                    logger.error("Failed to write search document %s: %s", result.get("_id"), result.get("error"))
+                    failed.add(result["_id"])
+        except Exception as e:
+            logger.warning("Sending %d buffered search writes failed, queueing them in the outbox: %s",
+                           len(writes), e)
+            failed = {write["_id"] for write in writes}
+        if failed:
+            self._queue_in_outbox([write for write in writes if write["_id"] in failed])
+        for write in writes:
+            if "vehicle_ids" in write and write["_id"] not in failed:
+                try:
+                    self._remove_stale_vehicles(write["_id"], write["mechanic_id"], write["vehicle_ids"])
+                except Exception:
+                    # Left for the drift check, like any other stale document
+                    logger.exception("Failed to look for stale vehicles of %s", write["_id"])
+        # Results cached while the writes were buffered are stale now
+        for mechanic_id in mechanic_ids:
+            self._cache.invalidate(mechanic_id)
+
+    @staticmethod
+    def _queue_in_outbox(writes: list[dict]):
+        db = SessionLocal()
+        try:
+            for write in writes:
+                entity_type, entity_id = write["_id"].split("-", 1)
+                db.add(SearchOutbox(entity_type=entity_type, entity_id=int(entity_id),
+                                    mechanic_id=write["mechanic_id"]))
+            db.commit()
+        except Exception:
+            logger.exception("Could not queue %d failed search writes; the drift check repairs them", len(writes))
+            db.rollback()
+        finally:
+            db.close()
+
+    def start_bulk_buffer(self):
+        self._bulk_buffer.start()
+
+    def stop_bulk_buffer(self):
+        """
+        Sends the buffered writes; call on shutdown.
+        """
+        self._bulk_buffer.stop()
+
+    @instrumented("delete_client")
+    def delete_client_and_vehicles(self, client_id: int, mechanic_id: int, vehicle_ids: list[int]):
         """
         Deletes a client and all their vehicles from Elasticsearch index.
+
+        `vehicle_ids` are the vehicles the database deleted along with the client; they go
+        out with the client in one `_bulk` request. Vehicle documents that still point at
+        the client after that (e.g. from a delete that was lost) are removed by a
+        delete_by_query task that runs in the background, and only if there are any.
+        Nothing here waits on Elasticsearch; it all happens when the buffer is flushed.
         """
-        # Delete the client document
-        es_client.delete(index=self.INDEX_NAME, id=f"client-{client_id}", ignore=[404])
-        
-        # Delete all vehicles belonging to this client
-        delete_query = {
-            "query": {
-                "term": {
-                    "client_id": client_id
-                }
+        client_doc_id = f"client-{client_id}"
+        self._fallback.remove(mechanic_id, client_doc_id)
+        self._fallback.remove_client_vehicles(mechanic_id, client_id)
+        client_write = self._pending_write(client_doc_id, mechanic_id, None)
+        client_write["vehicle_ids"] = list(vehicle_ids)
+        writes = [client_write, *(self._pending_write(f"vehicle-{vehicle_id}", mechanic_id, None)
+                                  for vehicle_id in vehicle_ids)]
+        self._bulk_buffer.add(writes, mechanic_id, timeout=settings.SEARCH_BULK_ENQUEUE_TIMEOUT)
+        self._cache.invalidate(mechanic_id)
+
+    def _remove_stale_vehicles(self, client_doc_id: str, mechanic_id: int, vehicle_ids: list[int]):
+        client_id = int(client_doc_id.split("-", 1)[1])
+        stragglers = {
+            "bool": {
+                "filter": [{"term": {"type": "vehicle"}}, {"term": {"client_id": client_id}}],
+                "must_not": [{"ids": {"values": [f"vehicle-{vehicle_id}" for vehicle_id in vehicle_ids]}}],
             }
         }
-        es_client.delete_by_query(index=self.INDEX_NAME, body=delete_query, ignore=[404])
+        client = self._es.options(request_timeout=settings.SEARCH_WRITE_TIMEOUT)
+        for index, routing in self._write_targets(mechanic_id):
+            try:
+                with self._breaker.guard():
+                    found = client.count(index=index, query=stragglers, routing=routing)["count"]
+            except NotFoundError:
+                continue
+            if found:
+                logger.warning("Removing %d stale vehicle documents of deleted client %s from %s",
+                               found, client_id, index)
+                with self._breaker.guard():
+                    client.delete_by_query(
+                        index=index, query=stragglers, routing=routing, conflicts="proceed",
+                        wait_for_completion=False,
+                    )
 
-    def delete_vehicle_and_repairs(self, vehicle_id: int):
+    def delete_vehicle_and_repairs(self, vehicle_id: int, mechanic_id: int):
         """
         Deletes a vehicle from Elasticsearch index.
         """
-        es_client.delete(index=self.INDEX_NAME, id=f"vehicle-{vehicle_id}", ignore=[404])
+        self.delete_document(f"vehicle-{vehicle_id}", mechanic_id)
+
+    def bulk_actions(self, doc_id: str, mechanic_id: int, document: dict | None,
+                     partial: bool = False) -> list[dict]:
+        """
+        `_bulk` actions that write `document` to every index it belongs in, or delete it
+        there when `document` is None. With `partial`, `document` holds only some fields
+        and is merged into the stored document instead of replacing it.
+        """
+        actions = []
+        for index, routing in self._write_targets(mechanic_id):
+            if document is not None and partial:
+                action = {"_op_type": "update", "_index": index, "_id": doc_id, "doc": document,
+                          "retry_on_conflict": 3}
+            elif document is not None:
+                action = {"_index": index, "_id": doc_id, "_source": document}
+            else:
+                action = {"_op_type": "delete", "_index": index, "_id": doc_id}
+            if routing:
+                action["_routing"] = routing
+            actions.append(action)
+        return actions
+
+    def start_outbox_dispatcher(self):
+        self._outbox_dispatcher.start()
+
+    def stop_outbox_dispatcher(self):
+        self._outbox_dispatcher.stop()
+
+    def start_drift_check(self):
+        """
+        Starts the periodic drift check, unless SEARCH_DRIFT_CHECK_INTERVAL is 0.
+        """
+        self._drift_check.start()
+
+    def stop_drift_check(self):
+        self._drift_check.stop()
+
+    @instrumented("dispatch_outbox")
+    def dispatch_outbox(self, db: Session) -> int:
+        """
+        Sends one batch of search outbox rows to Elasticsearch in a single `_bulk` request.
+
+        Each entity is re-read from the database, so several queued changes collapse into
+        one up-to-date document, and an entity that no longer exists is deleted instead.
+        Failed rows are retried with exponential backoff. Returns the number of rows handled.
+        While the circuit breaker is open, rows are left alone instead of using up attempts.
+        """
+        if self._breaker.state == OPEN or not self.ensure_index():
+            return 0
+        now = datetime.utcnow()
+        rows = (
+            db.query(SearchOutbox)
+            .filter(SearchOutbox.available_at <= now)
+            .order_by(SearchOutbox.id)
+            .limit(settings.SEARCH_OUTBOX_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not rows:
+            return 0
+
+        rows_by_doc: dict[str, list[SearchOutbox]] = {}
+        for row in rows:
+            rows_by_doc.setdefault(f"{row.entity_type}-{row.entity_id}", []).append(row)
+
+        documents = self._load_outbox_documents(db, rows)
+        # The fallback index follows the database, whether or not Elasticsearch takes the batch
+        for doc_id, doc_rows in rows_by_doc.items():
+            if doc_id in documents:
+                self._fallback.upsert(documents[doc_id])
+            else:
+                self._fallback.remove(doc_rows[0].mechanic_id, doc_id)
+        actions = []
+        for doc_id, doc_rows in rows_by_doc.items():
+            actions += self.bulk_actions(doc_id, doc_rows[0].mechanic_id, documents.get(doc_id))
+        # Vehicle documents copy their client's name, so they are updated along with the client
+        owners = {}
+        for vehicle_id, (owner_id, vehicle_document) in self._owner_updates(db, documents, rows_by_doc).items():
+            owners[vehicle_id] = owner_id
+            self._fallback.upsert(vehicle_document)
+            partial = {field: vehicle_document[field] for field in self.OWNER_FIELDS if field in vehicle_document}
+            actions += self.bulk_actions(vehicle_id, vehicle_document["mechanic_id"], partial, partial=True)
+
+        errors: dict[str, str] = {}
+        try:
+            with self._breaker.guard():
+                _, failures = helpers.bulk(
+                    self._es.options(request_timeout=settings.SEARCH_WRITE_TIMEOUT), actions,
+                    raise_on_error=False, raise_on_exception=False,
+                )
+            for failure in failures:
+                op_type, result = next(iter(failure.items()))
+                # Deleting a document that was never indexed is not an error, and neither is
+                # updating one: its own outbox row or the drift check will index it in full
+                if op_type in ("delete", "update") and result.get("status") == 404:
+                    continue
+                doc_id = owners.get(result["_id"], result["_id"])
+                errors[doc_id] = str(result.get("error") or result.get("status"))
+        except CircuitOpenError:
+            # Another caller is probing Elasticsearch; the rows are picked up again later
+            db.rollback()
+            return 0
+        except Exception as e:
+            errors = {doc_id: repr(e) for doc_id in rows_by_doc}
+
+        for doc_id, doc_rows in rows_by_doc.items():
+            if doc_id not in errors:
+                OUTBOX_DISPATCHED.inc(len(doc_rows))
+                for row in doc_rows:
+                    self._cache.invalidate(row.mechanic_id)
+                    db.delete(row)
+                continue
+            OUTBOX_FAILED.inc(len(doc_rows))
+            for row in doc_rows:
+                row.attempts += 1
+                row.last_error = errors[doc_id][:1000]
+                if row.attempts >= settings.SEARCH_OUTBOX_MAX_ATTEMPTS:
+                    logger.error("Giving up on search outbox row %s for %s: %s", row.id, doc_id, row.last_error)
+                    db.delete(row)
+                else:
+                    row.available_at = now + min(timedelta(seconds=2 ** row.attempts), self.OUTBOX_MAX_BACKOFF)
+        db.commit()
+        return len(rows)
+
+    def _load_outbox_documents(self, db: Session, rows: list[SearchOutbox]) -> dict[str, dict]:
+        ids = {"client": set(), "vehicle": set()}
+        for row in rows:
+            ids[row.entity_type].add(row.entity_id)
+
+        documents = {}
+        if ids["client"]:
+            for client in db.query(Clients).filter(Clients.id.in_(ids["client"])):
+                documents[f"client-{client.id}"] = self.client_document(client)
+        if ids["vehicle"]:
+            vehicles = (
+                db.query(Vehicles)
+                .options(joinedload(Vehicles.client))
+                .filter(Vehicles.id.in_(ids["vehicle"]))
+            )
+            for vehicle in vehicles:
+                documents[f"vehicle-{vehicle.id}"] = self.vehicle_document(vehicle)
+        return documents
+
+    def _owner_updates(self, db: Session, documents: dict[str, dict],
+                       rows_by_doc: dict[str, list[SearchOutbox]]) -> dict[str, tuple[str, dict]]:
+        """
+        Fresh documents for the vehicles of the changed clients in an outbox batch, as
+        vehicle doc id -> (client doc id, document). Vehicles in the batch themselves are
+        left out, they are re-indexed in full anyway.
+
+        One query for the whole batch; the clients are already in the session, so building
+        the documents does not load them again. Unchanged names make the partial updates
+        no-ops in Elasticsearch (detect_noop).
+        """
+        client_ids = [
+            row.entity_id for doc_id, doc_rows in rows_by_doc.items()
+            for row in doc_rows[:1] if row.entity_type == "client" and doc_id in documents
+        ]
+        if not client_ids:
+            return {}
+        updates = {}
+        for vehicle in db.query(Vehicles).filter(Vehicles.client_id.in_(client_ids)).order_by(Vehicles.id):
+            doc_id = f"vehicle-{vehicle.id}"
+            if doc_id not in rows_by_doc:
+                updates[doc_id] = (f"client-{vehicle.client_id}", self.vehicle_document(vehicle))
+        return updates
+
+    @instrumented("search")
+    async def search(self, query: str, mechanic_id: int, size: int = DEFAULT_PAGE_SIZE,
+                     cursor: str | None = None, doc_type: str | None = None,
+                     hydrate: bool = False) -> SearchPage:
+        """
+        Returns one page of results; pass the page's `next_cursor` back to get the next one.
+
+        Pages are fetched with `search_after`, so every page costs the same as the first.
+        Uses the async client, so searches wait on the event loop instead of a worker thread.
+        With `hydrate`, each result also carries the full client or vehicle record from the
+        database (see _hydrate). Raises ValueError for a malformed cursor.
+        """
+        page = await self._search_page(query, mechanic_id, size, cursor, doc_type)
+        if hydrate and page.results:
+            # Reads the database, so keep it off the event loop
+            page = await asyncio.to_thread(self._hydrate, page, mechanic_id)
+        return page
 
-    def search(self, query: str, mechanic_id: int) -> list[SearchResult]:
+    async def _search_page(self, query: str, mechanic_id: int, size: int,
+                           cursor: str | None, doc_type: str | None) -> SearchPage:
+        if not query:
+            return SearchPage(results=[])
+
+        after = decode_cursor(cursor) if cursor else None
+        size = max(1, min(size, self.MAX_PAGE_SIZE))
+        # A page planned under load is cheaper and shorter; it must not outlive the load
+        level = self._degradation.level
+        cache_key = (normalize_query(query), size, cursor, doc_type, level)
+        cached = self._cache.get(mechanic_id, cache_key)
+        if cached is not None:
+            return cached
+        generation = self._cache.generation(mechanic_id)
+
+        shape = classify(query)
+        QUERY_SHAPES.labels(shape=shape.kind).inc()
+        # A plate-shaped query whose first page ran as text stays text on the next pages
+        as_text = bool(after and after.as_text)
+        size, search_body = self._plan_search(
+            QueryShape(TEXT, query) if as_text else shape, mechanic_id, size, after, doc_type, level
+        )
+        try:
+            index, routing = self._read_target(await self._layout_async(), mechanic_id)
+            response = await self._timed_search("search", index, search_body, routing)
+            if retry_as_text(shape, after, response["hits"]["hits"]):
+                as_text = True
+                _, search_body = self._plan_search(QueryShape(TEXT, query), mechanic_id, size, after, doc_type,
+                                                   level)
+                response = await self._timed_search("search", index, search_body, routing)
+        except (TransportError, ApiError, CircuitOpenError) as e:
+            if not self._should_fall_back(e):
+                raise
+            # Fallback pages are not cached, so results come from ES again once it is back
+            logger.warning("Elasticsearch search failed, using the fallback index: %s", e)
+            # Loading a tenant reads the database, so keep it off the event loop
+            return await asyncio.to_thread(
+                self._fallback_search, query, mechanic_id, size, after, doc_type, after is None,
+            )
+        page = self._parse_search_response(response, size, as_text)
+        # A search cut short by the `timeout` budget has partial results; try again next time
+        if not response.get("timed_out"):
+            self._cache.put(mechanic_id, cache_key, page, generation)
+        return page
+
+    @instrumented("suggest")
+    async def suggest(self, query: str, mechanic_id: int, size: int = DEFAULT_SUGGEST_SIZE,
+                      doc_type: str | None = None) -> list[SearchSuggestion]:
+        """
+        Typeahead: matches the query as a prefix of names, phones and VINs, without the
+        fuzzy multi-field query `search` runs.
+        """
         if not query:
             return []
 
-        search_body = {
+        size = max(1, min(size, self.MAX_SUGGEST_SIZE))
+        level = self._degradation.level
+        cache_key = ("suggest", normalize_query(query), size, doc_type, level)
+        cached = self._cache.get(mechanic_id, cache_key)
+        if cached is not None:
+            return cached
+        generation = self._cache.generation(mechanic_id)
+
+        size, suggest_body = self._plan_suggest(query, mechanic_id, size, doc_type, level)
+        try:
+            index, routing = self._read_target(await self._layout_async(), mechanic_id)
+            response = await self._timed_search("suggest", index, suggest_body, routing)
+        except (TransportError, ApiError, CircuitOpenError) as e:
+            if not self._should_fall_back(e):
+                raise
+            logger.warning("Elasticsearch suggest failed, using the fallback index: %s", e)
+            return await asyncio.to_thread(self._fallback_suggest, query, mechanic_id, size, doc_type)
+        suggestions = self._parse_suggest_response(response)
+        if not response.get("timed_out"):
+            self._cache.put(mechanic_id, cache_key, suggestions, generation)
+        return suggestions
+
+    @instrumented("multi_search")
+    async def multi_search(self, queries: list[SearchQuery], mechanic_id: int) -> list[SearchPage]:
+        """
+        Runs several searches and suggests in one `_msearch` round trip, e.g. the client
+        and vehicle lists of the search screen.
+
+        Each query keeps its own type filter, size and cursor, and shares the result cache
+        with `search` and `suggest`; only the ones not cached are sent. Returns one page per
+        query, in order; a suggest page holds the suggestions and no cursor. Raises
+        ValueError for a malformed cursor or a query Elasticsearch rejects.
+        """
+        pages: list[SearchPage | None] = [None] * len(queries)
+        # (position, cache key, cache generation, page size, shape or None for a suggest, cursor, body)
+        pending = []
+        level = self._degradation.level
+        for position, item in enumerate(queries):
+            if not item.q:
+                pages[position] = SearchPage(results=[])
+                continue
+            if item.kind == "suggest":
+                size = max(1, min(item.size or self.DEFAULT_SUGGEST_SIZE, self.MAX_SUGGEST_SIZE))
+                cache_key = ("suggest", normalize_query(item.q), size, item.type, level)
+            else:
+                size = max(1, min(item.size or self.DEFAULT_PAGE_SIZE, self.MAX_PAGE_SIZE))
+                cache_key = (normalize_query(item.q), size, item.cursor, item.type, level)
+            cached = self._cache.get(mechanic_id, cache_key)
+            if cached is not None:
+                pages[position] = self._as_page(cached)
+                continue
+            generation = self._cache.generation(mechanic_id)
+            after = None
+            if item.kind == "suggest":
+                shape = None
+                size, body = self._plan_suggest(item.q, mechanic_id, size, item.type, level)
+            else:
+                after = decode_cursor(item.cursor) if item.cursor else None
+                shape = classify(item.q)
+                QUERY_SHAPES.labels(shape=shape.kind).inc()
+                planned = QueryShape(TEXT, item.q) if after and after.as_text else shape
+                size, body = self._plan_search(planned, mechanic_id, size, after, item.type, level)
+            pending.append((position, cache_key, generation, size, shape, after, body))
+        if not pending:
+            return pages
+
+        retries = []
+        try:
+            index, routing = self._read_target(await self._layout_async(), mechanic_id)
+            responses = await self._timed_msearch(index, routing, [entry[-1] for entry in pending])
+            # Plate lookups that found nothing go out once more as text, together
+            bodies = []
+            for i, (position, _, _, size, shape, after, _) in enumerate(pending):
+                item = queries[position]
+                if (shape and "error" not in responses[i]
+                        and retry_as_text(shape, after, responses[i]["hits"]["hits"])):
+                    retries.append(i)
+                    bodies.append(
+                        self._plan_search(QueryShape(TEXT, item.q), mechanic_id, size, None, item.type, level)[1]
+                    )
+            if retries:
+                for i, response in zip(retries, await self._timed_msearch(index, routing, bodies)):
+                    responses[i] = response
+        except (TransportError, ApiError, CircuitOpenError) as e:
+            if not self._should_fall_back(e):
+                raise
+            logger.warning("Elasticsearch multi search failed, using the fallback index: %s", e)
+            responses = [None] * len(pending)
+
+        for i, ((position, cache_key, generation, size, shape, after, _), response) in enumerate(
+                zip(pending, responses)):
+            item = queries[position]
+            if response is None or "error" in response:
+                if response is not None and not self._is_unavailable_status(response["status"]):
+                    # Elasticsearch rejected this query itself (e.g. a parsing error): a bad request
+                    raise ValueError(f"Search query {position} failed: {response['error']}")
+                if shape is None:
+                    suggestions = await asyncio.to_thread(self._fallback_suggest, item.q, mechanic_id, size, item.type)
+                    pages[position] = self._as_page(suggestions)
+                else:
+                    pages[position] = await asyncio.to_thread(
+                        self._fallback_search, item.q, mechanic_id, size, after, item.type, after is None,
+                    )
+                continue
+            if shape is None:
+                value = self._parse_suggest_response(response)
+            else:
+                as_text = bool(after and after.as_text) or i in retries
+                value = self._parse_search_response(response, size, as_text)
+            if not response.get("timed_out"):
+                self._cache.put(mechanic_id, cache_key, value, generation)
+            pages[position] = self._as_page(value)
+        return pages
+
+    @staticmethod
+    def _as_page(value: SearchPage | list[SearchSuggestion]) -> SearchPage:
+        if isinstance(value, SearchPage):
+            return value
+        return SearchPage(results=[SearchResult(**suggestion.model_dump()) for suggestion in value])
+
+    @instrumented("hydrate")
+    def _hydrate(self, page: SearchPage, mechanic_id: int) -> SearchPage:
+        """
+        Attaches the database records to a page of results, loaded with one IN query per
+        type and scoped to the mechanic. Hits whose row no longer exists (the index lags
+        behind a delete) are dropped. Cached pages stay unhydrated, so details are fresh.
+        """
+        ids = {"client": [], "vehicle": []}
+        for result in page.results:
+            ids[result.type].append(result.id)
+
+        db = SessionLocal()
+        try:
+            clients = {
+                client.id: ClientExtendedInfo.model_validate(client)
+                for client in ClientRepository(db).get_clients_by_ids(ids["client"], mechanic_id)
+            }
+            vehicles = {
+                vehicle.id: VehicleExtendedInfo.model_validate(vehicle)
+                for vehicle in VehicleRepository(db).get_vehicles_by_ids(ids["vehicle"], mechanic_id)
+            }
+        finally:
+            db.close()
+
+        results = []
+        for result in page.results:
+            if result.type == "client" and result.id in clients:
+                results.append(result.model_copy(update={"client": clients[result.id]}))
+            elif result.type == "vehicle" and result.id in vehicles:
+                results.append(result.model_copy(update={"vehicle": vehicles[result.id]}))
+        return SearchPage(results=results, next_cursor=page.next_cursor)
+
+    def _async_client(self):
+        return self._async_es or get_async_es_client()
+
+    async def _timed_search(self, operation: str, index: str, body: dict, routing: str | None):
+        started = time.perf_counter()
+        with self._breaker.guard(), self._degradation.track():
+            response = await self._async_client().options(
+                request_timeout=settings.SEARCH_REQUEST_TIMEOUT
+            ).search(index=index, body=body, routing=routing, filter_path=self.SEARCH_FILTER_PATH)
+        observe_search_response(operation, response, time.perf_counter() - started)
+        return response
+
+    async def _timed_msearch(self, index: str, routing: str | None, bodies: list[dict]) -> list[dict]:
+        """
+        Sends the bodies as one `_msearch` request; returns a response per body, which holds
+        an `error` and `status` instead of hits if that search failed on its own.
+        """
+        header = {"index": index}
+        if routing:
+            header["routing"] = routing
+        searches = []
+        for body in bodies:
+            searches += [header, body]
+        started = time.perf_counter()
+        with self._breaker.guard(), self._degradation.track():
+            response = await self._async_client().options(
+                request_timeout=settings.SEARCH_REQUEST_TIMEOUT
+            ).msearch(searches=searches, filter_path=self.MSEARCH_FILTER_PATH)
+        seconds = time.perf_counter() - started
+        for item in response["responses"]:
+            if "error" not in item:
+                observe_search_response("multi_search", item, seconds)
+        return list(response["responses"])
+
+    def _plan_search(self, shape: QueryShape, mechanic_id: int, size: int,
+                     after: Cursor | None, doc_type: str | None, level: int) -> tuple[int, dict]:
+        """
+        Page size and body of a search at degradation `level`, cheaper while Elasticsearch
+        is under load. Pages keep the requested size and the level in the cache key; a
+        degraded page is just shorter.
+        """
+        if level >= MINIMAL:
+            size = min(size, self.DEGRADED_PAGE_SIZE)
+        search_after = after.search_after if after else None
+        return size, build_search_body(shape, mechanic_id, size, search_after, doc_type, level)
+
+    def _plan_suggest(self, query: str, mechanic_id: int, size: int, doc_type: str | None,
+                      level: int) -> tuple[int, dict]:
+        fields = ["suggest", "suggest._2gram", "suggest._3gram"]
+        if level >= MINIMAL:
+            size = min(size, self.DEGRADED_SUGGEST_SIZE)
+            fields = ["suggest"]
+        filters = [{"term": {"mechanic_id": mechanic_id}}]
+        if doc_type:
+            filters.append({"term": {"type": doc_type}})
+        suggest_body = {
             "query": {
                 "bool": {
                     "must": [
                         {
-                            "function_score": {
-                                "query": {
-                                    "multi_match": {
-                                        "query": query,
-                                        "fields": [
-                                            "name^2",
-                                            "name.autocomplete^1.5",
-                                            "name.no_whitespace",
-                                            "phone",
-                                            "vin",
-                                            "client_name^1.8",
-                                            "client_name.autocomplete^1.5",
-                                            "client_last_name^1.8",
-                                            "client_last_name.autocomplete^1.5"
-                                        ],
-                                        "fuzziness": "AUTO",
-                                        "type": "best_fields",
-                                        "operator": "and"
-                                    }
-                                },
-                                "functions": [
-                                    {
-                                        "filter": { "term": { "type": "client" } },
-                                        "weight": 2
-                                    }
-                                ],
-                                "boost_mode": "multiply"
+                            "multi_match": {
+                                "query": query,
+                                "type": "bool_prefix",
+                                "fields": fields
                             }
                         }
                     ],
-                    "filter": [
-                        {
-                            "term": { "mechanic_id": mechanic_id }
-                        }
-                    ]
+                    "filter": filters
                 }
-            }
+            },
+            "size": size,
+            "_source": list(SearchSuggestion.model_fields),
+            "track_total_hits": False,
+            "timeout": settings.SEARCH_ES_TIMEOUT,
+            "terminate_after": settings.SEARCH_TERMINATE_AFTER
         }
+        return size, suggest_body
+
+    def _parse_search_response(self, response, size: int, as_text: bool = False) -> SearchPage:
+        hits = response["hits"]["hits"]
+        # One validation call for the whole page is cheaper than a model per hit
+        results = _SEARCH_RESULTS.validate_python([hit["_source"] for hit in hits])
+        # A full page may have more behind it; a short page is the last one
+        next_cursor = encode_cursor(hits[-1]["sort"], as_text) if len(hits) == size else None
+        type_counts = None
+        if "aggregations" in response:
+            type_counts = {"client": 0, "vehicle": 0}
+            for bucket in response["aggregations"]["types"]["buckets"]:
+                type_counts[bucket["key"]] = bucket["doc_count"]
+        return SearchPage(results=results, next_cursor=next_cursor, type_counts=type_counts)
 
-        response = es_client.search(index=self.INDEX_NAME, body=search_body)
-        
+    @staticmethod
+    def _is_unavailable(error: Exception) -> bool:
+        """
+        Whether a failed search means Elasticsearch cannot serve it (connection problems,
+        overload, server errors or a missing index) rather than a bad request.
+        """
+        if isinstance(error, ApiError):
+            return SearchService._is_unavailable_status(error.meta.status)
+        return True
+
+    @staticmethod
+    def _is_unavailable_status(status: int) -> bool:
+        return status in (404, 429) or status >= 500
+
+    @staticmethod
+    def _trips_breaker(error: Exception) -> bool:
+        """
+        Whether an error counts against the circuit breaker: connection problems, timeouts,
+        overload and server errors. A missing index or a bad request does not.
+        """
+        if isinstance(error, ApiError):
+            return error.meta.status == 429 or error.meta.status >= 500
+        return isinstance(error, TransportError)
+
+    def _should_fall_back(self, error: Exception) -> bool:
+        """
+        Whether a failed search or suggest is served from the fallback index; with an open
+        circuit that depends on SEARCH_BREAKER_OPEN_MODE.
+        """
+        if isinstance(error, CircuitOpenError):
+            return settings.SEARCH_BREAKER_OPEN_MODE != "fail_fast"
+        return self._is_unavailable(error)
+
+    @staticmethod
+    def _parse_suggest_response(response) -> list[SearchSuggestion]:
+        return _SUGGESTIONS.validate_python([hit["_source"] for hit in response["hits"]["hits"]])
+
+    def _fallback_search(self, query: str, mechanic_id: int, size: int,
+                         after: Cursor | None, doc_type: str | None, with_counts: bool) -> SearchPage:
+        # Same plate-then-text rule as the ES search, so its cursors carry over
+        as_text = bool(after and after.as_text)
+        search_after = after.search_after if after else None
+        hits = self._fallback.search(query, mechanic_id, size, search_after=search_after, doc_type=doc_type,
+                                     as_text=as_text)
+        if retry_as_text(classify(query), after, hits):
+            as_text = True
+            hits = self._fallback.search(query, mechanic_id, size, doc_type=doc_type, as_text=True)
         results = [
-            SearchResult(**hit["_source"])
-            for hit in response["hits"]["hits"]
+            SearchResult(**{field: document[field] for field in SearchResult.model_fields if field in document})
+            for _, document in hits
         ]
-        return results
+        next_cursor = encode_cursor(hits[-1][0], as_text) if len(hits) == size else None
+        type_counts = self._fallback.type_counts(query, mechanic_id, as_text) if with_counts else None
+        return SearchPage(results=results, next_cursor=next_cursor, type_counts=type_counts)
+
+    def _fallback_suggest(self, query: str, mechanic_id: int, size: int,
+                          doc_type: str | None) -> list[SearchSuggestion]:
+        page = self._fallback_search(query, mechanic_id, size, None, doc_type, False)
+        return [SearchSuggestion(**result.model_dump(include=set(SearchSuggestion.model_fields)))
+                for result in page.results]
+
+    def _load_fallback_documents(self, mechanic_id: int) -> list[dict]:
+        db = SessionLocal()
+        try:
+            clients = db.query(Clients).filter(Clients.mechanic_id == mechanic_id).all()
+            vehicles = (
+                db.query(Vehicles)
+                .options(joinedload(Vehicles.client))
+                .filter(Vehicles.mechanic_id == mechanic_id)
+                .all()
+            )
+            documents = [self.client_document(client) for client in clients]
+            documents += [self.vehicle_document(vehicle) for vehicle in vehicles if vehicle.client]
+            return documents
+        finally:
+            db.close()
+
+def build_search_body(shape: QueryShape, mechanic_id: int, size: int, search_after: list | None = None,
+                      doc_type: str | None = None, level: int = NORMAL, fields: list[str] | None = None) -> dict:
+    """
+    Body of one page of `SearchService.search`. `fields` replaces the fields of the
+    free-text multi_match, for comparing query variants (scripts/search_benchmark.py).
+    """
+    filters = [{"term": {"mechanic_id": mechanic_id}}]
+    search_body = {
+        "query": {
+            "bool": {
+                "must": [_match_clause(shape, level, fields)],
+                "filter": filters
+            }
+        },
+        "size": size,
+        "sort": SearchService.SEARCH_SORT,
+        "_source": SearchService.RESULT_SOURCE,
+        # The type counts come from the aggregation, so skip counting hit totals
+        "track_total_hits": False,
+        # Latency budget: past these, Elasticsearch returns what it has found so far
+        "timeout": settings.SEARCH_ES_TIMEOUT,
+        "terminate_after": settings.SEARCH_TERMINATE_AFTER
+    }
+    if search_after:
+        search_body["search_after"] = search_after
+        if doc_type:
+            filters.append({"term": {"type": doc_type}})
+    else:
+        # The first page also counts matches per type for the result tabs; the type
+        # filter goes into post_filter so it narrows the hits but not the counts
+        search_body["aggs"] = {"types": {"terms": {"field": "type", "size": 2}}}
+        if doc_type:
+            search_body["post_filter"] = {"term": {"type": doc_type}}
+    return search_body
+
+
+def _match_clause(shape: QueryShape, level: int = NORMAL, fields: list[str] | None = None) -> dict:
+    """
+    VINs, phone numbers and plates are looked up exactly; only free text runs the
+    fuzzy multi_match over the edge-ngram fields, with exact and prefix matches on the
+    make and model ranking a vehicle above one that only shares a word of its name.
+    Under load (see DegradationController) the multi_match drops fuzziness, and at
+    MINIMAL also all but the main name fields and the make/model clauses.
+    """
+    if shape.kind == VIN:
+        return {"constant_score": {"filter": {"term": {"vin": {"value": shape.value, "case_insensitive": True}}}}}
+    if shape.kind == PHONE:
+        return {"constant_score": {"filter": {"prefix": {"phone.digits": shape.value}}}}
+    if shape.kind == PLATE:
+        return {"constant_score": {"filter": {"term": {"registration_number": shape.value}}}}
+    if fields is None:
+        fields = MINIMAL_TEXT_SEARCH_FIELDS if level >= MINIMAL else TEXT_SEARCH_FIELDS
+    multi_match = {
+        "query": shape.value,
+        "fields": fields,
+        "type": "best_fields",
+        "operator": "and"
+    }
+    if level < REDUCED:
+        multi_match["fuzziness"] = "AUTO"
+    query = {"multi_match": multi_match}
+    if level < MINIMAL:
+        # mark/model are lowercase-normalized keywords, so "golf" finds "Golf" but not "Golf Plus"
+        query = {
+            "bool": {
+                "must": query,
+                "should": [
+                    {"term": {"mark": {"value": shape.value, "boost": 2}}},
+                    {"term": {"model": {"value": shape.value, "boost": 2}}},
+                    {"prefix": {"mark": {"value": shape.value}}},
+                    {"prefix": {"model": {"value": shape.value}}},
+                ]
+            }
+        }
+    return {
+        "function_score": {
+            "query": query,
+            "functions": [
+                {
+                    "filter": { "term": { "type": "client" } },
+                    "weight": 2
+                }
+            ],
+            "boost_mode": "multiply"
+        }
+    }
+
+
+def retry_as_text(shape: QueryShape, after: Cursor | None, hits: list) -> bool:
+    """
+    Whether a plate lookup found nothing on the first page and the query is not a plate
+    after all, e.g. a model name like "Q5 TFSI". Its cursors then carry the text marker.
+    """
+    return shape.kind == PLATE and after is None and not hits
+
 
 search_service = SearchService()
@@ -1,4 +1,5 @@
 from typing import List, Optional
+import logging
 from fastapi import Depends
 from sqlalchemy.orm import Session
 
@@ -23,6 +24,7 @@ class VehicleService(IVehicleService):
         self.vehicle_repo = vehicle_repo
         self.client_service = client_service
         self.db = db
+        self._logger = logging.getLogger(__name__)
 
     @staticmethod
     def __validate_correct_result(vehicle: Vehicles | bool | None) -> None:
@@ -56,8 +58,8 @@ class VehicleService(IVehicleService):
             "registration_number": data.registration_number,
         }
         
+        # Indexed asynchronously via the search outbox row written with the vehicle
         new_vehicle = self.vehicle_repo.create_vehicle(new_vehicle_data, mechanic_id)
-        search_service.index_vehicle(new_vehicle)
         return new_vehicle.id
 
     def get_vehicle_details(self, vehicle_id: int, mechanic_id: int) -> VehicleExtendedInfo:
@@ -76,8 +78,7 @@ class VehicleService(IVehicleService):
     def update_vehicle_information(self, vehicle_id: int, data: VehicleEditData, mechanic_id: int) -> VehicleExtendedInfo:
         updated_vehicle = self.vehicle_repo.update_vehicle(vehicle_id, data.dict(exclude_unset=True), mechanic_id)
         self.__validate_correct_result(updated_vehicle)
-        
-        search_service.index_vehicle(updated_vehicle)
+
         self.vehicle_repo.update_last_view_column_in_vehicles(updated_vehicle)
         return VehicleExtendedInfo.model_validate(updated_vehicle)
 
@@ -86,10 +87,10 @@ class VehicleService(IVehicleService):
         self.__validate_correct_result(was_deleted)
         try:
             # Delete vehicle from Elasticsearch (repairs cascade in DB only)
-            search_service.delete_vehicle_and_repairs(vehicle_id)
-        except Exception as e:
-            # Log but don't fail the request if ES deletion fails
-            print(f"Failed to remove vehicle from Elasticsearch: {e}")
+            search_service.delete_vehicle_and_repairs(vehicle_id, mechanic_id)
+        except Exception:
+            # Log but don't fail the request if ES deletion fails; the drift check repairs it
+            self._logger.exception("Failed to remove vehicle from Elasticsearch index")
     
     def list_all_vehicles(self, page: int, size: int, mechanic_id: int) -> list[VehicleBasicInfo]:
         """
@@ -0,0 +1,27 @@
+import sys
+import os
+
+# Add the backend directory to Python path for Docker compatibility
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+# Imports must be after sys.path modification - ignore E402 for these
+from app.db.base import Base  # noqa: E402
+from app.db.schema import add_missing_columns  # noqa: E402
+from app.db.session import engine  # noqa: E402
+import app.models  # noqa: E402, F401
+
+
+def add_updated_at_columns():
+    """
+    Same upgrade the app runs on startup, for preparing a database before a deploy.
+    """
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
+
+
+if __name__ == "__main__":
+    print("--- Adding updated_at columns ---")
+    add_updated_at_columns()
+    print("--- Done ---")
@@ -0,0 +1,40 @@
+import sys
+import os
+import argparse
+
+# Add the backend directory to Python path for Docker compatibility
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+# Imports must be after sys.path modification - ignore E402 for these
+from app.db.session import SessionLocal  # noqa: E402
+from app.search.client import es_client  # noqa: E402
+from app.search.drift import MAX_CHUNK_SIZE, DriftChecker, DriftReport  # noqa: E402
+from app.services.search_engine_service import search_service  # noqa: E402
+
+
+def print_progress(report: DriftReport):
+    rate = report.scanned / report.seconds if report.seconds else 0.0
+    print(f"  {report.scanned} documents checked ({rate:.0f} docs/s), "
+          f"{report.mismatched_chunks} chunks differ, {report.indexed} re-indexed, {report.deleted} deleted",
+          end="\r", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the Elasticsearch search index with PostgreSQL and repair it.")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help=f"rows compared per checksum aggregation, at most {MAX_CHUNK_SIZE} (default: %(default)s)")
+    parser.add_argument("--mechanic-id", type=int,
+                        help="only check this mechanic's documents")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="only report differences, do not repair them")
+    args = parser.parse_args()
+
+    print("--- Checking Elasticsearch for drift from the database ---")
+    checker = DriftChecker(search_service, es_client, SessionLocal, chunk_size=args.chunk_size, repair=not args.dry_run)
+    report = checker.run(mechanic_id=args.mechanic_id, progress=print_progress)
+    print()
+    if args.dry_run:
+        print(f"Would re-index {report.indexed} and delete {report.deleted} documents.")
+    print(f"--- Drift Check Complete in {report.seconds:.1f}s ---")
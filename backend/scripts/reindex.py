@@ -1,5 +1,10 @@
 import sys
 import os
+import argparse
+import multiprocessing
+import queue
+import time
+from datetime import datetime, timedelta
 
 # Add the backend directory to Python path for Docker compatibility
 backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -7,45 +12,428 @@ if backend_dir not in sys.path:
     sys.path.insert(0, backend_dir)
 
 # Imports must be after sys.path modification - ignore E402 for these
-from sqlalchemy.orm import Session, joinedload  # noqa: E402
+from elasticsearch import ConflictError, Elasticsearch, helpers  # noqa: E402
+from sqlalchemy import and_, func, or_, select  # noqa: E402
+from sqlalchemy.orm import Session, joinedload, selectinload  # noqa: E402
+from app.core.config import settings  # noqa: E402
 from app.db.session import SessionLocal  # noqa: E402
 from app.models.clients import Clients  # noqa: E402
+from app.models.search_sync_checkpoint import SearchSyncCheckpoint  # noqa: E402
 from app.models.vehicles import Vehicles  # noqa: E402
 from app.services.search_engine_service import search_service  # noqa: E402
 from app.search.client import es_client  # noqa: E402
 
-def reindex_all_data():
+# Settings applied to the index while the bulk load is running
+BULK_LOAD_SETTINGS = {"refresh_interval": "-1", "number_of_replicas": 0}
+
+# How often (in seconds) the coordinator prints a progress line
+PROGRESS_INTERVAL = 5.0
+
+MODELS = {"client": Clients, "vehicle": Vehicles}
+
+# An incremental run only covers changes older than this, so rows written by transactions
+# that were still open when it started are left to the next run instead of being missed
+INCREMENTAL_SAFETY_LAG = timedelta(minutes=5)
+
+def rebuild_index(load, keep_old: int = 1, mechanic_id: int | None = None):
     """
-    Reads all clients and vehicles from PostgreSQL and indexes them in Elasticsearch.
+    Builds a fresh versioned index with `load` and swaps the search alias to it.
+
+    The old index keeps serving searches until the swap. Writes made during the load are
+    mirrored into the new index by SearchService, and the loaders only `create` documents,
+    so a mirrored write is never overwritten by an older row read from the database.
+
+    With `mechanic_id`, the index is that tenant's dedicated one. The first time, the
+    tenant's documents are removed from the shared index once every process has switched.
     """
-    db: Session = SessionLocal()
-    
-    print("Clearing existing search index...")
-    if es_client.indices.exists(index=search_service.INDEX_NAME):
-        es_client.indices.delete(index=search_service.INDEX_NAME)
-    
-    print("Creating new search index with mappings...")
-    search_service.create_index_if_not_exists()
+    if mechanic_id is None:
+        family = search_service.INDEX_NAME
+        moving_tenant = False
+    else:
+        family = search_service.tenant_alias(mechanic_id)
+        moving_tenant = not search_service.has_dedicated_index(mechanic_id)
+
+    print("Creating new versioned search index with current mappings...")
+    index_name = search_service.begin_rebuild(family)
+    print(f"Created {index_name}; waiting for live writers to start mirroring...")
+    time.sleep(search_service.PENDING_ALIAS_TTL)
+
+    try:
+        load(index_name)
+    except BaseException:
+        print(f"Re-index failed, removing {index_name}...")
+        search_service.abort_rebuild(index_name)
+        raise
+
+    print(f"Pointing alias {family} at {index_name}...")
+    search_service.swap_alias(index_name, family, end_mirroring=not moving_tenant)
+    if moving_tenant:
+        # Processes that have not seen the new alias yet still write to the shared index,
+        # and through the pending alias to the new one
+        print("Waiting for live writers to switch to the dedicated index...")
+        time.sleep(search_service.PENDING_ALIAS_TTL)
+        search_service.end_mirroring(index_name, family)
+        print(f"Removing mechanic {mechanic_id} from {search_service.INDEX_NAME}...")
+        search_service.remove_tenant_from_shared_index(mechanic_id)
+    for removed in search_service.garbage_collect_indices(keep=keep_old, family=family):
+        print(f"Deleted old index {removed}")
+
 
+def _tenant_rows(query, model, mechanic_id: int | None, excluded: tuple[int, ...] = ()):
+    """
+    Narrows a query or select to one mechanic's rows, or to everyone's but `excluded`.
+    """
+    if mechanic_id is not None:
+        return query.where(model.mechanic_id == mechanic_id)
+    if excluded:
+        return query.where(model.mechanic_id.not_in(excluded))
+    return query
+
+
+def _excluded_tenants(mechanic_id: int | None) -> tuple[int, ...]:
+    """
+    Mechanics left out of a load: for the shared index, those with a dedicated index,
+    whose documents would otherwise be copied back as stale duplicates nobody updates.
+    """
+    if mechanic_id is not None:
+        return ()
+    return tuple(sorted(search_service.dedicated_tenants()))
+
+
+def reindex_all_data(index_name: str, mechanic_id: int | None = None):
+    """
+    Reads all clients and vehicles (of one mechanic, if given) from PostgreSQL and indexes
+    them in Elasticsearch. Mechanics with a dedicated index are left out of the shared one.
+    """
+    excluded = _excluded_tenants(mechanic_id)
+    db: Session = SessionLocal()
     try:
         # Index all clients
-        clients = db.query(Clients).all()
+        clients = _tenant_rows(db.query(Clients), Clients, mechanic_id, excluded).all()
         print(f"Found {len(clients)} clients to index...")
         for client in clients:
-            search_service.index_client(client)
+            _create_document(index_name, f"client-{client.id}", search_service.client_document(client))
         print("Clients indexed successfully.")
 
         # Index all vehicles
-        vehicles = db.query(Vehicles).options(joinedload(Vehicles.client)).all()
+        vehicles = db.query(Vehicles).options(joinedload(Vehicles.client))
+        vehicles = _tenant_rows(vehicles, Vehicles, mechanic_id, excluded).all()
         print(f"Found {len(vehicles)} vehicles to index...")
         for vehicle in vehicles:
-            search_service.index_vehicle(vehicle)
+            _create_document(index_name, f"vehicle-{vehicle.id}", search_service.vehicle_document(vehicle))
         print("Vehicles indexed successfully.")
 
     finally:
         db.close()
 
+
+def _create_document(index_name: str, doc_id: str, document: dict):
+    try:
+        es_client.create(index=index_name, id=doc_id, document=document, routing=str(document["mechanic_id"]))
+    except ConflictError:
+        # Already written by a live update while the rebuild was running
+        pass
+
+
+def split_id_range(db: Session, model, parts: int, mechanic_id: int | None = None,
+                   excluded: tuple[int, ...] = ()) -> list[tuple[int, int]]:
+    """
+    Splits the primary-key range of a table (or of one mechanic's rows) into `parts`
+    contiguous, inclusive ranges.
+    """
+    query = _tenant_rows(db.query(func.min(model.id), func.max(model.id)), model, mechanic_id, excluded)
+    low, high = query.one()
+    if low is None:
+        return []
+    step = max(1, -(-(high - low + 1) // parts))
+    return [(start, min(start + step - 1, high)) for start in range(low, high + 1, step)]
+
+
+def _stream_actions(db: Session, index_name: str, doc_type: str, start: int, end: int, chunk_size: int,
+                    mechanic_id: int | None = None, excluded: tuple[int, ...] = ()):
+    """
+    Yields bulk actions for one id range, reading rows through a server-side cursor.
+    """
+    model = MODELS[doc_type]
+    stmt = select(model).where(model.id.between(start, end)).order_by(model.id)
+    stmt = _tenant_rows(stmt, model, mechanic_id, excluded)
+    if doc_type == "vehicle":
+        # selectinload fetches the owners with one IN query per chunk (joinedload can't stream)
+        stmt = stmt.options(selectinload(Vehicles.client))
+        build_document = search_service.vehicle_document
+    else:
+        build_document = search_service.client_document
+
+    for row in db.scalars(stmt.execution_options(yield_per=chunk_size)):
+        yield {
+            "_op_type": "create",
+            "_index": index_name,
+            "_id": f"{doc_type}-{row.id}",
+            "_routing": str(row.mechanic_id),
+            "_source": build_document(row),
+        }
+
+
+def _bulk_index_range(index_name: str, doc_type: str, start: int, end: int, chunk_size: int,
+                      progress, mechanic_id: int | None = None, excluded: tuple[int, ...] = ()) -> tuple[int, int]:
+    """
+    Worker entry point: indexes one id range with `_bulk` requests and reports progress.
+
+    Runs in a separate process, so it opens its own database session and ES client.
+    """
+    db: Session = SessionLocal()
+    client = Elasticsearch(hosts=[settings.ELASTIC_HOST])
+    indexed = failed = 0
+    pending = 0
+    try:
+        actions = _stream_actions(db, index_name, doc_type, start, end, chunk_size, mechanic_id, excluded)
+        for ok, item in helpers.streaming_bulk(
+            client, actions, chunk_size=chunk_size, max_retries=3, raise_on_error=False
+        ):
+            if ok or item["create"].get("status") == 409:
+                # A conflict means a live update already wrote a newer version
+                indexed += 1
+            else:
+                failed += 1
+                print(f"Failed to index {doc_type} document: {item}")
+            pending += 1
+            if pending >= chunk_size:
+                progress.put((doc_type, pending))
+                pending = 0
+    finally:
+        if pending:
+            progress.put((doc_type, pending))
+        client.close()
+        db.close()
+    return indexed, failed
+
+
+def _apply_bulk_load_settings(index_name: str) -> dict:
+    """
+    Disables refresh and replicas for the bulk load and returns the previous values.
+    """
+    current = es_client.indices.get_settings(index=index_name)
+    index_settings = current[index_name]["settings"]["index"]
+    previous = {key: index_settings.get(key) for key in BULK_LOAD_SETTINGS}
+    es_client.indices.put_settings(index=index_name, settings=BULK_LOAD_SETTINGS)
+    return previous
+
+
+def _restore_index_settings(index_name: str, previous: dict) -> None:
+    # A value of None resets the setting to the cluster default
+    es_client.indices.put_settings(index=index_name, settings=previous)
+    es_client.indices.refresh(index=index_name)
+
+
+def bulk_reindex_all_data(index_name: str, workers: int, chunk_size: int, mechanic_id: int | None = None):
+    """
+    Loads `index_name` with `_bulk` requests sent from several worker processes.
+
+    Each table's primary-key range is split between the workers, rows are streamed in
+    `chunk_size` batches instead of being loaded with `.all()`, and refresh/replicas are
+    turned off for the duration of the load. Mechanics with a dedicated index are left
+    out of the shared one.
+    """
+    excluded = _excluded_tenants(mechanic_id)
+    db: Session = SessionLocal()
+    try:
+        totals = {}
+        for doc_type, model in MODELS.items():
+            totals[doc_type] = _tenant_rows(db.query(func.count(model.id)), model, mechanic_id, excluded).scalar()
+        tasks = [
+            (doc_type, start, end)
+            for doc_type, model in MODELS.items()
+            for start, end in split_id_range(db, model, workers, mechanic_id, excluded)
+        ]
+    finally:
+        db.close()
+
+    previous_settings = _apply_bulk_load_settings(index_name)
+
+    print(f"Indexing {totals['client']} clients and {totals['vehicle']} vehicles "
+          f"with {workers} workers, {chunk_size} documents per request...")
+    done = {doc_type: 0 for doc_type in MODELS}
+    started = time.monotonic()
+    context = multiprocessing.get_context("spawn")
+    try:
+        with context.Manager() as manager, context.Pool(processes=workers) as pool:
+            progress = manager.Queue()
+            results = [
+                pool.apply_async(
+                    _bulk_index_range,
+                    (index_name, doc_type, start, end, chunk_size, progress, mechanic_id, excluded),
+                )
+                for doc_type, start, end in tasks
+            ]
+            last_report = started
+            while not all(result.ready() for result in results) or not progress.empty():
+                try:
+                    doc_type, count = progress.get(timeout=1)
+                    done[doc_type] += count
+                except queue.Empty:
+                    pass
+                now = time.monotonic()
+                if now - last_report >= PROGRESS_INTERVAL:
+                    _print_progress(done, totals, now - started)
+                    last_report = now
+
+            indexed = failed = 0
+            for result in results:
+                ok_count, failed_count = result.get()
+                indexed += ok_count
+                failed += failed_count
+    finally:
+        _restore_index_settings(index_name, previous_settings)
+
+    _print_progress(done, totals, time.monotonic() - started)
+    print(f"Indexed {indexed} documents, {failed} failed.")
+
+
+def incremental_reindex(chunk_size: int, mechanic_id: int | None = None):
+    """
+    Re-sends only the clients and vehicles changed since the last run to the live index.
+
+    Each run covers changes up to a fixed `window_end` stored in a SearchSyncCheckpoint.
+    Progress is saved after every chunk, so a crashed run resumes where it stopped. The
+    first run has no checkpoint and sends everything. Vehicles are also re-sent when their
+    owner changed, since the owner's name is part of the vehicle document. Deleted rows
+    are not seen here; the delete hooks remove their documents.
+    """
+    name = "incremental" if mechanic_id is None else f"incremental:mechanic-{mechanic_id}"
+    db: Session = SessionLocal()
+    try:
+        checkpoint = db.get(SearchSyncCheckpoint, name)
+        if checkpoint is None:
+            checkpoint = SearchSyncCheckpoint(name=name)
+            db.add(checkpoint)
+        if checkpoint.window_end is None:
+            checkpoint.window_end = datetime.utcnow() - INCREMENTAL_SAFETY_LAG
+            checkpoint.resume_type = checkpoint.resume_id = None
+            db.commit()
+        else:
+            print(f"Resuming interrupted run after {checkpoint.resume_type or 'start'} {checkpoint.resume_id or ''}")
+        since, until = checkpoint.synced_until, checkpoint.window_end
+        print(f"Syncing rows changed after {since or 'the beginning'} up to {until}...")
+
+        failed = 0
+        for doc_type in MODELS:
+            if checkpoint.resume_type == "vehicle" and doc_type == "client":
+                continue
+            after_id = checkpoint.resume_id if checkpoint.resume_type == doc_type else 0
+            sent, doc_failed = _sync_changed(db, checkpoint, doc_type, since, until, after_id or 0,
+                                             chunk_size, mechanic_id)
+            print(f"Sent {sent} changed {doc_type}s, {doc_failed} failed.")
+            failed += doc_failed
+
+        if failed:
+            # Documents are idempotent, so the next run simply repeats this window
+            checkpoint.resume_type = checkpoint.resume_id = None
+            db.commit()
+            raise SystemExit(f"{failed} documents failed; the next run will retry up to {until}.")
+        checkpoint.synced_until = until
+        checkpoint.window_end = checkpoint.resume_type = checkpoint.resume_id = None
+        db.commit()
+    finally:
+        db.close()
+
+
+def _changed_rows(doc_type: str, since: datetime | None, until: datetime, after_id: int,
+                  mechanic_id: int | None):
+    model = MODELS[doc_type]
+    stmt = select(model).where(model.id > after_id).order_by(model.id)
+    if mechanic_id is not None:
+        stmt = stmt.where(model.mechanic_id == mechanic_id)
+    if since is not None:
+        changed = and_(model.updated_at > since, model.updated_at <= until)
+        if doc_type == "vehicle":
+            stmt = stmt.join(Vehicles.client)
+            changed = or_(changed, and_(Clients.updated_at > since, Clients.updated_at <= until))
+        stmt = stmt.where(changed)
+    if doc_type == "vehicle":
+        stmt = stmt.options(selectinload(Vehicles.client))
+    return stmt
+
+
+def _sync_changed(db: Session, checkpoint: SearchSyncCheckpoint, doc_type: str, since: datetime | None,
+                  until: datetime, after_id: int, chunk_size: int, mechanic_id: int | None) -> tuple[int, int]:
+    """
+    Writes the changed rows of one table to every index they belong in, saving progress
+    in `checkpoint` after each chunk.
+    """
+    build_document = search_service.vehicle_document if doc_type == "vehicle" else search_service.client_document
+    # Rows stream from their own session, because committing the checkpoint would end the cursor
+    read_db: Session = SessionLocal()
+    sent = failed = 0
+    try:
+        stmt = _changed_rows(doc_type, since, until, after_id, mechanic_id)
+
+        def actions():
+            for row in read_db.scalars(stmt.execution_options(yield_per=chunk_size)):
+                yield from search_service.bulk_actions(f"{doc_type}-{row.id}", row.mechanic_id, build_document(row))
+
+        current_id = finished_id = None
+        for ok, item in helpers.streaming_bulk(
+            es_client, actions(), chunk_size=chunk_size, max_retries=3, raise_on_error=False
+        ):
+            if not ok:
+                failed += 1
+                print(f"Failed to index {doc_type} document: {item}")
+            row_id = int(item["index"]["_id"].split("-", 1)[1])
+            if row_id != current_id:
+                # Every action for the previous row has been answered
+                finished_id, current_id = current_id, row_id
+                sent += 1
+                if finished_id is not None and sent % chunk_size == 0:
+                    checkpoint.resume_type, checkpoint.resume_id = doc_type, finished_id
+                    db.commit()
+    finally:
+        read_db.close()
+    return sent, failed
+
+
+def _print_progress(done: dict, totals: dict, elapsed: float) -> None:
+    total_done = sum(done.values())
+    rate = total_done / elapsed if elapsed > 0 else 0.0
+    parts = ", ".join(f"{doc_type}s {done[doc_type]}/{totals[doc_type]}" for doc_type in MODELS)
+    print(f"[{elapsed:7.1f}s] {parts} ({rate:.0f} docs/s)")
+
+
 if __name__ == "__main__":
-    print("--- Starting Full Data Re-index into Elasticsearch ---")
-    reindex_all_data()
-    print("--- Re-index Complete ---")
+    parser = argparse.ArgumentParser(description="Rebuild the Elasticsearch search index from PostgreSQL.")
+    parser.add_argument("--bulk", action="store_true",
+                        help="stream rows and index them with parallel _bulk requests")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="number of worker processes for --bulk (default: %(default)s)")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="rows fetched and documents sent per _bulk request (default: %(default)s)")
+    parser.add_argument("--keep-old", type=int, default=1,
+                        help="previous indices to keep for rollback after the swap (default: %(default)s)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only send rows changed since the last incremental run to the live index")
+    parser.add_argument("--mechanic-id", type=int,
+                        help="build a dedicated index for this mechanic, moving them out of the shared index; "
+                             "with --incremental, only sync this mechanic's rows")
+    args = parser.parse_args()
+
+    if args.incremental:
+        print("--- Starting Incremental Re-index into Elasticsearch ---")
+        incremental_reindex(chunk_size=max(1, args.chunk_size), mechanic_id=args.mechanic_id)
+        print("--- Incremental Re-index Complete ---")
+    else:
+        print("--- Starting Full Data Re-index into Elasticsearch ---")
+        if args.bulk:
+            rebuild_index(
+                lambda index_name: bulk_reindex_all_data(
+                    index_name, workers=max(1, args.workers), chunk_size=max(1, args.chunk_size),
+                    mechanic_id=args.mechanic_id,
+                ),
+                keep_old=max(0, args.keep_old),
+                mechanic_id=args.mechanic_id,
+            )
+        else:
+            rebuild_index(
+                lambda index_name: reindex_all_data(index_name, mechanic_id=args.mechanic_id),
+                keep_old=max(0, args.keep_old),
+                mechanic_id=args.mechanic_id,
+            )
+        print("--- Re-index Complete ---")
@@ -0,0 +1,349 @@
+import sys
+import os
+import argparse
+import copy
+import random
+import string
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+# Add the backend directory to Python path for Docker compatibility
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+# Imports must be after sys.path modification - ignore E402 for these
+from elasticsearch import helpers  # noqa: E402
+from app.models.clients import Clients  # noqa: E402
+from app.models.vehicles import Vehicles  # noqa: E402
+from app.search.query_classifier import TEXT, QueryShape, classify  # noqa: E402
+from app.services.search_engine_service import (  # noqa: E402
+    MINIMAL_TEXT_SEARCH_FIELDS, TEXT_SEARCH_FIELDS, build_search_body, retry_as_text, search_service,
+)
+
+# Prefix of the throwaway indices, one per mapping variant
+INDEX_PREFIX = "search-benchmark"
+
+# Results per query, as in the API; recall is measured within this page
+PAGE_SIZE = 10
+
+FIRST_NAMES = ["Jan", "Anna", "Piotr", "Katarzyna", "Tomasz", "Magdalena", "Paweł", "Agnieszka", "Michał",
+               "Joanna", "Krzysztof", "Ewa", "Łukasz", "Małgorzata", "Marcin", "Barbara", "Grzegorz", "Zofia"]
+LAST_NAMES = ["Kowalski", "Nowak", "Wiśniewski", "Wójcik", "Kowalczyk", "Kamiński", "Lewandowski", "Zieliński",
+              "Szymański", "Woźniak", "Dąbrowski", "Kozłowski", "Jankowski", "Mazur", "Kwiatkowski", "Krawczyk",
+              "Piotrowski", "Grabowski", "Nowakowski", "Pawłowski", "Michalski", "Zając", "Król", "Wieczorek"]
+CARS = {
+    "Toyota": ["Corolla", "Yaris", "Auris", "RAV4", "Avensis"],
+    "Volkswagen": ["Golf", "Passat", "Polo", "Tiguan", "Touran"],
+    "Skoda": ["Octavia", "Fabia", "Superb", "Kodiaq"],
+    "Ford": ["Focus", "Mondeo", "Fiesta", "Kuga"],
+    "Opel": ["Astra", "Corsa", "Insignia", "Zafira"],
+    "Audi": ["A3", "A4", "A6", "Q5"],
+}
+# Letters that occur in VINs (no I, O or Q)
+VIN_CHARS = "ABCDEFGHJKLMNPRSTUVWXYZ0123456789"
+PLATE_REGIONS = ["WA", "WB", "KR", "PO", "GD", "WR", "LU", "SK"]
+
+
+# ============================================================================
+# MAPPING VARIANTS
+# ============================================================================
+
+@dataclass
+class Variant:
+    name: str
+    description: str
+    # Edits a copy of SearchService.index_definition()
+    edit_definition: Callable[[dict], None] = lambda definition: None
+    # Replaces the fields of the free-text multi_match; None keeps SearchService's
+    fields: list[str] | None = None
+
+
+def _set_max_gram(max_gram: int) -> Callable[[dict], None]:
+    def edit(definition: dict):
+        definition["settings"]["analysis"]["tokenizer"]["autocomplete_tokenizer"]["max_gram"] = max_gram
+    return edit
+
+
+def _drop_no_whitespace(definition: dict):
+    del definition["mappings"]["properties"]["name"]["fields"]["no_whitespace"]
+
+
+VARIANTS = {
+    variant.name: variant for variant in [
+        Variant("current", "the mapping and query SearchService uses"),
+        Variant("max-gram-10", "edge_ngram max_gram 10 instead of 20", _set_max_gram(10)),
+        Variant("max-gram-15", "edge_ngram max_gram 15 instead of 20", _set_max_gram(15)),
+        Variant("no-whitespace-field", "without name.no_whitespace",
+                _drop_no_whitespace, [f for f in TEXT_SEARCH_FIELDS if f != "name.no_whitespace"]),
+        Variant("four-fields", "multi_match over the four main name fields only",
+                fields=MINIMAL_TEXT_SEARCH_FIELDS),
+    ]
+}
+
+
+# ============================================================================
+# CORPUS AND GOLDEN QUERIES
+# ============================================================================
+
+@dataclass
+class GoldenQuery:
+    kind: str
+    text: str
+    mechanic_id: int
+    # Documents ("client-1", "vehicle-2", ...) the query is expected to find
+    expected: set[str]
+
+
+@dataclass
+class Corpus:
+    # (id, routing, document)
+    documents: list[tuple[str, str, dict]] = field(default_factory=list)
+    clients: list[Clients] = field(default_factory=list)
+    vehicles: list[Vehicles] = field(default_factory=list)
+
+
+def _unique(seen: set[str], make: Callable[[], str]) -> str:
+    value = make()
+    while value in seen:
+        value = make()
+    seen.add(value)
+    return value
+
+
+def build_corpus(tenants: int, clients_per_tenant: int, seed: int) -> Corpus:
+    """
+    Synthetic clients (1-3 vehicles each) spread evenly over `tenants` mechanics; the
+    same seed always gives the same corpus.
+    """
+    rng = random.Random(seed)
+    corpus = Corpus()
+    phones: set[str] = set()
+    vins: set[str] = set()
+    plates: set[str] = set()
+    vehicle_id = 0
+    for mechanic_id in range(1, tenants + 1):
+        for n in range(clients_per_tenant):
+            client = Clients(
+                id=(mechanic_id - 1) * clients_per_tenant + n + 1,
+                name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                phone=_unique(phones, lambda: str(rng.randint(500_000_000, 899_999_999))),
+                mechanic_id=mechanic_id,
+            )
+            corpus.clients.append(client)
+            corpus.documents.append(
+                (f"client-{client.id}", str(mechanic_id), search_service.client_document(client))
+            )
+            for _ in range(rng.randint(1, 3)):
+                vehicle_id += 1
+                mark = rng.choice(list(CARS))
+                vehicle = Vehicles(
+                    id=vehicle_id,
+                    mark=mark,
+                    model=rng.choice(CARS[mark]),
+                    vin=_unique(vins, lambda: "".join(rng.choices(VIN_CHARS, k=17))),
+                    registration_number=_unique(
+                        plates,
+                        lambda: f"{rng.choice(PLATE_REGIONS)} {rng.randint(10000, 99999)}{rng.choice(string.ascii_uppercase)}",
+                    ),
+                    client_id=client.id,
+                    mechanic_id=mechanic_id,
+                )
+                vehicle.client = client
+                corpus.vehicles.append(vehicle)
+                corpus.documents.append(
+                    (f"vehicle-{vehicle.id}", str(mechanic_id), search_service.vehicle_document(vehicle))
+                )
+    return corpus
+
+
+def _typo(rng: random.Random, word: str) -> str:
+    """
+    The word with two neighbouring letters swapped, a typo `fuzziness: AUTO` should forgive.
+    """
+    i = rng.randrange(1, len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def golden_queries(corpus: Corpus, per_kind: int, seed: int) -> list[GoldenQuery]:
+    """
+    `per_kind` queries of every kind a mechanic types, each with the documents it must
+    find, worked out from the corpus rather than from any index.
+    """
+    rng = random.Random(seed)
+    queries = []
+
+    def clients_where(mechanic_id: int, match: Callable[[Clients], bool]) -> set[str]:
+        return {f"client-{c.id}" for c in corpus.clients if c.mechanic_id == mechanic_id and match(c)}
+
+    def vehicles_where(mechanic_id: int, match: Callable[[Vehicles], bool]) -> set[str]:
+        return {f"vehicle-{v.id}" for v in corpus.vehicles if v.mechanic_id == mechanic_id and match(v)}
+
+    for client in rng.sample(corpus.clients, min(per_kind, len(corpus.clients))):
+        m, first, last = client.mechanic_id, client.name, client.last_name
+        queries += [
+            GoldenQuery("full name", f"{first} {last}", m,
+                        clients_where(m, lambda c: (c.name, c.last_name) == (first, last))),
+            GoldenQuery("name prefix", last[:4].lower(), m,
+                        clients_where(m, lambda c: c.last_name.lower().startswith(last[:4].lower()))),
+            GoldenQuery("name typo", _typo(rng, last), m, clients_where(m, lambda c: c.last_name == last)),
+            GoldenQuery("phone", f"{client.phone[:3]} {client.phone[3:6]} {client.phone[6:]}", m,
+                        {f"client-{client.id}"}),
+        ]
+    for vehicle in rng.sample(corpus.vehicles, min(per_kind, len(corpus.vehicles))):
+        m, mark, model = vehicle.mechanic_id, vehicle.mark, vehicle.model
+        same_car = vehicles_where(m, lambda v: (v.mark, v.model) == (mark, model))
+        queries += [
+            GoldenQuery("vin", vehicle.vin.lower(), m, {f"vehicle-{vehicle.id}"}),
+            GoldenQuery("plate", vehicle.registration_number.lower(), m, {f"vehicle-{vehicle.id}"}),
+            GoldenQuery("make and model", f"{mark} {model}", m, same_car),
+            GoldenQuery("glued make and model", f"{mark}{model}".lower(), m, same_car),
+        ]
+    return queries
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+@dataclass
+class Result:
+    variant: Variant
+    documents: int
+    index_bytes: int
+    index_seconds: float
+    latencies: list[float]
+    # kind -> recall of each query
+    recall: dict[str, list[float]]
+
+
+def percentile(values: list[float], p: float) -> float:
+    """
+    Nearest-rank percentile of a non-empty list.
+    """
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(p / 100 * len(ordered) + 0.5) - 1))]
+
+
+def search_body(variant: Variant, shape: QueryShape, mechanic_id: int) -> dict:
+    return build_search_body(shape, mechanic_id, PAGE_SIZE, fields=variant.fields)
+
+
+def run_query(es, index_name: str, variant: Variant, query: GoldenQuery) -> list[str]:
+    """
+    Runs a golden query the way SearchService.search does, including the retry of a
+    plate lookup that found nothing as free text, and returns the ids of the hits.
+    """
+    shape = classify(query.text)
+    routing = str(query.mechanic_id)
+    response = es.search(index=index_name, body=search_body(variant, shape, query.mechanic_id), routing=routing)
+    if retry_as_text(shape, None, response["hits"]["hits"]):
+        shape = QueryShape(TEXT, query.text)
+        response = es.search(index=index_name, body=search_body(variant, shape, query.mechanic_id), routing=routing)
+    return [f"{hit['_source']['type']}-{hit['_source']['id']}" for hit in response["hits"]["hits"]]
+
+
+def benchmark(es, variant: Variant, corpus: Corpus, queries: list[GoldenQuery], repeat: int,
+              chunk_size: int) -> Result:
+    index_name = f"{INDEX_PREFIX}-{variant.name}"
+    definition = copy.deepcopy(search_service.index_definition())
+    variant.edit_definition(definition)
+    es.indices.delete(index=index_name, ignore=[404])
+    es.indices.create(index=index_name, body=definition)
+    try:
+        actions = ({"_index": index_name, "_id": doc_id, "_routing": routing, "_source": document}
+                   for doc_id, routing, document in corpus.documents)
+        started = time.perf_counter()
+        helpers.bulk(es, actions, chunk_size=chunk_size)
+        es.indices.refresh(index=index_name)
+        index_seconds = time.perf_counter() - started
+        # One segment per shard, so the size does not depend on when merges happened to run
+        es.indices.forcemerge(index=index_name, max_num_segments=1)
+        es.indices.refresh(index=index_name)
+        stats = es.indices.stats(index=index_name, metric="store")
+        index_bytes = stats["_all"]["primaries"]["store"]["size_in_bytes"]
+
+        recall: dict[str, list[float]] = {}
+        for query in queries:
+            found = set(run_query(es, index_name, variant, query))
+            wanted = min(len(query.expected), PAGE_SIZE)
+            recall.setdefault(query.kind, []).append(len(found & query.expected) / wanted if wanted else 1.0)
+
+        latencies = []
+        for _ in range(repeat):
+            for query in queries:
+                started = time.perf_counter()
+                run_query(es, index_name, variant, query)
+                latencies.append(time.perf_counter() - started)
+    finally:
+        es.indices.delete(index=index_name, ignore=[404])
+    return Result(variant, len(corpus.documents), index_bytes, index_seconds, latencies, recall)
+
+
+def print_results(results: list[Result]):
+    print(f"{'variant':<22}{'size':>10}{'docs/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'recall':>9}")
+    for result in results:
+        all_recall = [value for values in result.recall.values() for value in values]
+        print(f"{result.variant.name:<22}"
+              f"{result.index_bytes / 1024 / 1024:>8.2f}MB"
+              f"{result.documents / result.index_seconds:>10.0f}"
+              f"{percentile(result.latencies, 50) * 1000:>9.2f}"
+              f"{percentile(result.latencies, 95) * 1000:>9.2f}"
+              f"{percentile(result.latencies, 99) * 1000:>9.2f}"
+              f"{sum(all_recall) / len(all_recall):>9.3f}")
+    print()
+    kinds = list(results[0].recall)
+    print(f"recall@{PAGE_SIZE} by query kind")
+    print(f"{'variant':<22}" + "".join(f"{kind[:12]:>13}" for kind in kinds))
+    for result in results:
+        print(f"{result.variant.name:<22}"
+              + "".join(f"{sum(result.recall[kind]) / len(result.recall[kind]):>13.3f}" for kind in kinds))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare search mapping variants on a synthetic multi-tenant corpus: index size, indexing "
+                    "throughput, query latency and recall of golden queries.",
+        epilog="Variants: " + "; ".join(f"{v.name} - {v.description}" for v in VARIANTS.values()),
+    )
+    parser.add_argument("--variant", action="append", choices=list(VARIANTS),
+                        help="mapping variant to benchmark, repeatable (default: all)")
+    parser.add_argument("--tenants", type=int, default=20,
+                        help="mechanics in the corpus (default: %(default)s)")
+    parser.add_argument("--clients-per-tenant", type=int, default=200,
+                        help="clients per mechanic, each with 1-3 vehicles (default: %(default)s)")
+    parser.add_argument("--queries-per-kind", type=int, default=25,
+                        help="golden queries of each kind (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="timed passes over the golden queries (default: %(default)s)")
+    parser.add_argument("--chunk-size", type=int, default=1000,
+                        help="documents per _bulk request (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="seed of the corpus and the queries (default: %(default)s)")
+    parser.add_argument("--fake", action="store_true",
+                        help="run against the in-process fake from tests/fixtures instead of ELASTIC_HOST; sizes are "
+                             "estimates, scores (and so recall) only approximate Elasticsearch's and latencies "
+                             "compare query shapes, not clusters; use a small corpus")
+    args = parser.parse_args()
+
+    if args.fake:
+        # The fake lives with the tests, next to the backend directory
+        sys.path.insert(0, os.path.dirname(backend_dir))
+        from tests.fixtures.fake_elasticsearch import FakeElasticsearch
+        es = FakeElasticsearch()
+    else:
+        from app.search.client import es_client as es
+
+    print("--- Building the synthetic corpus ---")
+    corpus = build_corpus(max(1, args.tenants), max(1, args.clients_per_tenant), args.seed)
+    queries = golden_queries(corpus, max(1, args.queries_per_kind), args.seed)
+    print(f"  {len(corpus.documents)} documents, {len(queries)} golden queries")
+
+    results = []
+    for name in args.variant or list(VARIANTS):
+        print(f"--- Benchmarking {name} ---")
+        results.append(benchmark(es, VARIANTS[name], corpus, queries, max(1, args.repeat), max(1, args.chunk_size)))
+    print()
+    print_results(results)
@@ -1,4 +1,5 @@
 import pytest
+from unittest.mock import patch
 from fastapi.testclient import TestClient
 
 from tests.fixtures.helpers import AuthHelper
@@ -891,6 +892,29 @@ class TestDeleteClient:
         get_response = client.get(f"{BASE_URL}/{client_id}")
         assert get_response.status_code == 404
     
+    @patch('app.services.client_service.search_service.delete_client_and_vehicles')
+    def test_delete_client_passes_cascaded_vehicles_to_search(self, mock_delete, client: TestClient):
+        """
+        GIVEN: Client with a vehicle
+        WHEN: DELETE /clients/{id}
+        THEN: The search index is told which vehicles were deleted with the client
+        """
+        # Arrange
+        create_authenticated_mechanic(client)
+        create_response = create_test_client(client)
+        client_id = create_response.json()["id"]
+        vehicle_id = client.post("/api/v1/vehicles", json={
+            "mark": "Toyota", "model": "Corolla", "vin": "12345678901234567", "client_id": client_id
+        }).json()["vehicle_id"]
+
+        # Act
+        response = client.delete(f"{BASE_URL}/{client_id}")
+
+        # Assert
+        assert response.status_code == 204
+        _, _, vehicle_ids = mock_delete.call_args.args
+        assert vehicle_ids == [vehicle_id]
+
     def test_delete_client_not_found(self, client: TestClient):
         """Test deleting non-existent client"""
         # Arrange
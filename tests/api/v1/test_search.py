@@ -1,11 +1,13 @@
 
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 from tests.fixtures.helpers import AuthHelper, ClientHelper
 from tests.fixtures.factories import MechanicFactory, ClientFactory
-from app.schemas.search import SearchResult
+from app.schemas.client import ClientExtendedInfo
+from app.search.circuit_breaker import CircuitOpenError
+from app.schemas.search import SearchPage, SearchResult, SearchSuggestion
 
 
 # ============================================================================
@@ -24,9 +26,9 @@ def create_authenticated_mechanic(client: TestClient):
     return result["user_data"]
 
 
-def create_mock_search_results(results_data):
-    """Create mock SearchResult objects"""
-    return [SearchResult(**data) for data in results_data]
+def create_mock_search_results(results_data, next_cursor=None):
+    """Create a mock page of SearchResult objects"""
+    return SearchPage(results=[SearchResult(**data) for data in results_data], next_cursor=next_cursor)
 
 
 # ============================================================================
@@ -54,7 +56,7 @@ def _auth_search_requests(client: TestClient):
 class TestSearchEndpoint:
     """Tests for GET /api/v1/search"""
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_clients_by_name(self, mock_search, client: TestClient):
         """Search for clients by name"""
         # Arrange
@@ -79,7 +81,7 @@ class TestSearchEndpoint:
         assert call_args[0] == "John"
         assert len(call_args) == 2  # query and mechanic_id
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_vehicles_by_mark(self, mock_search, client: TestClient):
         """Search for vehicles by mark"""
         # Arrange
@@ -98,7 +100,7 @@ class TestSearchEndpoint:
         assert data[0]["type"] == "vehicle"
         assert "Toyota" in data[0]["name"]
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_by_phone(self, mock_search, client: TestClient):
         """Search for client by phone number"""
         # Arrange
@@ -119,7 +121,7 @@ class TestSearchEndpoint:
         call_args = mock_search.call_args[0]
         assert call_args[0] == "123456789"
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_by_vin(self, mock_search, client: TestClient):
         """Search for vehicle by VIN"""
         # Arrange
@@ -138,7 +140,7 @@ class TestSearchEndpoint:
         assert data[0]["type"] == "vehicle"
         assert data[0]["name"] == "Honda Civic"
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_mixed_results(self, mock_search, client: TestClient):
         """Search returns both clients and vehicles when searching by client surname
         
@@ -174,11 +176,11 @@ class TestSearchEndpoint:
         assert client_count == 2, "Should have 2 clients (John Kowalski, Anna Kowalska)"
         assert vehicle_count == 1, "Should have 1 vehicle (Toyota Camry owned by John Kowalski)"
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_empty_results(self, mock_search, client: TestClient):
         """Search with no matching results"""
         # Arrange
-        mock_search.return_value = []
+        mock_search.return_value = SearchPage(results=[])
         
         # Act
         response = client.get("/api/v1/search?q=NonexistentQuery")
@@ -188,11 +190,11 @@ class TestSearchEndpoint:
         data = response.json()
         assert len(data) == 0
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_with_special_characters(self, mock_search, client: TestClient):
         """Search with special characters"""
         # Arrange
-        mock_search.return_value = []
+        mock_search.return_value = SearchPage(results=[])
         
         # Act
         response = client.get("/api/v1/search?q=test@#$%")
@@ -202,7 +204,7 @@ class TestSearchEndpoint:
         # Check that mock was called (URL encoding may change the exact string)
         assert mock_search.called
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_with_spaces(self, mock_search, client: TestClient):
         """Search with spaces in query"""
         # Arrange
@@ -223,7 +225,7 @@ class TestSearchEndpoint:
         call_args = mock_search.call_args[0]
         assert call_args[0] == "John Smith"
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_case_insensitive(self, mock_search, client: TestClient):
         """Search is case insensitive"""
         # Arrange
@@ -241,6 +243,20 @@ class TestSearchEndpoint:
         assert len(data) == 1
         assert data[0]["name"] == "John Doe"
 
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
+    def test_search_result_has_every_field(self, mock_search, client: TestClient):
+        """Results are serialized without response_model, so the JSON shape is checked here"""
+        mock_search.return_value = create_mock_search_results([
+            {"id": 1, "type": "client", "name": "John Doe"}
+        ])
+
+        response = client.get("/api/v1/search?q=John")
+
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == [{field: None for field in SearchResult.model_fields} | {
+            "id": 1, "type": "client", "name": "John Doe"
+        }]
+
 
 # ============================================================================
 # VALIDATION TESTS
@@ -259,11 +275,11 @@ class TestSearchValidation:
         # Assert
         assert response.status_code == 422  # Missing required query param
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_empty_query_string(self, mock_search, client: TestClient):
         """Handle empty query string"""
         # Arrange
-        mock_search.return_value = []
+        mock_search.return_value = SearchPage(results=[])
         
         # Act
         response = client.get("/api/v1/search?q=")
@@ -271,12 +287,12 @@ class TestSearchValidation:
         # Assert
         assert response.status_code == 200
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_very_long_query(self, mock_search, client: TestClient):
         """Handle very long search query"""
         # Arrange
         long_query = "a" * 1000
-        mock_search.return_value = []
+        mock_search.return_value = SearchPage(results=[])
         
         # Act
         response = client.get(f"/api/v1/search?q={long_query}")
@@ -294,7 +310,7 @@ class TestSearchValidation:
 class TestSearchFuzzyMatching:
     """Tests for fuzzy matching and typo tolerance"""
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_with_typo(self, mock_search, client: TestClient):
         """Search with typo finds correct results"""
         # Arrange - simulating fuzzy match
@@ -312,7 +328,7 @@ class TestSearchFuzzyMatching:
         assert len(data) == 1
         assert data[0]["name"] == "John Smith"
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_partial_match(self, mock_search, client: TestClient):
         """Search with partial word matches"""
         # Arrange
@@ -340,7 +356,7 @@ class TestSearchFuzzyMatching:
 class TestSearchEdgeCases:
     """Tests for edge cases and special scenarios"""
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_with_numbers_only(self, mock_search, client: TestClient):
         """Search with only numbers"""
         # Arrange
@@ -358,7 +374,7 @@ class TestSearchEdgeCases:
         assert len(data) == 1
         assert data[0]["name"] == "Client 123"
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_with_unicode_characters(self, mock_search, client: TestClient):
         """Search with unicode/special characters"""
         # Arrange
@@ -376,7 +392,7 @@ class TestSearchEdgeCases:
         assert len(data) == 1
         assert data[0]["name"] == "Łukasz Żółtek"
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_returns_limited_results(self, mock_search, client: TestClient):
         """Search returns reasonable number of results"""
         # Arrange - 100 results
@@ -394,7 +410,7 @@ class TestSearchEdgeCases:
         data = response.json()
         assert len(data) == 100
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_with_url_encoded_query(self, mock_search, client: TestClient):
         """Search with URL encoded characters"""
         # Arrange
@@ -415,11 +431,11 @@ class TestSearchEdgeCases:
         call_args = mock_search.call_args[0]
         assert call_args[0] == "Smith & Sons"
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_single_character(self, mock_search, client: TestClient):
         """Search with single character query"""
         # Arrange
-        mock_search.return_value = []
+        mock_search.return_value = SearchPage(results=[])
         
         # Act
         response = client.get("/api/v1/search?q=A")
@@ -441,7 +457,7 @@ class TestSearchEdgeCases:
 class TestSearchResponseFormat:
     """Tests for search response format"""
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_response_structure_for_client(self, mock_search, client: TestClient):
         """Client search result has correct structure"""
         # Arrange
@@ -464,7 +480,7 @@ class TestSearchResponseFormat:
         assert result["type"] == "client"
         assert "name" in result
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_response_structure_for_vehicle(self, mock_search, client: TestClient):
         """Vehicle search result has correct structure"""
         # Arrange
@@ -486,11 +502,11 @@ class TestSearchResponseFormat:
         assert "type" in result
         assert result["type"] == "vehicle"
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_returns_json_array(self, mock_search, client: TestClient):
         """Search always returns JSON array"""
         # Arrange
-        mock_search.return_value = []
+        mock_search.return_value = SearchPage(results=[])
         
         # Act
         response = client.get("/api/v1/search?q=test")
@@ -511,7 +527,7 @@ class TestSearchResponseFormat:
 class TestVehicleSearchWithClientInfo:
     """Tests for vehicle search results that include client information"""
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_vehicle_search_returns_client_info(self, mock_search, client: TestClient):
         """Vehicle search result includes client_id, client_name, and client_last_name"""
         # Arrange
@@ -545,7 +561,7 @@ class TestVehicleSearchWithClientInfo:
         assert vehicle["client_name"] == "Taras"
         assert vehicle["client_last_name"] == "Skala"
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_vehicle_by_client_name(self, mock_search, client: TestClient):
         """Search for vehicle by client's first name"""
         # Arrange - BMW X1 owned by Taras Skala
@@ -573,7 +589,7 @@ class TestVehicleSearchWithClientInfo:
         assert data[0]["type"] == "vehicle"
         assert data[0]["client_name"] == "Taras"
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_vehicle_by_client_last_name(self, mock_search, client: TestClient):
         """Search for vehicle by client's last name"""
         # Arrange
@@ -601,7 +617,7 @@ class TestVehicleSearchWithClientInfo:
         assert data[0]["type"] == "vehicle"
         assert data[0]["client_last_name"] == "Skala"
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_vehicle_by_model_and_client_name(self, mock_search, client: TestClient):
         """Search for vehicle by combining model and client name (e.g., 'BMW Taras')"""
         # Arrange - BMW X1 owned by Taras Skala
@@ -630,7 +646,7 @@ class TestVehicleSearchWithClientInfo:
         assert data[0]["mark"] == "BMW"
         assert data[0]["client_name"] == "Taras"
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_distinguishes_same_car_different_owners(self, mock_search, client: TestClient):
         """Search distinguishes same vehicle model with different owners
         
@@ -671,7 +687,7 @@ class TestVehicleSearchWithClientInfo:
         # Should NOT return Vasia's car
         assert vehicle["client_name"] != "Vasia"
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_search_multiple_vehicles_same_owner(self, mock_search, client: TestClient):
         """Search returns all vehicles for a specific owner"""
         # Arrange - Taras owns both BMW X1 and Mercedes C-Class
@@ -719,7 +735,7 @@ class TestVehicleSearchWithClientInfo:
         assert "BMW" in marks
         assert "Mercedes" in marks
     
-    @patch('app.api.v1.endpoints.search.search_service.search')
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
     def test_vehicle_result_all_fields_present(self, mock_search, client: TestClient):
         """Verify all expected fields are present in vehicle search result"""
         # Arrange
@@ -770,3 +786,312 @@ class TestVehicleSearchWithClientInfo:
         assert vehicle["client_id"] == 202
         assert vehicle["client_name"] == "Jan"
         assert vehicle["client_last_name"] == "Kowalski"
+
+
+# ============================================================================
+# PAGINATION TESTS
+# ============================================================================
+
+@pytest.mark.api
+@pytest.mark.integration
+class TestSearchPagination:
+    """Tests for size, cursor and type parameters of GET /api/v1/search"""
+
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
+    def test_paging_parameters_are_passed_to_service(self, mock_search, client: TestClient):
+        """size, cursor and type are forwarded to SearchService.search"""
+        mock_search.return_value = SearchPage(results=[])
+
+        response = client.get("/api/v1/search?q=John&size=25&cursor=abc&type=vehicle")
+
+        assert response.status_code == 200
+        kwargs = mock_search.call_args.kwargs
+        assert kwargs == {"size": 25, "cursor": "abc", "doc_type": "vehicle", "hydrate": False}
+
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
+    def test_default_page_size(self, mock_search, client: TestClient):
+        """Without parameters the first page of 10 results is requested"""
+        mock_search.return_value = SearchPage(results=[])
+
+        client.get("/api/v1/search?q=John")
+
+        kwargs = mock_search.call_args.kwargs
+        assert kwargs == {"size": 10, "cursor": None, "doc_type": None, "hydrate": False}
+
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
+    def test_hydrated_results_carry_records(self, mock_search, client: TestClient):
+        """hydrate=true is forwarded and the attached records are returned"""
+        mock_search.return_value = SearchPage(results=[
+            SearchResult(
+                id=7, type="client", name="John Doe",
+                client=ClientExtendedInfo(id=7, name="John", last_name="Doe", phone="123456789"),
+            )
+        ])
+
+        response = client.get("/api/v1/search?q=John&hydrate=true")
+
+        assert response.status_code == 200
+        assert mock_search.call_args.kwargs["hydrate"] is True
+        assert response.json()[0]["client"]["phone"] == "123456789"
+        assert response.json()[0]["vehicle"] is None
+
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
+    def test_next_cursor_is_returned_in_header(self, mock_search, client: TestClient):
+        """The cursor for the next page is sent in X-Next-Cursor"""
+        mock_search.return_value = create_mock_search_results(
+            [{"id": 1, "type": "client", "name": "John Doe"}], next_cursor="next-page"
+        )
+
+        response = client.get("/api/v1/search?q=John&size=1")
+
+        assert response.status_code == 200
+        assert response.headers["X-Next-Cursor"] == "next-page"
+        assert len(response.json()) == 1
+
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
+    def test_type_counts_are_returned_in_header(self, mock_search, client: TestClient):
+        """Counts for the client/vehicle tabs come with the first page"""
+        mock_search.return_value = SearchPage(results=[], type_counts={"client": 3, "vehicle": 12})
+
+        response = client.get("/api/v1/search?q=John&type=client")
+
+        assert response.headers["X-Type-Counts"] == "client=3,vehicle=12"
+
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
+    def test_later_pages_have_no_type_counts(self, mock_search, client: TestClient):
+        mock_search.return_value = SearchPage(results=[])
+
+        response = client.get("/api/v1/search?q=John&cursor=abc")
+
+        assert "X-Type-Counts" not in response.headers
+
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
+    def test_last_page_has_no_cursor_header(self, mock_search, client: TestClient):
+        """No X-Next-Cursor header on the last page"""
+        mock_search.return_value = create_mock_search_results(
+            [{"id": 1, "type": "client", "name": "John Doe"}]
+        )
+
+        response = client.get("/api/v1/search?q=John")
+
+        assert "X-Next-Cursor" not in response.headers
+
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
+    def test_invalid_cursor_returns_400(self, mock_search, client: TestClient):
+        """A malformed cursor is a client error"""
+        mock_search.side_effect = ValueError("Invalid search cursor")
+
+        response = client.get("/api/v1/search?q=John&cursor=garbage")
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid search cursor"
+
+    @patch('app.api.v1.endpoints.search.search_service.search', new_callable=AsyncMock)
+    def test_open_circuit_returns_503(self, mock_search, client: TestClient):
+        """With SEARCH_BREAKER_OPEN_MODE=fail_fast an open circuit reaches the client"""
+        mock_search.side_effect = CircuitOpenError("Elasticsearch circuit is open")
+
+        response = client.get("/api/v1/search?q=John")
+
+        assert response.status_code == 503
+
+    @pytest.mark.parametrize("size", [0, 51])
+    def test_size_out_of_range_returns_422(self, size, client: TestClient):
+        """Page size is bounded"""
+        response = client.get(f"/api/v1/search?q=John&size={size}")
+
+        assert response.status_code == 422
+
+    def test_unknown_type_returns_422(self, client: TestClient):
+        """Only client and vehicle can be used as type filter"""
+        response = client.get("/api/v1/search?q=John&type=repair")
+
+        assert response.status_code == 422
+
+
+@pytest.mark.unit
+class TestSearchCursor:
+    """Tests for the opaque search_after cursor encoding"""
+
+    def test_round_trip(self):
+        from app.search.pagination import decode_cursor, encode_cursor
+
+        sort_values = [3.1415, "vehicle", 42]
+        assert decode_cursor(encode_cursor(sort_values)).search_after == sort_values
+
+    def test_round_trip_keeps_text_marker(self):
+        """A plate-shaped query that ran as text keeps running as text on later pages"""
+        from app.search.pagination import decode_cursor, encode_cursor
+
+        sort_values = [3.1415, "vehicle", 42]
+        assert decode_cursor(encode_cursor(sort_values, as_text=True)) == (sort_values, True)
+        assert decode_cursor(encode_cursor(sort_values)).as_text is False
+
+    @pytest.mark.parametrize("cursor", ["garbage!", "e30", "bnVsbA"])
+    def test_invalid_cursor_raises_value_error(self, cursor):
+        from app.search.pagination import decode_cursor
+
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+    @pytest.mark.parametrize("sort_values", [
+        [],
+        [1.5, "vehicle"],
+        [1.5, "vehicle", 42, 7],
+        ["1.5", "vehicle", 42],
+        [None, "vehicle", 42],
+        [True, "vehicle", 42],
+        [1.5, "repair", 42],
+        [1.5, "vehicle", "42"],
+        [1.5, "vehicle", 4.2],
+        [1.5, "vehicle", False],
+        ["text"],
+        [1.5, "vehicle", "text"],
+    ])
+    def test_malformed_sort_values_raise_value_error(self, sort_values):
+        """Well-formed base64 JSON is still rejected unless it is [score, type, id]"""
+        import base64
+        import json
+        from app.search.pagination import decode_cursor
+
+        cursor = base64.urlsafe_b64encode(json.dumps(sort_values).encode()).decode().rstrip("=")
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+# ============================================================================
+# SUGGEST ENDPOINT TESTS
+# ============================================================================
+
+@pytest.mark.api
+@pytest.mark.integration
+class TestSuggestEndpoint:
+    """Tests for GET /api/v1/search/suggest"""
+
+    @patch('app.api.v1.endpoints.search.search_service.suggest', new_callable=AsyncMock)
+    def test_returns_suggestions(self, mock_suggest, client: TestClient):
+        """Suggestions carry only the fields the search box shows"""
+        mock_suggest.return_value = [
+            SearchSuggestion(id=1, type="client", name="Jan Kowalski", phone="+48600100200"),
+            SearchSuggestion(id=7, type="vehicle", name="Volkswagen Golf", vin="WVWZZZ1JZXW000001"),
+        ]
+
+        response = client.get("/api/v1/search/suggest?q=Kow")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [item["id"] for item in data] == [1, 7]
+        assert set(data[0]) == {"id", "type", "name", "phone", "vin"}
+
+    @patch('app.api.v1.endpoints.search.search_service.suggest', new_callable=AsyncMock)
+    def test_parameters_are_passed_to_service(self, mock_suggest, client: TestClient):
+        """size and type are forwarded to SearchService.suggest"""
+        mock_suggest.return_value = []
+
+        response = client.get("/api/v1/search/suggest?q=WVW&size=3&type=vehicle")
+
+        assert response.status_code == 200
+        assert mock_suggest.call_args[0][0] == "WVW"
+        assert mock_suggest.call_args.kwargs == {"size": 3, "doc_type": "vehicle"}
+
+    @patch('app.api.v1.endpoints.search.search_service.suggest', new_callable=AsyncMock)
+    def test_default_size(self, mock_suggest, client: TestClient):
+        """Five suggestions are requested by default"""
+        mock_suggest.return_value = []
+
+        client.get("/api/v1/search/suggest?q=66")
+
+        assert mock_suggest.call_args.kwargs == {"size": 5, "doc_type": None}
+
+    @patch('app.api.v1.endpoints.search.search_service.suggest', new_callable=AsyncMock)
+    def test_open_circuit_returns_503(self, mock_suggest, client: TestClient):
+        """Typeahead fails fast too instead of waiting on Elasticsearch"""
+        mock_suggest.side_effect = CircuitOpenError("Elasticsearch circuit is open")
+
+        response = client.get("/api/v1/search/suggest?q=Kow")
+
+        assert response.status_code == 503
+
+    @pytest.mark.parametrize("size", [0, 21])
+    def test_size_out_of_range_returns_422(self, size, client: TestClient):
+        """Number of suggestions is bounded"""
+        response = client.get(f"/api/v1/search/suggest?q=Kow&size={size}")
+
+        assert response.status_code == 422
+
+    def test_missing_query_returns_422(self, client: TestClient):
+        """q is required"""
+        response = client.get("/api/v1/search/suggest")
+
+        assert response.status_code == 422
+
+
+# ============================================================================
+# MULTI SEARCH ENDPOINT TESTS
+# ============================================================================
+
+@pytest.mark.api
+@pytest.mark.integration
+class TestMultiSearchEndpoint:
+    """Tests for POST /api/v1/search/multi"""
+
+    @patch('app.api.v1.endpoints.search.search_service.multi_search', new_callable=AsyncMock)
+    def test_returns_one_page_per_query(self, mock_multi_search, client: TestClient):
+        """Pages come back in request order with cursor and counts in the body"""
+        mock_multi_search.return_value = [
+            SearchPage(
+                results=[SearchResult(id=1, type="client", name="Jan Kowalski")],
+                next_cursor="abc",
+                type_counts={"client": 1, "vehicle": 0},
+            ),
+            SearchPage(results=[SearchResult(id=7, type="vehicle", name="Volkswagen Golf")]),
+        ]
+
+        response = client.post("/api/v1/search/multi", json={
+            "queries": [{"q": "Kowal", "type": "client"}, {"kind": "suggest", "q": "Golf"}]
+        })
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [page["results"][0]["id"] for page in data] == [1, 7]
+        assert data[0]["next_cursor"] == "abc"
+        assert data[0]["type_counts"] == {"client": 1, "vehicle": 0}
+        assert data[1]["next_cursor"] is None
+
+    @patch('app.api.v1.endpoints.search.search_service.multi_search', new_callable=AsyncMock)
+    def test_queries_are_passed_to_service(self, mock_multi_search, client: TestClient):
+        """Each query keeps its own kind, size, cursor and type"""
+        mock_multi_search.return_value = [SearchPage(results=[]), SearchPage(results=[])]
+
+        client.post("/api/v1/search/multi", json={
+            "queries": [
+                {"q": "Kowal", "size": 3, "cursor": "abc", "type": "vehicle"},
+                {"kind": "suggest", "q": "Kow"},
+            ]
+        })
+
+        queries = mock_multi_search.call_args[0][0]
+        assert [(q.kind, q.q, q.size, q.cursor, q.type) for q in queries] == [
+            ("search", "Kowal", 3, "abc", "vehicle"),
+            ("suggest", "Kow", None, None, None),
+        ]
+
+    @patch('app.api.v1.endpoints.search.search_service.multi_search', new_callable=AsyncMock)
+    def test_invalid_cursor_returns_400(self, mock_multi_search, client: TestClient):
+        mock_multi_search.side_effect = ValueError("Invalid search cursor")
+
+        response = client.post("/api/v1/search/multi", json={"queries": [{"q": "Kowal", "cursor": "garbage"}]})
+
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("queries", [
+        [],
+        [{"q": "Kowal"}] * 11,
+        [{"q": "Kowal", "size": 51}],
+        [{"q": "Kowal", "kind": "count"}],
+        [{"size": 5}],
+    ])
+    def test_invalid_queries_return_422(self, queries, client: TestClient):
+        response = client.post("/api/v1/search/multi", json={"queries": queries})
+
+        assert response.status_code == 422
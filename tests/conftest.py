@@ -41,6 +41,7 @@ sys.modules['app.services.search_engine_service'] = MagicMock()
 from app.db.base import Base
 import app.models  # noqa: F401
 from app.dependencies.db import get_db
+from tests.fixtures.clock import FakeClock
 
 TEST_DB_PATH = BACKEND_DIR / "test.db"
 TEST_DB_URL = f"sqlite:///{TEST_DB_PATH}"
@@ -154,6 +155,33 @@ def client(app):
         yield test_client
 
 
+# ============================================================================
+# SEARCH SERVICE FIXTURES
+# ============================================================================
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """A FakeClock for the TTLs and timeouts of the search components."""
+    return FakeClock()
+
+
+@pytest.fixture(scope="session")
+def search_engine_module():
+    """
+    The real app.services.search_engine_service, for tests that run SearchService
+    against the fake Elasticsearch; everything else keeps seeing the MagicMock.
+    """
+    import importlib
+    services = importlib.import_module("app.services")
+    mock = sys.modules.pop("app.services.search_engine_service")
+    try:
+        module = importlib.import_module("app.services.search_engine_service")
+    finally:
+        sys.modules["app.services.search_engine_service"] = mock
+        services.search_engine_service = mock
+    return module
+
+
 # ============================================================================
 # FACTORY FIXTURES
 # ============================================================================
@@ -4,5 +4,7 @@ Moduł z fixture'ami i helperami testowymi.
 Ten folder zawiera:
 - factories.py: Fabryki do tworzenia danych testowych
 - helpers.py: Funkcje pomocnicze do testów API
+- clock.py: Sterowany zegar (FakeClock) do testów TTL i timeoutów
+- fake_elasticsearch.py: Elasticsearch w pamięci do testów SearchService
 """
 
@@ -0,0 +1,10 @@
+class FakeClock:
+    """
+    Stands in for time.monotonic; tests move time forward by setting `now`.
+    """
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
@@ -0,0 +1,1380 @@
+import asyncio
+import copy
+import fnmatch
+import functools
+import itertools
+import json
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, Callable, Iterable, NamedTuple
+
+from elastic_transport import (
+    ApiResponseMeta,
+    ConnectionTimeout,
+    HeadApiResponse,
+    HttpHeaders,
+    NodeConfig,
+    ObjectApiResponse,
+    SerializerCollection,
+)
+from elasticsearch import ApiError
+from elasticsearch.exceptions import HTTP_EXCEPTIONS
+
+from app.search.fallback import EXACT, FUZZY, PREFIX, auto_fuzziness, edit_distance
+
+_NODE = NodeConfig("http", "localhost", 9200)
+_NUMERIC_TYPES = {"long", "integer", "short", "byte", "double", "float", "half_float", "scaled_float", "unsigned_long"}
+_TEXT_TYPES = {"text", "search_as_you_type"}
+# Subfields Elasticsearch adds to a search_as_you_type field; here they hold the same terms
+_SEARCH_AS_YOU_TYPE_SUBFIELDS = ("_2gram", "_3gram", "_index_prefix")
+# Hits counted exactly when track_total_hits is not set, like Elasticsearch's default
+_DEFAULT_TRACK_TOTAL_HITS = 10000
+_STANDARD_TOKEN = re.compile(r"\w+")
+_LETTERS_AND_DIGITS = re.compile(r"[^\W_]+")
+
+
+def _meta(status: int) -> ApiResponseMeta:
+    return ApiResponseMeta(status=status, http_version="1.1", headers=HttpHeaders(), duration=0.0, node=_NODE)
+
+
+def api_error(status: int, error_type: str, reason: str) -> ApiError:
+    """
+    The exception the real client raises for an error response with this status.
+    """
+    body = {"error": {"type": error_type, "reason": reason}, "status": status}
+    return HTTP_EXCEPTIONS.get(status, ApiError)(error_type, _meta(status), body)
+
+
+def _as_list(value) -> list:
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _fold(text: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+_TOKEN_FILTERS: dict[str, Callable[[str], str]] = {
+    "lowercase": str.lower,
+    "uppercase": str.upper,
+    "asciifolding": _fold,
+}
+_BUILTIN_ANALYZERS = {
+    "standard": {"tokenizer": "standard", "filter": ["lowercase"]},
+    "simple": {"tokenizer": "standard", "filter": ["lowercase"]},
+    "whitespace": {"tokenizer": "whitespace"},
+    "keyword": {"tokenizer": "keyword"},
+}
+
+
+class _Analysis:
+    """
+    The char filters, tokenizers, normalizers and analyzers of one index.
+
+    Covers what the search index uses: pattern_replace char filters, the standard,
+    whitespace, keyword and edge_ngram tokenizers, and the lowercase, uppercase and
+    asciifolding token filters.
+    """
+
+    def __init__(self, settings: dict):
+        analysis = settings.get("analysis") or {}
+        self._char_filters = analysis.get("char_filter") or {}
+        self._tokenizers = analysis.get("tokenizer") or {}
+        self._normalizers = analysis.get("normalizer") or {}
+        self._analyzers = {**_BUILTIN_ANALYZERS, **(analysis.get("analyzer") or {})}
+        # Query strings are analyzed once per search, not once per document
+        self.analyze = functools.lru_cache(maxsize=4096)(self._analyze)
+
+    def normalize(self, name: str | None, value: str) -> str:
+        if not name:
+            return value
+        spec = self._normalizers.get(name)
+        if spec is None:
+            raise api_error(400, "illegal_argument_exception", f"normalizer [{name}] not found")
+        value = self._apply_char_filters(spec.get("char_filter") or [], value)
+        for token_filter in spec.get("filter") or []:
+            value = self._token_filter(token_filter)(value)
+        return value
+
+    def _analyze(self, name: str, text: str) -> tuple[str, ...]:
+        spec = self._analyzers.get(name)
+        if spec is None:
+            raise api_error(400, "illegal_argument_exception", f"analyzer [{name}] not found")
+        text = self._apply_char_filters(spec.get("char_filter") or [], text)
+        tokens = self._tokenize(spec.get("tokenizer", "standard"), text)
+        for token_filter in spec.get("filter") or []:
+            apply = self._token_filter(token_filter)
+            tokens = [apply(token) for token in tokens]
+        return tuple(token for token in tokens if token)
+
+    def _apply_char_filters(self, names: list[str], text: str) -> str:
+        for name in names:
+            spec = self._char_filters.get(name) or {}
+            if spec.get("type") != "pattern_replace":
+                raise api_error(400, "illegal_argument_exception", f"char_filter [{name}] is not supported")
+            text = re.sub(spec["pattern"], spec.get("replacement", ""), text)
+        return text
+
+    def _tokenize(self, name: str, text: str) -> list[str]:
+        if name == "standard":
+            return _STANDARD_TOKEN.findall(text)
+        if name == "whitespace":
+            return text.split()
+        if name == "keyword":
+            return [text]
+        spec = self._tokenizers.get(name) or {}
+        if spec.get("type") != "edge_ngram":
+            raise api_error(400, "illegal_argument_exception", f"tokenizer [{name}] is not supported")
+        words = _LETTERS_AND_DIGITS.findall(text) if spec.get("token_chars") else [text]
+        min_gram, max_gram = spec.get("min_gram", 1), spec.get("max_gram", 2)
+        return [word[:n] for word in words for n in range(min_gram, min(max_gram, len(word)) + 1)]
+
+    @staticmethod
+    def _token_filter(name: str) -> Callable[[str], str]:
+        if name not in _TOKEN_FILTERS:
+            raise api_error(400, "illegal_argument_exception", f"token filter [{name}] is not supported")
+        return _TOKEN_FILTERS[name]
+
+
+class _Field(NamedTuple):
+    type: str
+    analyzer: str
+    search_analyzer: str
+    normalizer: str | None
+    indexed: bool
+    # Field whose values this one indexes (a multi-field's parent), or None for its own
+    parent: str | None
+
+
+class _Mapping:
+    """
+    Field types of one index, including multi-fields, copy_to targets and fields added by
+    dynamic mapping.
+    """
+
+    def __init__(self, mappings: dict):
+        self.body = copy.deepcopy(mappings)
+        self.fields: dict[str, _Field] = {}
+        self.copy_to: dict[str, list[str]] = {}
+        self.routing_required = bool((mappings.get("_routing") or {}).get("required"))
+        self._load(mappings.get("properties") or {}, "")
+
+    def _load(self, properties: dict, prefix: str) -> None:
+        for name, spec in properties.items():
+            path = prefix + name
+            if "properties" in spec:
+                self._load(spec["properties"], path + ".")
+                continue
+            self._add(path, spec, None)
+            if spec.get("copy_to"):
+                self.copy_to[path] = _as_list(spec["copy_to"])
+            for subfield, subspec in (spec.get("fields") or {}).items():
+                self._add(f"{path}.{subfield}", subspec, path)
+            if spec.get("type") == "search_as_you_type":
+                for subfield in _SEARCH_AS_YOU_TYPE_SUBFIELDS:
+                    self._add(f"{path}.{subfield}", spec, path)
+
+    def _add(self, path: str, spec: dict, parent: str | None) -> None:
+        analyzer = spec.get("analyzer", "standard")
+        self.fields[path] = _Field(
+            type=spec.get("type", "object"),
+            analyzer=analyzer,
+            search_analyzer=spec.get("search_analyzer", analyzer),
+            normalizer=spec.get("normalizer"),
+            indexed=spec.get("index", True),
+            parent=parent,
+        )
+
+    def learn(self, source: dict, prefix: str = "") -> None:
+        """
+        Dynamic mapping: strings become text with a `keyword` subfield, numbers and
+        booleans get their own type.
+        """
+        for key, value in source.items():
+            path = prefix + key
+            sample = next(iter(value), None) if isinstance(value, list) else value
+            if isinstance(sample, dict):
+                self.learn(sample, path + ".")
+                continue
+            if path in self.fields or sample is None:
+                continue
+            if isinstance(sample, bool):
+                spec = {"type": "boolean"}
+            elif isinstance(sample, int):
+                spec = {"type": "long"}
+            elif isinstance(sample, float):
+                spec = {"type": "float"}
+            else:
+                spec = {"type": "text", "fields": {"keyword": {"type": "keyword", "ignore_above": 256}}}
+            self._add(path, spec, None)
+            if spec["type"] == "text":
+                self._add(f"{path}.keyword", spec["fields"]["keyword"], path)
+            self._set_property(path, spec)
+
+    def _set_property(self, path: str, spec: dict) -> None:
+        properties = self.body.setdefault("properties", {})
+        *parents, name = path.split(".")
+        for parent in parents:
+            properties = properties.setdefault(parent, {}).setdefault("properties", {})
+        properties[name] = spec
+
+
+def _source_values(source: dict, path: str) -> list:
+    values = [source]
+    for part in path.split("."):
+        found = []
+        for value in values:
+            if isinstance(value, dict) and value.get(part) is not None:
+                found += _as_list(value[part])
+        values = found
+    return values
+
+
+class _Document(NamedTuple):
+    id: str
+    source: dict
+    routing: str | None
+    version: int
+    # field -> analyzed terms, for queries
+    terms: dict[str, tuple]
+    # field -> normalized values, for sorting and aggregations (doc values)
+    values: dict[str, tuple]
+
+
+class _Index:
+    def __init__(self, name: str, settings: dict, mappings: dict):
+        self.name = name
+        self.settings = settings
+        self.analysis = _Analysis(settings)
+        self.mapping = _Mapping(mappings)
+        self.documents: dict[str, _Document] = {}
+
+    def put(self, doc_id: str, source: dict, routing: str | None) -> _Document:
+        if self.mapping.routing_required and routing is None:
+            raise api_error(400, "routing_missing_exception", f"routing is required for [{self.name}]/[{doc_id}]")
+        self.mapping.learn(source)
+        previous = self.documents.get(doc_id)
+        document = _Document(
+            doc_id, source, routing, previous.version + 1 if previous else 1, *self._analyze_document(source)
+        )
+        self.documents[doc_id] = document
+        return document
+
+    def _analyze_document(self, source: dict) -> tuple[dict, dict]:
+        raw: dict[str, list] = {}
+        for path, field in self.mapping.fields.items():
+            if field.parent is None:
+                raw[path] = _source_values(source, path)
+        for path, targets in self.mapping.copy_to.items():
+            for target in targets:
+                raw.setdefault(target, []).extend(raw.get(path, []))
+        terms, values = {}, {}
+        for path, field in self.mapping.fields.items():
+            field_values = raw.get(field.parent or path)
+            if not field_values:
+                continue
+            if field.type in _TEXT_TYPES:
+                analyzed = tuple(
+                    token for value in field_values for token in self.analysis.analyze(field.analyzer, str(value))
+                )
+            elif field.type == "keyword":
+                analyzed = tuple(self.analysis.normalize(field.normalizer, str(value)) for value in field_values)
+                values[path] = analyzed
+            elif field.type in _NUMERIC_TYPES or field.type in ("boolean", "date"):
+                analyzed = tuple(field_values)
+                values[path] = analyzed
+            else:
+                continue
+            if field.indexed:
+                terms[path] = analyzed
+        return terms, values
+
+    def coerce(self, field: _Field, value) -> Any:
+        """
+        A term or range bound converted the way the field indexes its values.
+        """
+        if field.type == "keyword":
+            return self.analysis.normalize(field.normalizer, str(value))
+        if field.type in _NUMERIC_TYPES:
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                raise api_error(400, "query_shard_exception", f"failed to parse [{value}] as a number")
+        return value
+
+
+class _Searcher:
+    """
+    Evaluates the query DSL against one index; a query returns a score, or None when
+    the document does not match.
+    """
+
+    def __init__(self, index: _Index):
+        self._index = index
+
+    def evaluate(self, query: dict, document: _Document) -> float | None:
+        if not query:
+            return 1.0
+        ((kind, params),) = query.items()
+        handler = getattr(self, f"_{kind}", None)
+        if handler is None:
+            raise api_error(400, "parsing_exception", f"unknown query [{kind}]")
+        return handler(params, document)
+
+    def _field(self, path: str) -> _Field | None:
+        field = self._index.mapping.fields.get(path)
+        if field is not None and not field.indexed:
+            raise api_error(400, "query_shard_exception", f"Cannot search on field [{path}] since it is not indexed.")
+        return field
+
+    @staticmethod
+    def _single(params: dict) -> tuple[str, Any]:
+        return next((key, value) for key, value in params.items() if key not in ("boost", "_name"))
+
+    def _match_all(self, params: dict, document: _Document) -> float:
+        return params.get("boost", 1.0)
+
+    def _bool(self, params: dict, document: _Document) -> float | None:
+        # Filters first: they are cheap and rule out most documents, e.g. other tenants'
+        for clause in _as_list(params.get("filter")):
+            if self.evaluate(clause, document) is None:
+                return None
+        score = 0.0
+        for clause in _as_list(params.get("must")):
+            clause_score = self.evaluate(clause, document)
+            if clause_score is None:
+                return None
+            score += clause_score
+        for clause in _as_list(params.get("must_not")):
+            if self.evaluate(clause, document) is not None:
+                return None
+        should = _as_list(params.get("should"))
+        required = params.get("minimum_should_match")
+        if required is None:
+            required = 0 if params.get("must") or params.get("filter") else min(1, len(should))
+        matched = 0
+        for clause in should:
+            clause_score = self.evaluate(clause, document)
+            if clause_score is not None:
+                matched += 1
+                score += clause_score
+        if matched < int(required):
+            return None
+        return score * params.get("boost", 1.0)
+
+    def _term(self, params: dict, document: _Document) -> float | None:
+        path, spec = self._single(params)
+        spec = spec if isinstance(spec, dict) else {"value": spec}
+        return self._terms({path: [spec["value"]], "boost": spec.get("boost", 1.0)}, document,
+                           spec.get("case_insensitive", False))
+
+    def _terms(self, params: dict, document: _Document, case_insensitive: bool = False) -> float | None:
+        path, wanted = self._single(params)
+        field = self._field(path)
+        if field is None:
+            return None
+        targets = {self._index.coerce(field, value) for value in wanted}
+        if case_insensitive:
+            targets = {target.lower() if isinstance(target, str) else target for target in targets}
+        for term in document.terms.get(path, ()):
+            if case_insensitive and isinstance(term, str):
+                term = term.lower()
+            if term in targets:
+                return params.get("boost", 1.0)
+        return None
+
+    def _ids(self, params: dict, document: _Document) -> float | None:
+        return 1.0 if document.id in set(params.get("values") or []) else None
+
+    def _exists(self, params: dict, document: _Document) -> float | None:
+        path = params["field"]
+        return 1.0 if document.terms.get(path) or document.values.get(path) else None
+
+    def _range(self, params: dict, document: _Document) -> float | None:
+        path, bounds = self._single(params)
+        field = self._field(path)
+        if field is None:
+            return None
+        checks = {
+            "gt": lambda term, bound: term > bound,
+            "gte": lambda term, bound: term >= bound,
+            "lt": lambda term, bound: term < bound,
+            "lte": lambda term, bound: term <= bound,
+        }
+        limits = [(checks[op], self._index.coerce(field, bound)) for op, bound in bounds.items()
+                  if op in checks and bound is not None]
+        for term in document.terms.get(path, ()):
+            if all(check(term, bound) for check, bound in limits):
+                return bounds.get("boost", 1.0)
+        return None
+
+    def _prefix(self, params: dict, document: _Document) -> float | None:
+        path, spec = self._single(params)
+        spec = spec if isinstance(spec, dict) else {"value": spec}
+        field = self._field(path)
+        if field is None:
+            return None
+        prefix = self._index.coerce(field, spec["value"]) if field.type == "keyword" else str(spec["value"])
+        case_insensitive = spec.get("case_insensitive", False)
+        if case_insensitive:
+            prefix = prefix.lower()
+        for term in document.terms.get(path, ()):
+            term = str(term)
+            if (term.lower() if case_insensitive else term).startswith(prefix):
+                return spec.get("boost", 1.0)
+        return None
+
+    def _constant_score(self, params: dict, document: _Document) -> float | None:
+        if self.evaluate(params["filter"], document) is None:
+            return None
+        return params.get("boost", 1.0)
+
+    def _function_score(self, params: dict, document: _Document) -> float | None:
+        score = self.evaluate(params.get("query") or {"match_all": {}}, document)
+        if score is None:
+            return None
+        weights = [function.get("weight", 1.0) for function in params.get("functions") or []
+                   if "filter" not in function or self.evaluate(function["filter"], document) is not None]
+        score_mode = params.get("score_mode", "multiply")
+        if not weights:
+            function_score = 1.0
+        elif score_mode == "sum":
+            function_score = sum(weights)
+        elif score_mode == "max":
+            function_score = max(weights)
+        elif score_mode == "first":
+            function_score = weights[0]
+        else:
+            function_score = 1.0
+            for weight in weights:
+                function_score *= weight
+        boost_mode = params.get("boost_mode", "multiply")
+        if boost_mode == "replace":
+            score = function_score
+        elif boost_mode == "sum":
+            score += function_score
+        else:
+            score *= function_score
+        return score * params.get("boost", 1.0)
+
+    def _match(self, params: dict, document: _Document) -> float | None:
+        path, spec = self._single(params)
+        spec = spec if isinstance(spec, dict) else {"query": spec}
+        return self._match_field(path, str(spec["query"]), spec.get("operator", "or"), spec.get("fuzziness"),
+                                 False, document, spec.get("boost", 1.0))
+
+    def _multi_match(self, params: dict, document: _Document) -> float | None:
+        query = str(params["query"])
+        match_type = params.get("type", "best_fields")
+        prefix_last = match_type in ("bool_prefix", "phrase_prefix")
+        operator = params.get("operator", "and" if match_type == "phrase_prefix" else "or")
+        scores = []
+        for path, boost in self._expand_fields(params.get("fields") or ["*"]):
+            score = self._match_field(path, query, operator, params.get("fuzziness"), prefix_last, document, boost)
+            if score is not None:
+                scores.append(score)
+        if not scores:
+            return None
+        if match_type in ("most_fields", "bool_prefix"):
+            score = sum(scores)
+        else:
+            best = max(scores)
+            score = best + params.get("tie_breaker", 0.0) * (sum(scores) - best)
+        return score * params.get("boost", 1.0)
+
+    def _expand_fields(self, fields: list[str]) -> list[tuple[str, float]]:
+        expanded = []
+        for spec in fields:
+            pattern, _, boost = spec.partition("^")
+            for path, field in self._index.mapping.fields.items():
+                if fnmatch.fnmatchcase(path, pattern) and field.indexed and field.type in _TEXT_TYPES | {"keyword"}:
+                    expanded.append((path, float(boost or 1.0)))
+        return expanded
+
+    def _match_field(self, path: str, query: str, operator: str, fuzziness, prefix_last: bool,
+                     document: _Document, boost: float) -> float | None:
+        field = self._field(path)
+        tokens = document.terms.get(path)
+        if field is None or not tokens:
+            return None
+        if field.type == "keyword":
+            terms = (self._index.coerce(field, query),)
+        else:
+            terms = self._index.analysis.analyze(field.search_analyzer, query)
+        if not terms:
+            return None
+        matched, score = 0, 0.0
+        for position, term in enumerate(terms):
+            best = self._best_match(term, tokens, fuzziness, prefix_last and position == len(terms) - 1)
+            if best:
+                matched += 1
+                score += best
+        if not matched or (operator.lower() == "and" and matched < len(terms)):
+            return None
+        return score / len(terms) * boost
+
+    @staticmethod
+    def _best_match(term: str, tokens: tuple, fuzziness, as_prefix: bool) -> float:
+        if term in tokens:
+            return EXACT
+        if as_prefix and any(token.startswith(term) for token in tokens):
+            return PREFIX
+        if fuzziness in (None, 0, "0"):
+            return 0.0
+        edits = auto_fuzziness(term) if str(fuzziness).upper() == "AUTO" else int(fuzziness)
+        if edits and any(edit_distance(term, token, edits) <= edits for token in tokens):
+            return FUZZY
+        return 0.0
+
+
+def _compare(left: list, right: list, orders: list[str]) -> int:
+    for a, b, order in zip(left, right, orders):
+        if a == b:
+            continue
+        # Missing values sort last in either direction, like Elasticsearch's default
+        if a is None:
+            return 1
+        if b is None:
+            return -1
+        try:
+            result = -1 if a < b else 1
+        except TypeError:
+            raise api_error(400, "illegal_argument_exception", f"cannot compare sort values [{a}] and [{b}]")
+        return -result if order == "desc" else result
+    return 0
+
+
+def _parse_sort(sort) -> list[tuple[str, str]]:
+    parsed = []
+    for spec in _as_list(sort):
+        if isinstance(spec, str):
+            field, order = spec, None
+        else:
+            ((field, order),) = spec.items()
+            if isinstance(order, dict):
+                order = order.get("order")
+        parsed.append((field, order or ("desc" if field == "_score" else "asc")))
+    return parsed
+
+
+def _filter_source(source: dict, spec) -> dict | None:
+    if spec is None or spec is True:
+        return source
+    if spec is False:
+        return None
+    if isinstance(spec, dict):
+        includes, excludes = _as_list(spec.get("includes")), _as_list(spec.get("excludes"))
+    else:
+        includes, excludes = _as_list(spec), []
+    return {
+        key: value for key, value in source.items()
+        if (not includes or any(fnmatch.fnmatchcase(key, pattern) for pattern in includes))
+        and not any(fnmatch.fnmatchcase(key, pattern) for pattern in excludes)
+    }
+
+
+def filter_path(body, spec: str | list[str] | None):
+    """
+    Applies the `filter_path` response filter: dotted paths with `*` wildcards, and
+    exclusions starting with `-`.
+    """
+    if not spec:
+        return body
+    patterns = spec.split(",") if isinstance(spec, str) else spec
+    includes = [pattern.split(".") for pattern in patterns if pattern and not pattern.startswith("-")]
+    excludes = [pattern[1:].split(".") for pattern in patterns if pattern.startswith("-")]
+    if includes:
+        body = _include_paths(body, includes)
+        if body is None:
+            return {}
+    if excludes:
+        body = _exclude_paths(body, excludes)
+    return body
+
+
+def _include_paths(value, patterns: list[list[str]]):
+    if any(not pattern for pattern in patterns):
+        return value
+    if isinstance(value, list):
+        items = [item for item in (_include_paths(item, patterns) for item in value) if item is not None]
+        return items or None
+    if not isinstance(value, dict):
+        return None
+    kept = {}
+    for key, child in value.items():
+        rest = [pattern[1:] for pattern in patterns if fnmatch.fnmatchcase(key, pattern[0])]
+        if rest:
+            child = _include_paths(child, rest)
+            if child is not None:
+                kept[key] = child
+    # Like Elasticsearch, objects left empty by an include filter are dropped
+    return kept or None
+
+
+def _exclude_paths(value, patterns: list[list[str]]):
+    if isinstance(value, list):
+        return [_exclude_paths(item, patterns) for item in value]
+    if not isinstance(value, dict):
+        return value
+    kept = {}
+    for key, child in value.items():
+        rest = [pattern[1:] for pattern in patterns if fnmatch.fnmatchcase(key, pattern[0])]
+        if any(not pattern for pattern in rest):
+            continue
+        kept[key] = _exclude_paths(child, rest) if rest else child
+    return kept
+
+
+class _Cluster:
+    """
+    Indices, aliases and documents, and the implementation of each API call. Writes are
+    visible to searches immediately, as if every request asked for a refresh.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.indices: dict[str, _Index] = {}
+        # alias -> index -> alias properties (e.g. is_write_index)
+        self.aliases: dict[str, dict[str, dict]] = {}
+        self._tasks = itertools.count(1)
+        self._auto_ids = itertools.count(1)
+
+    # ---- index resolution ----------------------------------------------------------
+
+    def resolve(self, expression: str | list[str] | None, ignore_missing: bool = False) -> list[_Index]:
+        if isinstance(expression, str):
+            expression = expression.split(",")
+        names: dict[str, None] = {}
+        for part in expression or ["_all"]:
+            if part in ("_all", "*"):
+                names.update(dict.fromkeys(self.indices))
+            elif "*" in part:
+                names.update(dict.fromkeys(name for name in self.indices if fnmatch.fnmatchcase(name, part)))
+                for alias, members in self.aliases.items():
+                    if fnmatch.fnmatchcase(alias, part):
+                        names.update(dict.fromkeys(members))
+            elif part in self.indices:
+                names[part] = None
+            elif part in self.aliases:
+                names.update(dict.fromkeys(self.aliases[part]))
+            elif not ignore_missing:
+                raise api_error(404, "index_not_found_exception", f"no such index [{part}]")
+        return [self.indices[name] for name in names]
+
+    def write_index(self, name: str, create: bool) -> _Index:
+        if name in self.indices:
+            return self.indices[name]
+        if name in self.aliases:
+            members = self.aliases[name]
+            writers = [index for index, props in members.items() if props.get("is_write_index")]
+            if len(members) == 1:
+                writers = list(members)
+            if len(writers) != 1:
+                raise api_error(400, "illegal_argument_exception", f"no write index is defined for alias [{name}]")
+            return self.indices[writers[0]]
+        if not create:
+            raise api_error(404, "index_not_found_exception", f"no such index [{name}]")
+        # Automatic index creation with dynamic mappings
+        return self._create_index(name, {}, {})
+
+    def _create_index(self, name: str, settings: dict, mappings: dict) -> _Index:
+        if name in self.indices:
+            raise api_error(400, "resource_already_exists_exception", f"index [{name}] already exists")
+        if name in self.aliases:
+            raise api_error(400, "invalid_index_name_exception", f"Invalid index name [{name}], already exists as alias")
+        index = _Index(name, settings, mappings)
+        self.indices[name] = index
+        return index
+
+    # ---- indices API ---------------------------------------------------------------
+
+    def indices_create(self, index: str, body: dict | None = None, settings: dict | None = None,
+                       mappings: dict | None = None, aliases: dict | None = None, **_) -> dict:
+        body = body or {}
+        settings = settings or body.get("settings") or {}
+        with self._lock:
+            self._create_index(index, settings.get("index", settings), mappings or body.get("mappings") or {})
+            for alias, props in (aliases or body.get("aliases") or {}).items():
+                self._add_alias(index, alias, props)
+        return {"acknowledged": True, "shards_acknowledged": True, "index": index}
+
+    def indices_delete(self, index: str, **_) -> dict:
+        with self._lock:
+            names = index.split(",") if isinstance(index, str) else index
+            for name in names:
+                if name in self.aliases:
+                    raise api_error(400, "illegal_argument_exception",
+                                    f"The provided expression [{name}] matches an alias, specify the index instead")
+            for target in self.resolve(names):
+                del self.indices[target.name]
+                for members in self.aliases.values():
+                    members.pop(target.name, None)
+            self.aliases = {alias: members for alias, members in self.aliases.items() if members}
+        return {"acknowledged": True}
+
+    def indices_exists(self, index: str, **_) -> bool:
+        with self._lock:
+            try:
+                return bool(self.resolve(index)) or "*" in index
+            except ApiError:
+                return False
+
+    def indices_exists_alias(self, name: str, index: str | None = None, **_) -> bool:
+        with self._lock:
+            return bool(self._matching_aliases(name, index))
+
+    def indices_get_alias(self, name: str | None = None, index: str | None = None, **_) -> dict:
+        with self._lock:
+            found = self._matching_aliases(name, index)
+            if name and not found:
+                raise api_error(404, "aliases_not_found_exception", f"alias [{name}] missing")
+            response: dict = {}
+            for alias, index_name, props in found:
+                response.setdefault(index_name, {"aliases": {}})["aliases"][alias] = copy.deepcopy(props)
+            return response
+
+    def _matching_aliases(self, name: str | None, index: str | None) -> list[tuple[str, str, dict]]:
+        names = name.split(",") if name else ["*"]
+        indices = {target.name for target in self.resolve(index)} if index else None
+        return [
+            (alias, index_name, props)
+            for alias, members in self.aliases.items() if any(fnmatch.fnmatchcase(alias, n) for n in names)
+            for index_name, props in members.items() if indices is None or index_name in indices
+        ]
+
+    def indices_update_aliases(self, actions: list[dict] | None = None, body: dict | None = None, **_) -> dict:
+        actions = actions if actions is not None else (body or {}).get("actions", [])
+        with self._lock:
+            # All actions apply atomically: validate on a copy and swap it in
+            indices, aliases = dict(self.indices), copy.deepcopy(self.aliases)
+            try:
+                for action in actions:
+                    ((kind, params),) = action.items()
+                    names = _as_list(params.get("index")) + _as_list(params.get("indices"))
+                    targets = [target.name for target in self.resolve(names)]
+                    if kind == "remove_index":
+                        for target in targets:
+                            del self.indices[target]
+                            for members in self.aliases.values():
+                                members.pop(target, None)
+                        continue
+                    for alias in _as_list(params.get("alias")) + _as_list(params.get("aliases")):
+                        for target in targets:
+                            if kind == "add":
+                                props = {key: params[key] for key in ("is_write_index", "routing", "filter")
+                                         if key in params}
+                                self._add_alias(target, alias, props)
+                            elif kind == "remove":
+                                if target not in self.aliases.get(alias, {}):
+                                    raise api_error(404, "aliases_not_found_exception", f"alias [{alias}] missing")
+                                del self.aliases[alias][target]
+                            else:
+                                raise api_error(400, "parsing_exception", f"unknown alias action [{kind}]")
+                self.aliases = {alias: members for alias, members in self.aliases.items() if members}
+            except Exception:
+                self.indices, self.aliases = indices, aliases
+                raise
+        return {"acknowledged": True}
+
+    def _add_alias(self, index: str, alias: str, props: dict) -> None:
+        if alias in self.indices:
+            raise api_error(400, "invalid_alias_name_exception",
+                            f"Invalid alias name [{alias}]: an index or data stream exists with the same name")
+        self.aliases.setdefault(alias, {})[index] = dict(props)
+
+    def indices_get(self, index: str, **_) -> dict:
+        with self._lock:
+            response = {}
+            for target in self.resolve(index):
+                aliases = {alias: copy.deepcopy(members[target.name])
+                           for alias, members in self.aliases.items() if target.name in members}
+                response[target.name] = {
+                    "aliases": aliases,
+                    "mappings": copy.deepcopy(target.mapping.body),
+                    "settings": {"index": copy.deepcopy(target.settings)},
+                }
+            return response
+
+    def indices_get_settings(self, index: str | None = None, **_) -> dict:
+        with self._lock:
+            return {target.name: {"settings": {"index": copy.deepcopy(target.settings)}}
+                    for target in self.resolve(index)}
+
+    def indices_put_settings(self, settings: dict | None = None, index: str | None = None,
+                             body: dict | None = None, **_) -> dict:
+        settings = settings or body or {}
+        settings = settings.get("index", settings)
+        with self._lock:
+            for target in self.resolve(index):
+                for key, value in settings.items():
+                    if value is None:
+                        target.settings.pop(key, None)
+                    else:
+                        target.settings[key] = value
+        return {"acknowledged": True}
+
+    def indices_refresh(self, index: str | None = None, **_) -> dict:
+        with self._lock:
+            count = len(self.resolve(index, ignore_missing=True))
+        return {"_shards": {"total": count, "successful": count, "failed": 0}}
+
+    def indices_forcemerge(self, index: str | None = None, **_) -> dict:
+        return self.indices_refresh(index)
+
+    def indices_stats(self, index: str | None = None, **_) -> dict:
+        """
+        Document counts and an estimate of the store size: the JSON of the sources plus
+        the bytes of every indexed term, so mappings that index more terms come out larger.
+        """
+        with self._lock:
+            stats = {}
+            for target in self.resolve(index):
+                size = sum(
+                    len(json.dumps(document.source)) + sum(len(str(term)) for terms in document.terms.values()
+                                                           for term in terms)
+                    for document in target.documents.values()
+                )
+                stats[target.name] = {"primaries": {"docs": {"count": len(target.documents), "deleted": 0},
+                                                    "store": {"size_in_bytes": size}}}
+            totals = {
+                "docs": {"count": sum(s["primaries"]["docs"]["count"] for s in stats.values()), "deleted": 0},
+                "store": {"size_in_bytes": sum(s["primaries"]["store"]["size_in_bytes"] for s in stats.values())},
+            }
+            return {"_all": {"primaries": totals, "total": totals},
+                    "indices": {name: {**s, "total": s["primaries"]} for name, s in stats.items()}}
+
+    # ---- document API --------------------------------------------------------------
+
+    def index(self, index: str, document: dict | None = None, body: dict | None = None, id: str | None = None,
+              routing: str | None = None, op_type: str | None = None, **_) -> dict:
+        status, item = self._write(op_type or "index", index, id, document if document is not None else body, routing)
+        return item
+
+    def create(self, index: str, id: str, document: dict | None = None, body: dict | None = None,
+               routing: str | None = None, **_) -> dict:
+        status, item = self._write("create", index, id, document if document is not None else body, routing)
+        return item
+
+    def update(self, index: str, id: str, doc: dict | None = None, body: dict | None = None,
+               routing: str | None = None, doc_as_upsert: bool | None = None, upsert: dict | None = None,
+               **_) -> dict:
+        body = dict(body or {})
+        if doc is not None:
+            body["doc"] = doc
+        if doc_as_upsert is not None:
+            body["doc_as_upsert"] = doc_as_upsert
+        if upsert is not None:
+            body["upsert"] = upsert
+        status, item = self._write("update", index, id, body, routing)
+        return item
+
+    def delete(self, index: str, id: str, routing: str | None = None, **_) -> dict:
+        status, item = self._write("delete", index, id, None, routing)
+        if status == 404:
+            raise api_error(404, "not_found", f"[{id}]: document missing")
+        return item
+
+    def get(self, index: str, id: str, source=None, **_) -> dict:
+        with self._lock:
+            target = self.write_index(index, create=False)
+            document = target.documents.get(id)
+            if document is None:
+                raise api_error(404, "not_found", f"[{id}]: document missing")
+            return {"_index": target.name, "_id": id, "_version": document.version, "found": True,
+                    "_source": _filter_source(copy.deepcopy(document.source), source)}
+
+    def bulk(self, operations=None, body=None, index: str | None = None, routing: str | None = None, **_) -> dict:
+        started = time.perf_counter()
+        lines = self._ndjson(operations if operations is not None else body)
+        items = []
+        position = 0
+        while position < len(lines):
+            ((op_type, params),) = lines[position].items()
+            source = None if op_type == "delete" else lines[position + 1]
+            position += 1 if op_type == "delete" else 2
+            doc_id = params.get("_id")
+            try:
+                status, item = self._write(op_type, params.get("_index", index), doc_id, source,
+                                           params.get("routing", params.get("_routing", routing)))
+            except ApiError as e:
+                status, item = e.meta.status, {"_index": params.get("_index", index), "_id": doc_id,
+                                               "status": e.meta.status, "error": e.body["error"]}
+            items.append({op_type: {**item, "status": status}})
+        return {
+            "took": int((time.perf_counter() - started) * 1000),
+            "errors": any(next(iter(item.values()))["status"] >= 300 for item in items),
+            "items": items,
+        }
+
+    @staticmethod
+    def _ndjson(operations) -> list[dict]:
+        if isinstance(operations, (bytes, str)):
+            operations = operations.splitlines()
+        lines = []
+        for line in operations or []:
+            if isinstance(line, bytes):
+                line = line.decode()
+            if isinstance(line, str):
+                if not line.strip():
+                    continue
+                line = json.loads(line)
+            lines.append(line)
+        return lines
+
+    def _write(self, op_type: str, index: str | None, doc_id: str | None, source: dict | None,
+               routing) -> tuple[int, dict]:
+        if index is None:
+            raise api_error(400, "action_request_validation_exception", "index is missing")
+        routing = None if routing is None else str(routing)
+        with self._lock:
+            target = self.write_index(index, create=op_type in ("index", "create"))
+            if doc_id is None:
+                if op_type not in ("index", "create"):
+                    raise api_error(400, "action_request_validation_exception", "id is missing")
+                doc_id = f"fake-{next(self._auto_ids)}"
+            doc_id = str(doc_id)
+            existing = target.documents.get(doc_id)
+            item = {"_index": target.name, "_id": doc_id}
+            if op_type == "delete":
+                if existing is None:
+                    return 404, {**item, "result": "not_found"}
+                del target.documents[doc_id]
+                return 200, {**item, "result": "deleted", "_version": existing.version + 1}
+            if op_type == "update":
+                if existing is None:
+                    if source.get("doc_as_upsert"):
+                        new_source = source["doc"]
+                    elif "upsert" in source:
+                        new_source = source["upsert"]
+                    else:
+                        raise api_error(404, "document_missing_exception", f"[{doc_id}]: document missing")
+                else:
+                    new_source = self._merge(existing.source, source.get("doc") or {})
+                    routing = routing if routing is not None else existing.routing
+                document = target.put(doc_id, self._copy(new_source), routing)
+                return (201 if existing is None else 200), {
+                    **item, "result": "created" if existing is None else "updated", "_version": document.version
+                }
+            if op_type == "create" and existing is not None:
+                raise api_error(409, "version_conflict_engine_exception",
+                                f"[{doc_id}]: version conflict, document already exists")
+            if op_type not in ("index", "create"):
+                raise api_error(400, "illegal_argument_exception", f"Unknown bulk action [{op_type}]")
+            document = target.put(doc_id, self._copy(source or {}), routing)
+            return (200 if existing else 201), {
+                **item, "result": "updated" if existing else "created", "_version": document.version
+            }
+
+    @staticmethod
+    def _copy(source: dict) -> dict:
+        # What the document would look like after a round trip through JSON
+        return json.loads(json.dumps(source, default=str))
+
+    @classmethod
+    def _merge(cls, base: dict, update: dict) -> dict:
+        merged = dict(base)
+        for key, value in update.items():
+            if isinstance(value, dict) and isinstance(merged.get(key), dict):
+                merged[key] = cls._merge(merged[key], value)
+            else:
+                merged[key] = value
+        return merged
+
+    # ---- search API ----------------------------------------------------------------
+
+    def search(self, index: str | None = None, body: dict | None = None, **params) -> dict:
+        started = time.perf_counter()
+        request = dict(body or {})
+        for key in ("query", "size", "from_", "sort", "search_after", "post_filter", "aggs", "aggregations",
+                    "track_total_hits", "terminate_after", "source", "_source"):
+            if params.get(key) is not None:
+                request[key.rstrip("_") if key == "from_" else key] = params[key]
+        with self._lock:
+            response = self._search(self.resolve(index), request)
+        response["took"] = int((time.perf_counter() - started) * 1000)
+        return response
+
+    def _search(self, indices: list[_Index], request: dict) -> dict:
+        query = request.get("query") or {"match_all": {}}
+        terminate_after = request.get("terminate_after")
+        matches = []
+        terminated = False
+        for target in indices:
+            searcher = _Searcher(target)
+            found = 0
+            for document in target.documents.values():
+                score = searcher.evaluate(query, document)
+                if score is None:
+                    continue
+                matches.append((score, target, searcher, document))
+                found += 1
+                if terminate_after and found >= terminate_after:
+                    terminated = True
+                    break
+
+        aggs = request.get("aggs") or request.get("aggregations")
+        aggregations = self._aggregate(aggs, [(target, document) for _, target, _, document in matches])
+        if request.get("post_filter"):
+            matches = [match for match in matches if match[2].evaluate(request["post_filter"], match[3]) is not None]
+
+        sort = _parse_sort(request.get("sort"))
+        explicit_sort = bool(sort)
+        sort = sort or [("_score", "desc")]
+        orders = [order for _, order in sort]
+        keyed = [([self._sort_value(field, order, score, document) for field, order in sort], match)
+                 for match in matches for score, _, _, document in [match]]
+        keyed.sort(key=functools.cmp_to_key(lambda a, b: _compare(a[0], b[0], orders)))
+        if request.get("search_after"):
+            search_after = list(request["search_after"])
+            keyed = [entry for entry in keyed if _compare(entry[0], search_after, orders) > 0]
+
+        start = request.get("from", 0)
+        page = keyed[start:start + request.get("size", 10)]
+        source_spec = request.get("_source", request.get("source"))
+        scored = not explicit_sort or any(field == "_score" for field, _ in sort)
+        hits = []
+        for values, (score, target, _, document) in page:
+            hit = {"_index": target.name, "_id": document.id, "_score": score if scored else None}
+            if document.routing is not None:
+                hit["_routing"] = document.routing
+            source = _filter_source(copy.deepcopy(document.source), source_spec)
+            if source is not None:
+                hit["_source"] = source
+            if explicit_sort:
+                hit["sort"] = values
+            hits.append(hit)
+
+        hits_section: dict = {}
+        track_total_hits = request.get("track_total_hits", _DEFAULT_TRACK_TOTAL_HITS)
+        if track_total_hits is not False:
+            limit = None if track_total_hits is True else int(track_total_hits)
+            if limit is not None and len(matches) > limit:
+                hits_section["total"] = {"value": limit, "relation": "gte"}
+            else:
+                hits_section["total"] = {"value": len(matches), "relation": "eq"}
+        hits_section["max_score"] = max((score for score, *_ in matches), default=None) if scored else None
+        hits_section["hits"] = hits
+        response = {
+            "took": 0,
+            "timed_out": False,
+            "_shards": {"total": len(indices), "successful": len(indices), "skipped": 0, "failed": 0},
+            "hits": hits_section,
+        }
+        if terminated:
+            response["terminated_early"] = True
+        if aggregations is not None:
+            response["aggregations"] = aggregations
+        return response
+
+    @staticmethod
+    def _sort_value(field: str, order: str, score: float, document: _Document):
+        if field == "_score":
+            return score
+        if field == "_doc":
+            return 0
+        values = document.values.get(field)
+        if not values:
+            return None
+        return min(values) if order == "asc" else max(values)
+
+    def _aggregate(self, aggs: dict | None, matches: list[tuple[_Index, _Document]]) -> dict | None:
+        if not aggs:
+            return None
+        result = {}
+        for name, spec in aggs.items():
+            sub_aggs = spec.get("aggs") or spec.get("aggregations")
+            kind = next(key for key in spec if key not in ("aggs", "aggregations", "meta"))
+            params = spec[kind]
+            values = [value for _, document in matches for value in document.values.get(params.get("field"), ())]
+            if kind == "terms":
+                buckets: dict[Any, list] = {}
+                for target, document in matches:
+                    for value in set(document.values.get(params["field"], ())):
+                        buckets.setdefault(value, []).append((target, document))
+                ranked = sorted(buckets.items(), key=lambda item: (-len(item[1]), item[0]))
+                size = params.get("size", 10)
+                result[name] = {
+                    "doc_count_error_upper_bound": 0,
+                    "sum_other_doc_count": sum(len(members) for _, members in ranked[size:]),
+                    "buckets": [
+                        {"key": key, "doc_count": len(members),
+                         **(self._aggregate(sub_aggs, members) or {})}
+                        for key, members in ranked[:size]
+                    ],
+                }
+            elif kind == "sum":
+                result[name] = {"value": float(sum(values))}
+            elif kind == "min":
+                result[name] = {"value": float(min(values)) if values else None}
+            elif kind == "max":
+                result[name] = {"value": float(max(values)) if values else None}
+            elif kind == "value_count":
+                result[name] = {"value": len(values)}
+            elif kind == "cardinality":
+                result[name] = {"value": len(set(values))}
+            else:
+                raise api_error(400, "parsing_exception", f"unknown aggregation type [{kind}]")
+        return result
+
+    def msearch(self, searches=None, body=None, index: str | None = None, **_) -> dict:
+        started = time.perf_counter()
+        lines = self._ndjson(searches if searches is not None else body)
+        responses = []
+        for header, request in zip(lines[::2], lines[1::2]):
+            try:
+                with self._lock:
+                    response = self._search(self.resolve(header.get("index", index)), request)
+                response["status"] = 200
+            except ApiError as e:
+                response = {"error": e.body["error"], "status": e.meta.status}
+            responses.append(response)
+        return {"took": int((time.perf_counter() - started) * 1000), "responses": responses}
+
+    def count(self, index: str | None = None, query: dict | None = None, body: dict | None = None, **_) -> dict:
+        request = {"query": query or (body or {}).get("query"), "size": 0, "track_total_hits": True}
+        with self._lock:
+            targets = self.resolve(index)
+            total = self._search(targets, request)["hits"]["total"]["value"]
+        return {"count": total, "_shards": {"total": len(targets), "successful": len(targets), "skipped": 0,
+                                            "failed": 0}}
+
+    def delete_by_query(self, index: str, query: dict | None = None, body: dict | None = None,
+                        wait_for_completion: bool | None = None, **_) -> dict:
+        started = time.perf_counter()
+        query = query or (body or {}).get("query")
+        deleted = 0
+        with self._lock:
+            for target in self.resolve(index):
+                searcher = _Searcher(target)
+                doomed = [doc_id for doc_id, document in target.documents.items()
+                          if searcher.evaluate(query, document) is not None]
+                for doc_id in doomed:
+                    del target.documents[doc_id]
+                deleted += len(doomed)
+        if wait_for_completion is False:
+            # The task has already finished by the time anyone could look at it
+            return {"task": f"fake:{next(self._tasks)}"}
+        return {"took": int((time.perf_counter() - started) * 1000), "timed_out": False, "total": deleted,
+                "deleted": deleted, "failures": []}
+
+    def info(self, **_) -> dict:
+        return {"name": "fake", "cluster_name": "fake", "version": {"number": "8.13.0"}, "tagline": "You Know, for Search"}
+
+
+class _Failure:
+    def __init__(self, error: Exception | int, times: int | None, operations: set[str] | None):
+        self.error = error
+        self.times = times
+        self.operations = operations
+
+
+def _sync_api(operation: str):
+    def call(self, **kwargs):
+        return self._client._call(operation, kwargs) if hasattr(self, "_client") else self._call(operation, kwargs)
+    call.__name__ = operation.rsplit(".", 1)[-1]
+    return call
+
+
+def _async_api(operation: str):
+    async def call(self, **kwargs):
+        client = self._client if hasattr(self, "_client") else self
+        return await client._call(operation, kwargs)
+    call.__name__ = operation.rsplit(".", 1)[-1]
+    return call
+
+
+class _Indices:
+    def __init__(self, client):
+        self._client = client
+
+    create = _sync_api("indices.create")
+    delete = _sync_api("indices.delete")
+    exists = _sync_api("indices.exists")
+    exists_alias = _sync_api("indices.exists_alias")
+    get = _sync_api("indices.get")
+    get_alias = _sync_api("indices.get_alias")
+    update_aliases = _sync_api("indices.update_aliases")
+    get_settings = _sync_api("indices.get_settings")
+    put_settings = _sync_api("indices.put_settings")
+    refresh = _sync_api("indices.refresh")
+    forcemerge = _sync_api("indices.forcemerge")
+    stats = _sync_api("indices.stats")
+
+
+class _AsyncIndices(_Indices):
+    create = _async_api("indices.create")
+    delete = _async_api("indices.delete")
+    exists = _async_api("indices.exists")
+    exists_alias = _async_api("indices.exists_alias")
+    get = _async_api("indices.get")
+    get_alias = _async_api("indices.get_alias")
+    update_aliases = _async_api("indices.update_aliases")
+    get_settings = _async_api("indices.get_settings")
+    put_settings = _async_api("indices.put_settings")
+    refresh = _async_api("indices.refresh")
+    forcemerge = _async_api("indices.forcemerge")
+    stats = _async_api("indices.stats")
+
+
+class FakeElasticsearch:
+    """
+    In-process stand-in for the `Elasticsearch` client, for tests and benchmarks.
+
+    Implements the part of the API SearchService, the drift checker and the scripts use
+    (index management and aliases, document writes, `_bulk`, `_search`, `_msearch`,
+    `_count` and `_delete_by_query`) with the query DSL they send: bool, term(s), ids,
+    range, prefix, exists, match, multi_match (with fuzziness and bool_prefix),
+    constant_score and function_score, plus sorting, search_after, aggregations and
+    filter_path. Mappings and analysis settings are honoured as far as _Analysis goes.
+    Scores only approximate Elasticsearch's (no BM25), but keep its order of exact,
+    prefix and fuzzy matches and of boosts.
+
+    Responses and errors are the real client's types (ObjectApiResponse, NotFoundError,
+    ConnectionError, ...), so `elasticsearch.helpers` and error handling work unchanged.
+
+    `latency` (seconds, or a function of the operation name such as "search" or
+    "indices.get") delays every request; a request that takes longer than the
+    `request_timeout` given to `options()` raises ConnectionTimeout after it. See
+    `fail` for failure injection; `calls` counts requests per operation.
+    """
+
+    def __init__(self, latency: float | Callable[[str], float] = 0.0):
+        self._cluster = _Cluster()
+        self.latency = latency
+        self.calls: Counter[str] = Counter()
+        self._failures: list[_Failure] = []
+        self._fault_lock = threading.Lock()
+        self._request_timeout: float | None = None
+        self.indices = _Indices(self)
+        self.transport = SimpleNamespace(serializers=SerializerCollection())
+
+    search = _sync_api("search")
+    msearch = _sync_api("msearch")
+    count = _sync_api("count")
+    bulk = _sync_api("bulk")
+    index = _sync_api("index")
+    create = _sync_api("create")
+    update = _sync_api("update")
+    delete = _sync_api("delete")
+    get = _sync_api("get")
+    delete_by_query = _sync_api("delete_by_query")
+    info = _sync_api("info")
+
+    def options(self, request_timeout: float | None = None, **_) -> "FakeElasticsearch":
+        client = copy.copy(self)
+        if request_timeout is not None:
+            client._request_timeout = request_timeout
+        client.indices = type(self.indices)(client)
+        return client
+
+    def fail(self, error: Exception | int = 503, times: int | None = None,
+             operations: Iterable[str] | None = None) -> None:
+        """
+        Makes the next `times` requests (all of them if None) to `operations` (any, if
+        None) fail. `error` is the exception to raise, e.g. elasticsearch.ConnectionError,
+        or the HTTP status of an error response.
+        """
+        with self._fault_lock:
+            self._failures.append(_Failure(error, times, set(operations) if operations else None))
+
+    def heal(self) -> None:
+        """
+        Drops all injected failures.
+        """
+        with self._fault_lock:
+            self._failures.clear()
+
+    def close(self) -> None:
+        pass
+
+    def _begin(self, operation: str) -> tuple[float, Exception | None]:
+        """
+        Counts the request and returns how long it takes and the error it ends with.
+        """
+        with self._fault_lock:
+            self.calls[operation] += 1
+            error = None
+            for failure in self._failures:
+                if failure.operations is None or operation in failure.operations:
+                    error = failure.error
+                    if failure.times is not None:
+                        failure.times -= 1
+                        if not failure.times:
+                            self._failures.remove(failure)
+                    break
+        delay = self.latency(operation) if callable(self.latency) else self.latency
+        if self._request_timeout is not None and delay > self._request_timeout:
+            return self._request_timeout, ConnectionTimeout(f"Connection timed out after {self._request_timeout}s")
+        if isinstance(error, int):
+            error = api_error(error, "injected_failure", f"{operation} failed with {error}")
+        return delay, error
+
+    def _call(self, operation: str, kwargs: dict):
+        delay, error = self._begin(operation)
+        if delay:
+            time.sleep(delay)
+        if error is not None:
+            raise error
+        return self._run(operation, kwargs)
+
+    def _run(self, operation: str, kwargs: dict):
+        ignore = set(_as_list(kwargs.pop("ignore", None)))
+        path = kwargs.pop("filter_path", None)
+        kwargs.pop("request_timeout", None)
+        try:
+            result = getattr(self._cluster, operation.replace(".", "_"))(**kwargs)
+        except ApiError as e:
+            if e.meta.status not in ignore:
+                raise
+            return ObjectApiResponse(body=e.body, meta=e.meta)
+        if isinstance(result, bool):
+            return HeadApiResponse(meta=_meta(200 if result else 404))
+        return ObjectApiResponse(body=filter_path(result, path), meta=_meta(200))
+
+
+class AsyncFakeElasticsearch:
+    """
+    The `AsyncElasticsearch` counterpart of FakeElasticsearch. It shares the indices,
+    latency, failures and call counts of `fake`, so writes made through the sync client
+    are visible here; latency is waited out with asyncio.sleep.
+    """
+
+    def __init__(self, fake: FakeElasticsearch | None = None):
+        self.fake = fake or FakeElasticsearch()
+        self._request_timeout: float | None = None
+        self.indices = _AsyncIndices(self)
+
+    search = _async_api("search")
+    msearch = _async_api("msearch")
+    count = _async_api("count")
+    bulk = _async_api("bulk")
+    index = _async_api("index")
+    create = _async_api("create")
+    update = _async_api("update")
+    delete = _async_api("delete")
+    get = _async_api("get")
+    delete_by_query = _async_api("delete_by_query")
+    info = _async_api("info")
+
+    def options(self, request_timeout: float | None = None, **_) -> "AsyncFakeElasticsearch":
+        client = copy.copy(self)
+        if request_timeout is not None:
+            client._request_timeout = request_timeout
+        client.indices = _AsyncIndices(client)
+        return client
+
+    async def close(self) -> None:
+        pass
+
+    async def _call(self, operation: str, kwargs: dict):
+        delay, error = self.fake.options(request_timeout=self._request_timeout)._begin(operation)
+        if delay:
+            await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return self.fake._run(operation, kwargs)
@@ -0,0 +1,318 @@
+import queue
+from contextlib import nullcontext
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from elasticsearch import ApiError
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.schema import add_missing_columns
+from app.models import Clients, Mechanics, SearchSyncCheckpoint, Vehicles
+from app.repositories.vehicle_repository import VehicleRepository
+from tests.fixtures.fake_elasticsearch import AsyncFakeElasticsearch, FakeElasticsearch
+
+
+@pytest.fixture
+def es() -> FakeElasticsearch:
+    return FakeElasticsearch()
+
+
+@pytest.fixture
+def reindex(search_engine_module, test_engine, db_session: Session, es: FakeElasticsearch, monkeypatch):
+    """
+    scripts/reindex.py on the test database, writing through a real SearchService to the fake
+    """
+    from scripts import reindex
+
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+    service = search_engine_module.SearchService(es=es, async_es=AsyncFakeElasticsearch(es))
+    service.ensure_index()
+    monkeypatch.setattr(search_engine_module, "SessionLocal", session_factory)
+    monkeypatch.setattr(reindex, "SessionLocal", session_factory)
+    monkeypatch.setattr(reindex, "search_service", service)
+    monkeypatch.setattr(reindex, "es_client", es)
+    # Rows written by the test are seconds old, not minutes
+    monkeypatch.setattr(reindex, "INCREMENTAL_SAFETY_LAG", timedelta(0))
+    # No other processes to wait for before and after swapping aliases
+    monkeypatch.setattr(service, "PENDING_ALIAS_TTL", 0.0)
+    yield reindex
+    service.stop_bulk_buffer()
+
+
+@pytest.fixture
+def mechanic(db_session: Session) -> Mechanics:
+    mechanic = Mechanics(name="Mechanic", email="reindex@example.com", hashed_password="x")
+    db_session.add(mechanic)
+    db_session.commit()
+    return mechanic
+
+
+class InlineResult:
+    """
+    AsyncResult of a task that already ran
+    """
+
+    def __init__(self, func, args):
+        self._value = self._error = None
+        try:
+            self._value = func(*args)
+        except Exception as error:
+            self._error = error
+
+    def ready(self) -> bool:
+        return True
+
+    def get(self):
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+
+@pytest.fixture
+def inline_pool(reindex, es: FakeElasticsearch, monkeypatch):
+    """
+    Runs the bulk re-index workers one after the other in this process, against the fake
+    """
+    pool = SimpleNamespace(apply_async=InlineResult)
+    context = SimpleNamespace(
+        Manager=lambda: nullcontext(SimpleNamespace(Queue=queue.Queue)),
+        Pool=lambda processes: nullcontext(pool),
+    )
+    monkeypatch.setattr(reindex, "multiprocessing", SimpleNamespace(get_context=lambda method: context))
+    monkeypatch.setattr(reindex, "Elasticsearch", lambda hosts: es)
+    return reindex
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def create_client(db: Session, mechanic: Mechanics, last_name: str) -> Clients:
+    client = Clients(name="Jan", last_name=last_name, mechanic_id=mechanic.id)
+    db.add(client)
+    db.commit()
+    return client
+
+
+def create_vehicle(db: Session, client: Clients, model: str = "Corolla") -> Vehicles:
+    vehicle = Vehicles(mark="Toyota", model=model, client_id=client.id, mechanic_id=client.mechanic_id)
+    db.add(vehicle)
+    db.commit()
+    return vehicle
+
+
+def indexed_ids(reindex, es: FakeElasticsearch, index: str | None = None) -> list[str]:
+    """
+    Ids of the documents in `index`, the shared alias by default.
+    """
+    response = es.search(index=index or reindex.search_service.INDEX_NAME, query={"match_all": {}}, size=100)
+    return sorted(hit["_id"] for hit in response["hits"]["hits"])
+
+
+def clear_index(reindex, es: FakeElasticsearch) -> None:
+    es.delete_by_query(index=reindex.search_service.INDEX_NAME, query={"match_all": {}})
+
+
+# ============================================================================
+# INCREMENTAL RE-INDEX TESTS
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.integration
+class TestIncrementalReindex:
+    """Tests for scripts/reindex.py --incremental"""
+
+    def test_first_run_sends_everything_and_saves_checkpoint(self, reindex, db_session: Session,
+                                                             es: FakeElasticsearch, mechanic: Mechanics):
+        client = create_client(db_session, mechanic, "Kowalski")
+        vehicle = create_vehicle(db_session, client)
+
+        reindex.incremental_reindex(chunk_size=10)
+
+        assert indexed_ids(reindex, es) == [f"client-{client.id}", f"vehicle-{vehicle.id}"]
+        checkpoint = db_session.get(SearchSyncCheckpoint, "incremental")
+        assert checkpoint.synced_until is not None
+        assert checkpoint.window_end is None
+
+    def test_next_run_sends_only_changed_rows(self, reindex, db_session: Session,
+                                              es: FakeElasticsearch, mechanic: Mechanics):
+        renamed = create_client(db_session, mechanic, "Kowalski")
+        vehicle = create_vehicle(db_session, renamed)
+        untouched = create_client(db_session, mechanic, "Nowak")
+        create_vehicle(db_session, untouched, model="Yaris")
+        reindex.incremental_reindex(chunk_size=10)
+        clear_index(reindex, es)
+
+        renamed.last_name = "Wiśniewski"
+        db_session.commit()
+        reindex.incremental_reindex(chunk_size=10)
+
+        # The vehicle carries its owner's name, so it goes out with the client
+        assert indexed_ids(reindex, es) == [f"client-{renamed.id}", f"vehicle-{vehicle.id}"]
+
+    def test_viewing_a_vehicle_is_not_a_change(self, reindex, db_session: Session,
+                                               es: FakeElasticsearch, mechanic: Mechanics):
+        client = create_client(db_session, mechanic, "Kowalski")
+        vehicle = create_vehicle(db_session, client)
+        updated_at = vehicle.updated_at
+        reindex.incremental_reindex(chunk_size=10)
+        clear_index(reindex, es)
+
+        VehicleRepository(db_session).update_last_view_column_in_vehicles(vehicle)
+        reindex.incremental_reindex(chunk_size=10)
+
+        assert vehicle.updated_at == updated_at
+        assert indexed_ids(reindex, es) == []
+
+
+# ============================================================================
+# REBUILD TESTS
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.integration
+class TestRebuild:
+    """Tests for rebuilding an index behind its alias (scripts/reindex.py without --incremental)"""
+
+    def test_index_created_right_after_another_gets_its_own_name(self, reindex):
+        service = reindex.search_service
+
+        assert service.begin_rebuild() != service.begin_rebuild()
+
+    def test_rebuild_swaps_alias_and_keeps_writes_made_meanwhile(self, reindex, db_session: Session,
+                                                                 es: FakeElasticsearch, mechanic: Mechanics):
+        service = reindex.search_service
+        (old_index,) = es.indices.get_alias(name=service.INDEX_NAME)
+        before = create_client(db_session, mechanic, "Kowalski")
+        service.dispatch_outbox(db_session)
+        during = {}
+
+        def load(index_name: str):
+            client = create_client(db_session, mechanic, "Nowak")
+            service.dispatch_outbox(db_session)
+            during.update(index=index_name, doc_id=f"client-{client.id}",
+                          old=indexed_ids(reindex, es, old_index), new=indexed_ids(reindex, es, index_name))
+            reindex.reindex_all_data(index_name)
+
+        reindex.rebuild_index(load, keep_old=0)
+
+        # The write made during the rebuild was mirrored into the index being built
+        assert during["doc_id"] in during["old"]
+        assert during["new"] == [during["doc_id"]]
+        assert list(es.indices.get_alias(name=service.INDEX_NAME)) == [during["index"]]
+        assert not es.indices.exists_alias(name=service.PENDING_ALIAS)
+        assert not es.indices.exists(index=old_index)
+        assert indexed_ids(reindex, es) == sorted([f"client-{before.id}", during["doc_id"]])
+
+    def test_shared_rebuild_leaves_out_dedicated_tenants(self, reindex, db_session: Session,
+                                                         es: FakeElasticsearch, mechanic: Mechanics):
+        service = reindex.search_service
+        shared = create_client(db_session, mechanic, "Kowalski")
+        tenant = Mechanics(name="Tenant", email="tenant@example.com", hashed_password="x")
+        db_session.add(tenant)
+        db_session.commit()
+        moved = create_client(db_session, tenant, "Nowak")
+        moved_vehicle = create_vehicle(db_session, moved)
+        reindex.rebuild_index(lambda index_name: reindex.reindex_all_data(index_name, tenant.id),
+                              keep_old=0, mechanic_id=tenant.id)
+
+        reindex.rebuild_index(reindex.reindex_all_data, keep_old=0)
+
+        assert indexed_ids(reindex, es) == [f"client-{shared.id}"]
+        assert indexed_ids(reindex, es, service.tenant_alias(tenant.id)) == [
+            f"client-{moved.id}", f"vehicle-{moved_vehicle.id}",
+        ]
+
+
+# ============================================================================
+# BULK RE-INDEX TESTS
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.integration
+class TestSplitIdRange:
+    """Tests for splitting a table between the bulk re-index workers"""
+
+    def test_empty_table_has_no_ranges(self, reindex, db_session: Session):
+        assert reindex.split_id_range(db_session, Clients, 4) == []
+
+    def test_fewer_rows_than_parts_gives_one_row_each(self, reindex, db_session: Session, mechanic: Mechanics):
+        first = create_client(db_session, mechanic, "Kowalski")
+        second = create_client(db_session, mechanic, "Nowak")
+
+        assert reindex.split_id_range(db_session, Clients, 4) == [(first.id, first.id), (second.id, second.id)]
+
+    def test_uneven_split_gives_the_last_part_the_remainder(self, reindex, db_session: Session,
+                                                            mechanic: Mechanics):
+        ids = [create_client(db_session, mechanic, f"Client {n}").id for n in range(5)]
+
+        assert reindex.split_id_range(db_session, Clients, 2) == [(ids[0], ids[2]), (ids[3], ids[4])]
+
+    def test_range_of_one_mechanic(self, reindex, db_session: Session, mechanic: Mechanics):
+        create_client(db_session, mechanic, "Kowalski")
+        other = Mechanics(name="Other", email="other@example.com", hashed_password="x")
+        db_session.add(other)
+        db_session.commit()
+        theirs = create_client(db_session, other, "Nowak")
+
+        assert reindex.split_id_range(db_session, Clients, 2, mechanic_id=other.id) == [(theirs.id, theirs.id)]
+
+
+@pytest.mark.unit
+@pytest.mark.integration
+class TestBulkReindex:
+    """Tests for scripts/reindex.py --workers"""
+
+    def test_loads_every_range_and_restores_settings(self, inline_pool, db_session: Session,
+                                                     es: FakeElasticsearch, mechanic: Mechanics):
+        (index_name,) = es.indices.get_alias(name=inline_pool.search_service.INDEX_NAME)
+        es.indices.put_settings(index=index_name, settings={"refresh_interval": "30s"})
+        clients = [create_client(db_session, mechanic, f"Client {n}") for n in range(3)]
+        vehicle = create_vehicle(db_session, clients[0])
+
+        inline_pool.bulk_reindex_all_data(index_name, workers=2, chunk_size=2)
+
+        assert indexed_ids(inline_pool, es) == sorted(
+            [f"client-{client.id}" for client in clients] + [f"vehicle-{vehicle.id}"]
+        )
+        index_settings = es.indices.get_settings(index=index_name)[index_name]["settings"]["index"]
+        assert index_settings["refresh_interval"] == "30s"
+        assert "number_of_replicas" not in index_settings
+
+    def test_worker_failure_restores_settings(self, inline_pool, db_session: Session,
+                                              es: FakeElasticsearch, mechanic: Mechanics):
+        (index_name,) = es.indices.get_alias(name=inline_pool.search_service.INDEX_NAME)
+        es.indices.put_settings(index=index_name, settings={"refresh_interval": "30s", "number_of_replicas": 1})
+        create_client(db_session, mechanic, "Kowalski")
+        es.fail(500, operations=["bulk"])
+
+        with pytest.raises(ApiError):
+            inline_pool.bulk_reindex_all_data(index_name, workers=2, chunk_size=2)
+
+        index_settings = es.indices.get_settings(index=index_name)[index_name]["settings"]["index"]
+        assert index_settings["refresh_interval"] == "30s"
+        assert index_settings["number_of_replicas"] == 1
+
+
+# ============================================================================
+# SCHEMA UPGRADE TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestAddMissingColumns:
+    """Tests for adding updated_at to databases created before it existed"""
+
+    def test_adds_column_once(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE clients (id INTEGER PRIMARY KEY, name VARCHAR)"))
+
+        add_missing_columns(engine)
+        add_missing_columns(engine)
+
+        inspector = inspect(engine)
+        assert "updated_at" in [column["name"] for column in inspector.get_columns("clients")]
+        assert "ix_clients_updated_at" in [index["name"] for index in inspector.get_indexes("clients")]
+        engine.dispose()
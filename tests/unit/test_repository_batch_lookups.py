@@ -0,0 +1,60 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models import Clients, Mechanics, Vehicles
+from app.repositories.client_repository import ClientRepository
+from app.repositories.vehicle_repository import VehicleRepository
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def create_mechanic(db: Session, email: str) -> Mechanics:
+    mechanic = Mechanics(name="Mechanic", email=email, hashed_password="x")
+    db.add(mechanic)
+    db.commit()
+    return mechanic
+
+
+def create_client_with_vehicle(db: Session, mechanic: Mechanics) -> tuple[Clients, Vehicles]:
+    client = Clients(name="John", last_name="Doe", mechanic_id=mechanic.id)
+    db.add(client)
+    db.flush()
+    vehicle = Vehicles(mark="Audi", model="A4", client_id=client.id, mechanic_id=mechanic.id)
+    db.add(vehicle)
+    db.commit()
+    return client, vehicle
+
+
+# ============================================================================
+# BATCH LOOKUP TESTS
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.integration
+class TestBatchLookups:
+    """Tests for the IN-query lookups used to hydrate search results"""
+
+    def test_clients_by_ids_are_scoped_to_mechanic(self, db_session: Session):
+        mine, other = create_mechanic(db_session, "a@example.com"), create_mechanic(db_session, "b@example.com")
+        my_client, _ = create_client_with_vehicle(db_session, mine)
+        other_client, _ = create_client_with_vehicle(db_session, other)
+
+        clients = ClientRepository(db_session).get_clients_by_ids([my_client.id, other_client.id, 999], mine.id)
+
+        assert [client.id for client in clients] == [my_client.id]
+
+    def test_vehicles_by_ids_load_their_client(self, db_session: Session):
+        mine, other = create_mechanic(db_session, "a@example.com"), create_mechanic(db_session, "b@example.com")
+        client, my_vehicle = create_client_with_vehicle(db_session, mine)
+        _, other_vehicle = create_client_with_vehicle(db_session, other)
+
+        vehicles = VehicleRepository(db_session).get_vehicles_by_ids([my_vehicle.id, other_vehicle.id], mine.id)
+
+        assert [vehicle.id for vehicle in vehicles] == [my_vehicle.id]
+        assert vehicles[0].client.last_name == "Doe"
+
+    def test_empty_id_list_skips_the_query(self, db_session: Session):
+        assert ClientRepository(db_session).get_clients_by_ids([], 1) == []
+        assert VehicleRepository(db_session).get_vehicles_by_ids([], 1) == []
@@ -0,0 +1,120 @@
+import queue
+import threading
+
+import pytest
+
+from app.search.bulk_buffer import BulkBuffer, coalesce
+
+
+def action(doc_id: str, op_type: str = "index", index: str = "clients_and_vehicles") -> dict:
+    if op_type == "delete":
+        return {"_op_type": "delete", "_index": index, "_id": doc_id}
+    return {"_index": index, "_id": doc_id, "_source": {"id": doc_id}}
+
+
+class Sender:
+    def __init__(self):
+        self.batches = []
+        self.sent = threading.Event()
+
+    def __call__(self, actions: list[dict], tenants: set) -> None:
+        self.batches.append((actions, tenants))
+        self.sent.set()
+
+
+@pytest.fixture
+def sender() -> Sender:
+    return Sender()
+
+
+# ============================================================================
+# COALESCING TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestCoalesce:
+    """Tests for collapsing several writes of one document into the last one"""
+
+    def test_last_action_per_document_wins(self):
+        actions = [action("client-1"), action("vehicle-2"), action("client-1", "delete")]
+
+        assert coalesce(actions) == [action("vehicle-2"), action("client-1", "delete")]
+
+    def test_same_id_in_different_indices_is_kept(self):
+        """Mirrored writes during a rebuild go to two indices"""
+        actions = [action("client-1", index="a"), action("client-1", index="b")]
+
+        assert coalesce(actions) == actions
+
+
+# ============================================================================
+# BUFFER TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestBulkBuffer:
+    """Tests for micro-batching search writes into _bulk requests"""
+
+    def test_flush_sends_one_batch_with_its_tenants(self, sender: Sender):
+        buffer = BulkBuffer(sender, max_operations=10, flush_interval=60.0, max_pending=100)
+        buffer.add([action("client-1")], tenant=1)
+        buffer.add([action("vehicle-2")], tenant=2)
+
+        assert buffer.flush() == 2
+        assert sender.batches == [([action("client-1"), action("vehicle-2")], {1, 2})]
+
+    def test_flush_splits_into_batches_of_max_operations(self, sender: Sender):
+        buffer = BulkBuffer(sender, max_operations=2, flush_interval=60.0, max_pending=100)
+        buffer.add([action(f"client-{i}") for i in range(5)], tenant=1)
+
+        buffer.flush()
+
+        assert [len(actions) for actions, _ in sender.batches] == [2, 2, 1]
+
+    def test_thread_sends_when_batch_is_full(self, sender: Sender):
+        buffer = BulkBuffer(sender, max_operations=2, flush_interval=60.0, max_pending=100)
+        buffer.start()
+        try:
+            buffer.add([action("client-1"), action("client-2")], tenant=1)
+            assert sender.sent.wait(5.0)
+        finally:
+            buffer.stop()
+
+        assert len(sender.batches[0][0]) == 2
+
+    def test_thread_sends_after_flush_interval(self, sender: Sender):
+        buffer = BulkBuffer(sender, max_operations=100, flush_interval=0.01, max_pending=100)
+        buffer.start()
+        try:
+            buffer.add([action("client-1")], tenant=1)
+            assert sender.sent.wait(5.0)
+        finally:
+            buffer.stop()
+
+        assert sender.batches == [([action("client-1")], {1})]
+
+    def test_stop_sends_what_is_waiting(self, sender: Sender):
+        buffer = BulkBuffer(sender, max_operations=100, flush_interval=60.0, max_pending=100)
+        buffer.start()
+        buffer.add([action("client-1")], tenant=1)
+
+        buffer.stop()
+
+        assert sender.batches == [([action("client-1")], {1})]
+
+    def test_add_blocks_then_gives_up_when_full(self, sender: Sender):
+        buffer = BulkBuffer(sender, max_operations=2, flush_interval=60.0, max_pending=2)
+        buffer.add([action("client-1"), action("client-2")], tenant=1)
+
+        with pytest.raises(queue.Full):
+            buffer.add([action("client-3")], tenant=1, timeout=0.01)
+
+    def test_failed_send_drops_the_batch(self):
+        def failing_send(actions, tenants):
+            raise ConnectionError("Elasticsearch is down")
+
+        buffer = BulkBuffer(failing_send, max_operations=10, flush_interval=60.0, max_pending=100)
+        buffer.add([action("client-1")], tenant=1)
+
+        assert buffer.flush() == 0
+        assert buffer.flush() == 0
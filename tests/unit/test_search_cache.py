@@ -0,0 +1,97 @@
+import pytest
+
+from app.search.cache import SearchResultCache, normalize_query
+from tests.fixtures.clock import FakeClock
+
+
+@pytest.fixture
+def cache(clock: FakeClock) -> SearchResultCache:
+    return SearchResultCache(max_entries=3, ttl=30.0, settle_time=1.0, clock=clock)
+
+
+def store(cache: SearchResultCache, mechanic_id: int, key: str, value):
+    cache.put(mechanic_id, key, value, cache.generation(mechanic_id))
+
+
+# ============================================================================
+# QUERY NORMALIZATION TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestNormalizeQuery:
+    """Tests for cache key normalization"""
+
+    def test_collapses_whitespace(self):
+        assert normalize_query("  John   Doe ") == "John Doe"
+
+    def test_keeps_case_for_keyword_fields(self):
+        """VIN/phone fields are keywords, so case must not be folded"""
+        assert normalize_query("wvw") != normalize_query("WVW")
+
+
+# ============================================================================
+# SEARCH RESULT CACHE TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestSearchResultCache:
+    """Tests for the per-mechanic LRU/TTL search cache"""
+
+    def test_hit_after_put(self, cache: SearchResultCache):
+        store(cache, 1, "john", ["result"])
+
+        assert cache.get(1, "john") == ["result"]
+
+    def test_entries_are_isolated_per_mechanic(self, cache: SearchResultCache):
+        store(cache, 1, "john", ["mechanic 1"])
+
+        assert cache.get(2, "john") is None
+
+    def test_entry_expires_after_ttl(self, cache: SearchResultCache, clock: FakeClock):
+        store(cache, 1, "john", ["result"])
+        clock.now += 31
+
+        assert cache.get(1, "john") is None
+        assert len(cache) == 0
+
+    def test_least_recently_used_entry_is_evicted(self, cache: SearchResultCache):
+        store(cache, 1, "a", ["a"])
+        store(cache, 1, "b", ["b"])
+        store(cache, 1, "c", ["c"])
+        cache.get(1, "a")  # "b" is now the least recently used
+
+        store(cache, 1, "d", ["d"])
+
+        assert cache.get(1, "b") is None
+        assert cache.get(1, "a") == ["a"]
+        assert len(cache) == 3
+
+    def test_invalidate_drops_only_that_mechanic(self, cache: SearchResultCache):
+        store(cache, 1, "john", ["mechanic 1"])
+        store(cache, 2, "john", ["mechanic 2"])
+
+        cache.invalidate(1)
+
+        assert cache.get(1, "john") is None
+        assert cache.get(2, "john") == ["mechanic 2"]
+
+    def test_result_computed_before_invalidation_is_not_stored(self, cache: SearchResultCache, clock: FakeClock):
+        """A search that raced with a write must not repopulate the cache"""
+        generation = cache.generation(1)
+        clock.now += 5
+        cache.invalidate(1)
+        clock.now += 5
+
+        cache.put(1, "john", ["stale"], generation)
+
+        assert cache.get(1, "john") is None
+
+    def test_nothing_is_stored_until_index_refresh(self, cache: SearchResultCache, clock: FakeClock):
+        """Right after a write ES may not show it yet, so results are not cached"""
+        cache.invalidate(1)
+        store(cache, 1, "john", ["maybe stale"])
+        assert cache.get(1, "john") is None
+
+        clock.now += 1.5
+        store(cache, 1, "john", ["fresh"])
+        assert cache.get(1, "john") == ["fresh"]
@@ -0,0 +1,103 @@
+import pytest
+
+from app.search.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from tests.fixtures.clock import FakeClock
+
+
+class Unavailable(Exception):
+    pass
+
+
+class BadRequest(Exception):
+    pass
+
+
+@pytest.fixture
+def breaker(clock: FakeClock) -> CircuitBreaker:
+    return CircuitBreaker(
+        failure_threshold=3, reset_timeout=30.0, is_failure=lambda e: isinstance(e, Unavailable), clock=clock
+    )
+
+
+def fail(breaker: CircuitBreaker, error: Exception = None) -> None:
+    with pytest.raises(type(error) if error else Unavailable):
+        with breaker.guard():
+            raise error or Unavailable()
+
+
+# ============================================================================
+# OPENING TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestOpening:
+    """Tests for when the circuit opens"""
+
+    def test_opens_after_consecutive_failures(self, breaker: CircuitBreaker):
+        for _ in range(3):
+            fail(breaker)
+
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpenError):
+            with breaker.guard():
+                pytest.fail("call went through an open circuit")
+
+    def test_success_resets_the_failure_count(self, breaker: CircuitBreaker):
+        fail(breaker)
+        fail(breaker)
+        with breaker.guard():
+            pass
+        fail(breaker)
+        fail(breaker)
+
+        assert breaker.state == CLOSED
+
+    def test_caller_errors_do_not_count(self, breaker: CircuitBreaker):
+        """A bad request was still answered by Elasticsearch"""
+        for _ in range(5):
+            fail(breaker, BadRequest())
+
+        assert breaker.state == CLOSED
+
+
+# ============================================================================
+# HALF-OPEN TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestHalfOpen:
+    """Tests for probing Elasticsearch after the reset timeout"""
+
+    @pytest.fixture(autouse=True)
+    def _open(self, breaker: CircuitBreaker, clock: FakeClock):
+        for _ in range(3):
+            fail(breaker)
+        clock.now += 30.0
+
+    def test_lets_one_probe_through(self, breaker: CircuitBreaker):
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+
+    def test_successful_probe_closes(self, breaker: CircuitBreaker):
+        with breaker.guard():
+            pass
+
+        assert breaker.state == CLOSED
+        assert breaker.allow()
+
+    def test_failed_probe_reopens(self, breaker: CircuitBreaker, clock: FakeClock):
+        fail(breaker)
+
+        assert breaker.state == OPEN
+        clock.now += 29.0
+        assert not breaker.allow()
+        clock.now += 1.0
+        assert breaker.allow()
+
+    def test_lost_probe_frees_its_slot(self, breaker: CircuitBreaker, clock: FakeClock):
+        """A probe that never reports back does not keep the circuit half-open forever"""
+        assert breaker.allow()
+        clock.now += 30.0
+
+        assert breaker.allow()
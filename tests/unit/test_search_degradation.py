@@ -0,0 +1,116 @@
+import pytest
+
+from app.search.degradation import MINIMAL, NORMAL, REDUCED, DegradationController
+from tests.fixtures.clock import FakeClock
+
+
+@pytest.fixture
+def controller(clock: FakeClock) -> DegradationController:
+    return DegradationController(latency_threshold=0.1, max_in_flight=4, cooldown=10.0, clock=clock)
+
+
+def request(controller: DegradationController, clock: FakeClock, seconds: float) -> None:
+    with controller.track():
+        clock.now += seconds
+
+
+# ============================================================================
+# LATENCY TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestLatencyPressure:
+    """Tests for degrading on the moving average of request latency"""
+
+    def test_fast_requests_keep_full_plan(self, controller: DegradationController, clock: FakeClock):
+        for _ in range(20):
+            request(controller, clock, 0.05)
+
+        assert controller.level == NORMAL
+
+    def test_slow_requests_degrade_step_by_severity(self, controller: DegradationController, clock: FakeClock):
+        for _ in range(20):
+            request(controller, clock, 0.15)
+        assert controller.level == REDUCED
+
+        for _ in range(20):
+            request(controller, clock, 0.5)
+        assert controller.level == MINIMAL
+
+    def test_single_spike_is_smoothed_out(self, controller: DegradationController, clock: FakeClock):
+        for _ in range(10):
+            request(controller, clock, 0.02)
+        request(controller, clock, 0.3)
+
+        assert controller.level == NORMAL
+
+
+# ============================================================================
+# IN-FLIGHT TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestInFlightPressure:
+    """Tests for degrading on the number of concurrent requests"""
+
+    def test_concurrency_degrades_before_latency_rises(self, controller: DegradationController):
+        tracked = [controller.track() for _ in range(8)]
+        for context in tracked[:4]:
+            context.__enter__()
+        assert controller.level == REDUCED
+
+        for context in tracked[4:]:
+            context.__enter__()
+        assert controller.level == MINIMAL
+
+        for context in tracked:
+            context.__exit__(None, None, None)
+
+
+# ============================================================================
+# RECOVERY TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestRecovery:
+    """Tests for going back to the full plan when pressure drops"""
+
+    @pytest.fixture(autouse=True)
+    def _degrade(self, controller: DegradationController, clock: FakeClock):
+        for _ in range(20):
+            request(controller, clock, 0.5)
+        assert controller.level == MINIMAL
+
+    def test_steps_back_one_level_per_cooldown(self, controller: DegradationController, clock: FakeClock):
+        for _ in range(30):
+            request(controller, clock, 0.01)
+        assert controller.level == MINIMAL
+
+        clock.now += 10.0
+        request(controller, clock, 0.01)
+        assert controller.level == REDUCED
+
+        clock.now += 10.0
+        request(controller, clock, 0.01)
+        assert controller.level == NORMAL
+
+    def test_stays_degraded_while_pressure_hovers_near_threshold(self, controller: DegradationController,
+                                                                clock: FakeClock):
+        """Below the threshold but not clearly below it: no flapping back and forth"""
+        clock.now += 60.0
+        for _ in range(30):
+            request(controller, clock, 0.08)
+            clock.now += 10.0
+
+        assert controller.level == REDUCED
+
+    def test_errors_count_as_load(self, controller: DegradationController, clock: FakeClock):
+        """A request that timed out still took its time"""
+        clock.now += 60.0
+        for _ in range(30):
+            with pytest.raises(TimeoutError):
+                with controller.track():
+                    clock.now += 0.5
+                    raise TimeoutError()
+
+        assert controller.level == MINIMAL
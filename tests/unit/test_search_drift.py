@@ -0,0 +1,164 @@
+import pytest
+from elasticsearch import helpers
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models import Clients, Mechanics
+from app.search.drift import (
+    CHECKSUM_FIELD, ChunkDigest, DriftChecker, chunk_digest, document_checksum, plan_repairs,
+)
+from tests.fixtures.fake_elasticsearch import AsyncFakeElasticsearch, FakeElasticsearch
+
+SHARED = "clients_and_vehicles-v2"
+TENANT = "clients_and_vehicles_tenant_7-v1"
+
+
+def document(doc_id: int, mechanic_id: int = 1, name: str = "John Doe") -> dict:
+    document = {"id": doc_id, "type": "client", "mechanic_id": mechanic_id, "name": name}
+    document[CHECKSUM_FIELD] = document_checksum(document)
+    return document
+
+
+def hit(document: dict, index: str = SHARED, **changes) -> dict:
+    source = {"mechanic_id": document["mechanic_id"], CHECKSUM_FIELD: document[CHECKSUM_FIELD], **changes}
+    return {"_index": index, "_id": f"client-{document['id']}", "_source": source}
+
+
+def home_indices(mechanic_id: int) -> set[str]:
+    return {TENANT} if mechanic_id == 7 else {SHARED}
+
+
+# ============================================================================
+# CHECKSUM TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestChecksum:
+    """Tests for the per-document checksum and the per-chunk digest"""
+
+    def test_checksum_ignores_key_order_and_its_own_field(self):
+        first = {"id": 1, "name": "John Doe"}
+        second = {"name": "John Doe", "id": 1, CHECKSUM_FIELD: 123}
+
+        assert document_checksum(first) == document_checksum(second)
+
+    def test_checksum_changes_with_content(self):
+        assert document(1)[CHECKSUM_FIELD] != document(1, name="John Smith")[CHECKSUM_FIELD]
+
+    def test_checksum_fits_in_40_bits(self):
+        assert 0 <= document(1)[CHECKSUM_FIELD] < 2 ** 40
+
+    def test_chunk_digest_counts_and_sums(self):
+        documents = [document(1), document(2)]
+
+        digest = chunk_digest(documents)
+
+        assert digest == ChunkDigest(2, documents[0][CHECKSUM_FIELD] + documents[1][CHECKSUM_FIELD])
+
+    def test_documents_without_checksum_count_as_zero(self):
+        """Documents indexed before checksums existed never match, so they get re-indexed"""
+        assert chunk_digest([{"id": 1}]) == ChunkDigest(1, 0)
+
+
+# ============================================================================
+# REPAIR PLANNING TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestPlanRepairs:
+    """Tests for the document-by-document comparison of a mismatched chunk"""
+
+    def test_matching_chunk_needs_nothing(self):
+        documents = {"client-1": document(1)}
+
+        assert plan_repairs(documents, [hit(documents["client-1"])], home_indices) == (set(), [])
+
+    def test_missing_document_is_indexed(self):
+        documents = {"client-1": document(1), "client-2": document(2)}
+
+        to_index, to_delete = plan_repairs(documents, [hit(documents["client-1"])], home_indices)
+
+        assert to_index == {"client-2"}
+        assert to_delete == []
+
+    def test_outdated_document_is_indexed(self):
+        documents = {"client-1": document(1)}
+
+        to_index, _ = plan_repairs(documents, [hit(documents["client-1"], **{CHECKSUM_FIELD: 1})], home_indices)
+
+        assert to_index == {"client-1"}
+
+    def test_orphaned_document_is_deleted(self):
+        deleted_row = document(2)
+
+        to_index, to_delete = plan_repairs({}, [hit(deleted_row)], home_indices)
+
+        assert to_index == set()
+        assert to_delete == [(SHARED, "client-2", 1)]
+
+    def test_copy_left_in_shared_index_after_tenant_move(self):
+        """The tenant's copy is current, the one left behind in the shared index goes"""
+        documents = {"client-1": document(1, mechanic_id=7)}
+        hits = [hit(documents["client-1"], index=SHARED), hit(documents["client-1"], index=TENANT)]
+
+        to_index, to_delete = plan_repairs(documents, hits, home_indices)
+
+        assert to_index == set()
+        assert to_delete == [(SHARED, "client-1", 7)]
+
+
+# ============================================================================
+# CHECKER TESTS
+# ============================================================================
+
+@pytest.fixture
+def es() -> FakeElasticsearch:
+    return FakeElasticsearch()
+
+
+@pytest.fixture
+def service(search_engine_module, test_engine, db_session: Session, es: FakeElasticsearch, monkeypatch):
+    """
+    A SearchService on the fake Elasticsearch that reads the test database
+    """
+    monkeypatch.setattr(
+        search_engine_module, "SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+    )
+    service = search_engine_module.SearchService(es=es, async_es=AsyncFakeElasticsearch(es))
+    service.ensure_index()
+    yield service
+    service.stop_bulk_buffer()
+
+
+@pytest.mark.unit
+@pytest.mark.integration
+class TestDriftChecker:
+    """Tests for DriftChecker.run on the fake, with the index out of step with the database"""
+
+    def test_missing_outdated_and_orphaned_documents_are_repaired(self, service, test_engine, db_session: Session,
+                                                                  es: FakeElasticsearch):
+        mechanic = Mechanics(name="Mechanic", email="drift@example.com", hashed_password="x")
+        db_session.add(mechanic)
+        db_session.commit()
+        clients = [Clients(name="Jan", last_name=last_name, mechanic_id=mechanic.id)
+                   for last_name in ("Kowalski", "Nowak", "Wiśniewski", "Wójcik")]
+        db_session.add_all(clients)
+        db_session.commit()
+        service.dispatch_outbox(db_session)
+        missing, outdated = clients[0], clients[2]
+        # Nothing sent: the outbox row of the rename is left behind, as after a lost write
+        outdated.last_name = "Lewandowski"
+        db_session.commit()
+        es.delete_by_query(index=service.INDEX_NAME, query={"ids": {"values": [f"client-{missing.id}"]}})
+        orphan = Clients(id=clients[-1].id + 100, name="Anna", last_name="Zielińska", mechanic_id=mechanic.id)
+        orphan_id = f"client-{orphan.id}"
+        helpers.bulk(es, service.bulk_actions(orphan_id, mechanic.id, service.client_document(orphan)))
+        checker = DriftChecker(service, es, sessionmaker(bind=test_engine), chunk_size=2)
+
+        report = checker.run()
+
+        assert (report.scanned, report.indexed, report.deleted) == (4, 2, 1)
+        response = es.search(index=service.INDEX_NAME, query={"match_all": {}}, size=100)
+        indexed = {hit["_id"]: hit["_source"] for hit in response["hits"]["hits"]}
+        assert sorted(indexed) == sorted(f"client-{client.id}" for client in clients)
+        assert indexed[f"client-{outdated.id}"]["name"] == "Jan Lewandowski"
+        assert checker.run().mismatched_chunks == 0
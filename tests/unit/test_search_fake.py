@@ -0,0 +1,292 @@
+import asyncio
+
+import pytest
+from elasticsearch import ConnectionError, ConnectionTimeout, NotFoundError, helpers
+from elasticsearch.exceptions import ApiError, BadRequestError, ConflictError
+
+from tests.fixtures.fake_elasticsearch import AsyncFakeElasticsearch, FakeElasticsearch, filter_path
+
+MAPPINGS = {
+    "_routing": {"required": True},
+    "properties": {
+        "type": {"type": "keyword"},
+        "mechanic_id": {"type": "integer"},
+        "name": {
+            "type": "text",
+            "fields": {
+                "autocomplete": {"type": "text", "analyzer": "autocomplete", "search_analyzer": "standard"},
+                "keyword": {"type": "keyword"},
+            },
+        },
+        "vin": {"type": "keyword", "normalizer": "compact"},
+        "notes": {"type": "text", "index": False},
+    },
+}
+SETTINGS = {
+    "analysis": {
+        "char_filter": {"strip_spaces": {"type": "pattern_replace", "pattern": "\\s+", "replacement": ""}},
+        "normalizer": {"compact": {"type": "custom", "char_filter": ["strip_spaces"], "filter": ["uppercase"]}},
+        "tokenizer": {
+            "edge": {"type": "edge_ngram", "min_gram": 2, "max_gram": 10, "token_chars": ["letter", "digit"]},
+        },
+        "analyzer": {"autocomplete": {"tokenizer": "edge", "filter": ["lowercase"]}},
+    }
+}
+
+
+@pytest.fixture
+def es() -> FakeElasticsearch:
+    es = FakeElasticsearch()
+    es.indices.create(index="docs-1", settings=SETTINGS, mappings=MAPPINGS, aliases={"docs": {}})
+    documents = [
+        ("1", {"type": "client", "mechanic_id": 7, "name": "Jan Kowalski"}),
+        ("2", {"type": "vehicle", "mechanic_id": 7, "name": "Toyota Corolla", "vin": "jt123"}),
+        ("3", {"type": "vehicle", "mechanic_id": 8, "name": "Toyota Yaris", "notes": "Kowalski"}),
+    ]
+    for doc_id, document in documents:
+        es.index(index="docs", id=doc_id, document=document, routing=str(document["mechanic_id"]))
+    return es
+
+
+def ids(response) -> list[str]:
+    return [hit["_id"] for hit in response["hits"]["hits"]]
+
+
+# ============================================================================
+# QUERY TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestQueries:
+    """Tests for the query DSL the search service sends"""
+
+    def test_bool_filter_on_term(self, es: FakeElasticsearch):
+        response = es.search(index="docs", query={"bool": {
+            "must": {"match": {"name": "toyota"}},
+            "filter": [{"term": {"mechanic_id": 7}}],
+        }})
+
+        assert ids(response) == ["2"]
+        assert response["hits"]["total"] == {"value": 1, "relation": "eq"}
+
+    def test_term_uses_field_normalizer(self, es: FakeElasticsearch):
+        response = es.search(index="docs", query={"term": {"vin": "JT 123"}})
+
+        assert ids(response) == ["2"]
+
+    def test_multi_match_fuzziness(self, es: FakeElasticsearch):
+        exact = es.search(index="docs", query={"multi_match": {"query": "toyta", "fields": ["name"]}})
+        fuzzy = es.search(index="docs", query={
+            "multi_match": {"query": "toyta", "fields": ["name"], "fuzziness": "AUTO"}
+        })
+
+        assert ids(exact) == []
+        assert sorted(ids(fuzzy)) == ["2", "3"]
+
+    def test_edge_ngram_subfield_matches_prefix(self, es: FakeElasticsearch):
+        response = es.search(index="docs", query={"match": {"name.autocomplete": "kowa"}})
+
+        assert ids(response) == ["1"]
+
+    def test_boost_orders_hits(self, es: FakeElasticsearch):
+        response = es.search(index="docs", query={"bool": {"should": [
+            {"term": {"type": {"value": "client", "boost": 1.0}}},
+            {"term": {"type": {"value": "vehicle", "boost": 3.0}}},
+        ]}})
+
+        assert ids(response)[-1] == "1"
+
+    def test_unindexed_field_is_rejected(self, es: FakeElasticsearch):
+        with pytest.raises(BadRequestError):
+            es.search(index="docs", query={"match": {"notes": "kowalski"}})
+
+    def test_sort_and_search_after(self, es: FakeElasticsearch):
+        sort = [{"name.keyword": "asc"}]
+        first = es.search(index="docs", sort=sort, size=2)
+        second = es.search(index="docs", sort=sort, size=2, search_after=first["hits"]["hits"][-1]["sort"])
+
+        assert ids(first) == ["1", "2"]
+        assert ids(second) == ["3"]
+
+    def test_terms_aggregation_ignores_post_filter(self, es: FakeElasticsearch):
+        response = es.search(
+            index="docs",
+            aggs={"types": {"terms": {"field": "type"}}},
+            post_filter={"term": {"type": "client"}},
+        )
+
+        assert ids(response) == ["1"]
+        buckets = response["aggregations"]["types"]["buckets"]
+        assert buckets == [{"key": "vehicle", "doc_count": 2}, {"key": "client", "doc_count": 1}]
+
+    def test_terminate_after(self, es: FakeElasticsearch):
+        response = es.search(index="docs", terminate_after=1)
+
+        assert len(ids(response)) == 1
+        assert response["terminated_early"] is True
+
+    def test_msearch_reports_errors_per_search(self, es: FakeElasticsearch):
+        response = es.msearch(searches=[
+            {"index": "docs"}, {"query": {"term": {"type": "client"}}},
+            {"index": "missing"}, {"query": {"match_all": {}}},
+        ])
+
+        first, second = response["responses"]
+        assert first["status"] == 200 and ids(first) == ["1"]
+        assert second["status"] == 404 and second["error"]["type"] == "index_not_found_exception"
+
+
+# ============================================================================
+# WRITE TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestWrites:
+    """Tests for document writes, bulk requests and index management"""
+
+    def test_helpers_bulk_reports_missing_delete(self, es: FakeElasticsearch):
+        actions = [
+            {"_op_type": "index", "_index": "docs", "_id": "4", "_routing": "7", "_source": {"name": "Anna Nowak"}},
+            {"_op_type": "delete", "_index": "docs", "_id": "99", "_routing": "7"},
+        ]
+
+        success, errors = helpers.bulk(es, actions, raise_on_error=False)
+
+        assert success == 1
+        assert errors[0]["delete"]["status"] == 404
+        assert es.get(index="docs", id="4")["_source"] == {"name": "Anna Nowak"}
+
+    def test_routing_is_required(self, es: FakeElasticsearch):
+        with pytest.raises(BadRequestError):
+            es.index(index="docs", id="5", document={"name": "x"})
+
+    def test_create_conflicts_with_existing_document(self, es: FakeElasticsearch):
+        with pytest.raises(ConflictError):
+            es.create(index="docs", id="1", document={"name": "x"}, routing="7")
+
+    def test_delete_by_query_and_count(self, es: FakeElasticsearch):
+        es.delete_by_query(index="docs", query={"term": {"mechanic_id": 7}})
+
+        assert es.count(index="docs")["count"] == 1
+
+    def test_swap_alias(self, es: FakeElasticsearch):
+        es.indices.create(index="docs-2", mappings=MAPPINGS)
+        es.indices.update_aliases(actions=[
+            {"remove": {"index": "docs-1", "alias": "docs"}},
+            {"add": {"index": "docs-2", "alias": "docs"}},
+        ])
+
+        assert list(es.indices.get_alias(name="docs")) == ["docs-2"]
+        assert ids(es.search(index="docs")) == []
+
+    def test_failed_alias_update_changes_nothing(self, es: FakeElasticsearch):
+        with pytest.raises(NotFoundError):
+            es.indices.update_aliases(actions=[
+                {"add": {"index": "docs-1", "alias": "other"}},
+                {"add": {"index": "missing", "alias": "other"}},
+            ])
+
+        assert not es.indices.exists_alias(name="other")
+
+    def test_ignore_returns_error_body(self, es: FakeElasticsearch):
+        response = es.indices.delete(index="missing", ignore=[404])
+
+        assert response["status"] == 404
+        assert not es.indices.exists(index="missing")
+
+    def test_async_client_shares_indices(self, es: FakeElasticsearch):
+        async_es = AsyncFakeElasticsearch(es)
+
+        response = asyncio.run(async_es.search(index="docs", query={"ids": {"values": ["3"]}}))
+
+        assert ids(response) == ["3"]
+
+
+# ============================================================================
+# FILTER PATH TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestFilterPath:
+    """Tests for filter_path response filtering"""
+
+    def test_include_with_wildcard(self):
+        body = {"took": 1, "hits": {"hits": [{"_id": "1", "_source": {"a": 1}}]}}
+
+        assert filter_path(body, "hits.hits.*._id,hits.hits._source") == {"hits": {"hits": [{"_source": {"a": 1}}]}}
+
+    def test_exclude(self):
+        body = {"took": 1, "_shards": {}, "hits": {"hits": [{"_id": "1", "_index": "docs"}]}}
+
+        assert filter_path(body, "-_shards,-hits.hits._index") == {"took": 1, "hits": {"hits": [{"_id": "1"}]}}
+
+    def test_applied_to_responses(self, es: FakeElasticsearch):
+        response = es.search(index="docs", filter_path="hits.total")
+
+        assert response.body == {"hits": {"total": {"value": 3, "relation": "eq"}}}
+
+
+# ============================================================================
+# FAULT INJECTION TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestFaultInjection:
+    """Tests for injected failures and latency"""
+
+    def test_status_failure_for_some_requests(self, es: FakeElasticsearch):
+        es.fail(503, times=1, operations=["search"])
+
+        with pytest.raises(ApiError) as error:
+            es.search(index="docs")
+        assert error.value.meta.status == 503
+        es.count(index="docs")
+        es.search(index="docs")
+
+    def test_exception_failure_until_healed(self, es: FakeElasticsearch):
+        es.fail(ConnectionError("down"))
+
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                es.count(index="docs")
+        es.heal()
+        assert es.count(index="docs")["count"] == 3
+
+    def test_latency_over_request_timeout_times_out(self, es: FakeElasticsearch):
+        es.latency = lambda operation: 0.05 if operation == "search" else 0.0
+
+        with pytest.raises(ConnectionTimeout):
+            es.options(request_timeout=0.01).search(index="docs")
+        assert ids(es.options(request_timeout=1).search(index="docs", size=1))
+
+    def test_calls_are_counted(self, es: FakeElasticsearch):
+        async_es = AsyncFakeElasticsearch(es)
+        es.search(index="docs")
+        asyncio.run(async_es.options(request_timeout=1).search(index="docs"))
+
+        assert es.calls["search"] == 2
+        assert es.calls["index"] == 3
+
+
+# ============================================================================
+# STATS TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestStats:
+    """Tests for the estimated index statistics"""
+
+    def test_more_indexed_terms_mean_a_larger_store(self):
+        es = FakeElasticsearch()
+        es.indices.create(index="plain", mappings={"properties": {"name": {"type": "text"}}})
+        es.indices.create(index="ngrams", settings=SETTINGS, mappings={
+            "properties": {"name": {"type": "text", "analyzer": "autocomplete"}}
+        })
+        for index in ("plain", "ngrams"):
+            es.index(index=index, id="1", document={"name": "Jan Kowalski"})
+
+        stats = es.indices.stats(index="plain,ngrams")["indices"]
+
+        assert stats["plain"]["primaries"]["docs"]["count"] == 1
+        plain, ngrams = (stats[index]["primaries"]["store"]["size_in_bytes"] for index in ("plain", "ngrams"))
+        assert ngrams > plain
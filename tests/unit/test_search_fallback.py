@@ -0,0 +1,162 @@
+import pytest
+
+from app.search.fallback import FallbackSearchIndex, auto_fuzziness, edit_distance
+from tests.fixtures.clock import FakeClock
+
+
+DOCUMENTS = {
+    1: [
+        {"id": 1, "type": "client", "mechanic_id": 1, "name": "John Doe", "phone": "+48511222333"},
+        {"id": 2, "type": "client", "mechanic_id": 1, "name": "Johnny Walker", "phone": "+48600300400"},
+        {"id": 10, "type": "vehicle", "mechanic_id": 1, "name": "Toyota Corolla", "vin": "JT2BF22K1W0123456",
+         "registration_number": "WA 12345", "client_id": 1, "client_name": "John", "client_last_name": "Doe"},
+        {"id": 11, "type": "vehicle", "mechanic_id": 1, "name": "Volkswagen Golf GTI7RS", "vin": "WVWZZZ1JZXW000001",
+         "client_id": 2, "client_name": "Johnny", "client_last_name": "Walker"},
+    ],
+    2: [
+        {"id": 3, "type": "client", "mechanic_id": 2, "name": "John Smith", "phone": "+48600500600"},
+    ],
+}
+
+
+class Loader:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, mechanic_id: int) -> list[dict]:
+        self.calls.append(mechanic_id)
+        return [dict(document) for document in DOCUMENTS.get(mechanic_id, [])]
+
+
+@pytest.fixture
+def loader() -> Loader:
+    return Loader()
+
+
+@pytest.fixture
+def index(loader: Loader, clock: FakeClock) -> FallbackSearchIndex:
+    return FallbackSearchIndex(loader, max_documents=100, ttl=60.0, clock=clock)
+
+
+def ids(hits) -> list[tuple[str, int]]:
+    return [(document["type"], document["id"]) for _, document in hits]
+
+
+# ============================================================================
+# FUZZY MATCHING TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestFuzzyMatching:
+    """Tests for the fuzziness: AUTO approximation"""
+
+    def test_auto_fuzziness_follows_term_length(self):
+        assert auto_fuzziness("jo") == 0
+        assert auto_fuzziness("golf") == 1
+        assert auto_fuzziness("corolla") == 2
+
+    def test_transposition_counts_as_one_edit(self):
+        assert edit_distance("jhon", "john", 1) == 1
+
+    def test_distance_above_limit_is_capped(self):
+        assert edit_distance("golf", "corolla", 2) == 3
+
+
+# ============================================================================
+# FALLBACK SEARCH TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestFallbackSearchIndex:
+    """Tests for the in-process search used while Elasticsearch is down"""
+
+    def test_exact_match_ranks_clients_first(self, index: FallbackSearchIndex):
+        hits = index.search("john", mechanic_id=1, size=10)
+
+        assert ids(hits)[0] == ("client", 1)
+        assert ("vehicle", 10) in ids(hits)
+
+    def test_prefix_match(self, index: FallbackSearchIndex):
+        assert ids(index.search("volks", mechanic_id=1, size=10)) == [("vehicle", 11)]
+
+    def test_typo_is_tolerated(self, index: FallbackSearchIndex):
+        assert ("vehicle", 10) in ids(index.search("corola", mechanic_id=1, size=10))
+
+    def test_all_terms_must_match_in_one_field(self, index: FallbackSearchIndex):
+        """best_fields with operator=and, like the ES query"""
+        assert ids(index.search("john doe", mechanic_id=1, size=10)) == [("client", 1)]
+        assert index.search("john golf", mechanic_id=1, size=10) == []
+
+    def test_phone_and_vin_match_whole_value(self, index: FallbackSearchIndex):
+        assert ids(index.search("+48600300400", mechanic_id=1, size=10)) == [("client", 2)]
+        assert ids(index.search("WVWZZZ1JZXW000001", mechanic_id=1, size=10)) == [("vehicle", 11)]
+
+    def test_results_are_isolated_per_mechanic(self, index: FallbackSearchIndex):
+        assert ids(index.search("john", mechanic_id=2, size=10)) == [("client", 3)]
+
+    def test_type_filter(self, index: FallbackSearchIndex):
+        hits = index.search("john", mechanic_id=1, size=10, doc_type="vehicle")
+
+        assert {doc_type for doc_type, _ in ids(hits)} == {"vehicle"}
+
+    def test_search_after_continues_from_last_hit(self, index: FallbackSearchIndex):
+        everything = index.search("john", mechanic_id=1, size=10)
+        first_page = index.search("john", mechanic_id=1, size=2)
+
+        second_page = index.search("john", mechanic_id=1, size=10, search_after=first_page[-1][0])
+
+        assert ids(first_page) + ids(second_page) == ids(everything)
+
+    def test_upsert_and_remove_update_a_loaded_tenant(self, index: FallbackSearchIndex):
+        index.search("john", mechanic_id=1, size=10)
+
+        index.upsert({"id": 5, "type": "client", "mechanic_id": 1, "name": "Anna Nowak"})
+        assert ids(index.search("nowak", mechanic_id=1, size=10)) == [("client", 5)]
+
+        index.remove(1, "client-5")
+        assert index.search("nowak", mechanic_id=1, size=10) == []
+
+    def test_remove_client_vehicles(self, index: FallbackSearchIndex):
+        index.search("john", mechanic_id=1, size=10)
+
+        index.remove_client_vehicles(1, client_id=2)
+
+        assert index.search("golf", mechanic_id=1, size=10) == []
+        assert ids(index.search("corolla", mechanic_id=1, size=10)) == [("vehicle", 10)]
+
+    def test_tenant_is_reloaded_after_ttl(self, index: FallbackSearchIndex, loader: Loader, clock: FakeClock):
+        index.search("john", mechanic_id=1, size=10)
+        index.search("john", mechanic_id=1, size=10)
+        assert loader.calls == [1]
+
+        clock.now += 61
+        index.search("john", mechanic_id=1, size=10)
+        assert loader.calls == [1, 1]
+
+    def test_least_recently_used_tenant_is_dropped_when_full(self, loader: Loader, clock: FakeClock):
+        index = FallbackSearchIndex(loader, max_documents=4, ttl=60.0, clock=clock)
+        index.search("john", mechanic_id=1, size=10)
+        index.search("john", mechanic_id=2, size=10)  # 5 documents in total, tenant 1 goes
+
+        index.search("john", mechanic_id=2, size=10)
+        index.search("john", mechanic_id=1, size=10)
+
+        assert loader.calls == [1, 2, 1]
+
+    def test_phone_lookup_matches_digit_prefix(self, index: FallbackSearchIndex):
+        assert ids(index.search("+48 600 300", mechanic_id=1, size=10)) == [("client", 2)]
+
+    def test_vin_lookup_ignores_case(self, index: FallbackSearchIndex):
+        assert ids(index.search("jt2bf22k1w0123456", mechanic_id=1, size=10)) == [("vehicle", 10)]
+
+    def test_plate_lookup_ignores_spaces_and_case(self, index: FallbackSearchIndex):
+        assert ids(index.search("wa-12345", mechanic_id=1, size=10)) == [("vehicle", 10)]
+
+    def test_plate_shaped_text_can_run_as_text(self, index: FallbackSearchIndex):
+        """No vehicle has plate GTI7RS, but a name contains it"""
+        assert ids(index.search("GTI7RS", mechanic_id=1, size=10)) == []
+        assert ids(index.search("GTI7RS", mechanic_id=1, size=10, as_text=True)) == [("vehicle", 11)]
+
+    def test_type_counts_ignore_the_type_filter(self, index: FallbackSearchIndex):
+        """Like the `types` aggregation, counted over every match"""
+        assert index.type_counts("john", mechanic_id=1) == {"client": 2, "vehicle": 2}
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.search.metrics import instrumented, observe_search_response
+from tests.fixtures.fake_elasticsearch import FakeElasticsearch
+
+
+def sample(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+# ============================================================================
+# INSTRUMENTATION TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestInstrumented:
+    """Tests for the SearchService operation metrics"""
+
+    def test_records_latency_of_plain_method(self):
+        @instrumented("test_plain")
+        def operation(value):
+            return value * 2
+
+        before = sample("search_service_operation_seconds_count", operation="test_plain")
+
+        assert operation(21) == 42
+        assert sample("search_service_operation_seconds_count", operation="test_plain") == before + 1
+        assert sample("search_service_operations_in_progress", operation="test_plain") == 0
+
+    def test_records_latency_of_async_method(self):
+        @instrumented("test_async")
+        async def operation():
+            return "done"
+
+        before = sample("search_service_operation_seconds_count", operation="test_async")
+
+        assert asyncio.run(operation()) == "done"
+        assert sample("search_service_operation_seconds_count", operation="test_async") == before + 1
+
+    def test_counts_errors_by_type(self):
+        @instrumented("test_error")
+        def operation():
+            raise ConnectionError("Elasticsearch is down")
+
+        before = sample("search_service_operation_errors_total", operation="test_error", error="ConnectionError")
+
+        with pytest.raises(ConnectionError):
+            operation()
+        assert sample(
+            "search_service_operation_errors_total", operation="test_error", error="ConnectionError"
+        ) == before + 1
+        assert sample("search_service_operations_in_progress", operation="test_error") == 0
+
+    def test_search_response_records_took_and_hits(self):
+        response = {"took": 12, "hits": {"hits": [{}, {}, {}]}}
+
+        observe_search_response("test_response", response, seconds=0.02)
+
+        assert sample("search_es_took_seconds_sum", operation="test_response") == pytest.approx(0.012)
+        assert sample("search_es_request_seconds_sum", operation="test_response") == pytest.approx(0.02)
+        assert sample("search_hits_sum", operation="test_response") == 3
+
+    def test_index_creation_is_counted_once(self, search_engine_module):
+        service = search_engine_module.SearchService(es=FakeElasticsearch())
+        before = sample("search_service_operation_seconds_count", operation="create_index")
+
+        service.create_index_if_not_exists()
+
+        assert sample("search_service_operation_seconds_count", operation="create_index") == before + 1
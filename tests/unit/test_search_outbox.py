@@ -0,0 +1,86 @@
+import pytest
+from datetime import datetime
+from sqlalchemy.orm import Session
+
+import app.search.outbox  # noqa: F401  (registers the session listeners)
+from app.models import Clients, Mechanics, SearchOutbox, Vehicles
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def create_mechanic(db: Session) -> Mechanics:
+    mechanic = Mechanics(name="Mechanic", email="outbox@example.com", hashed_password="x")
+    db.add(mechanic)
+    db.commit()
+    return mechanic
+
+
+def outbox_entries(db: Session) -> list[tuple[str, int]]:
+    return [(row.entity_type, row.entity_id) for row in db.query(SearchOutbox).order_by(SearchOutbox.id)]
+
+
+# ============================================================================
+# OUTBOX CAPTURE TESTS
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.integration
+class TestSearchOutboxCapture:
+    """Tests for the session listener that fills the search outbox"""
+
+    def test_new_client_and_vehicle_are_queued(self, db_session: Session):
+        """Inserting entities writes outbox rows in the same commit"""
+        mechanic = create_mechanic(db_session)
+        client = Clients(name="John", last_name="Doe", mechanic_id=mechanic.id)
+        db_session.add(client)
+        db_session.flush()
+        vehicle = Vehicles(mark="Audi", model="A4", client_id=client.id, mechanic_id=mechanic.id)
+        db_session.add(vehicle)
+        db_session.commit()
+
+        assert outbox_entries(db_session) == [("client", client.id), ("vehicle", vehicle.id)]
+        row = db_session.query(SearchOutbox).first()
+        assert row.mechanic_id == mechanic.id
+        assert row.attempts == 0
+
+    def test_indexed_field_change_is_queued(self, db_session: Session):
+        """Changing a field that is part of the search document queues a re-index"""
+        mechanic = create_mechanic(db_session)
+        client = Clients(name="John", last_name="Doe", mechanic_id=mechanic.id)
+        db_session.add(client)
+        db_session.commit()
+        db_session.query(SearchOutbox).delete()
+        db_session.commit()
+
+        client.last_name = "Smith"
+        db_session.commit()
+
+        assert outbox_entries(db_session) == [("client", client.id)]
+
+    def test_non_indexed_field_change_is_ignored(self, db_session: Session):
+        """Touching last_view_data must not re-index the vehicle"""
+        mechanic = create_mechanic(db_session)
+        client = Clients(name="John", last_name="Doe", mechanic_id=mechanic.id)
+        db_session.add(client)
+        db_session.flush()
+        vehicle = Vehicles(mark="Audi", model="A4", client_id=client.id, mechanic_id=mechanic.id)
+        db_session.add(vehicle)
+        db_session.commit()
+        db_session.query(SearchOutbox).delete()
+        db_session.commit()
+
+        vehicle.last_view_data = datetime.utcnow()
+        db_session.commit()
+
+        assert outbox_entries(db_session) == []
+
+    def test_rollback_discards_outbox_rows(self, db_session: Session):
+        """Outbox rows share the entity's transaction"""
+        mechanic = create_mechanic(db_session)
+        db_session.add(Clients(name="John", last_name="Doe", mechanic_id=mechanic.id))
+        db_session.flush()
+        db_session.rollback()
+
+        assert outbox_entries(db_session) == []
@@ -0,0 +1,48 @@
+import pytest
+
+from app.search.query_classifier import PHONE, PLATE, TEXT, VIN, QueryShape, classify, normalize_phone, normalize_plate
+
+
+# ============================================================================
+# QUERY SHAPE TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestClassify:
+    """Tests for routing VINs and phone numbers away from the fuzzy query"""
+
+    def test_vin_is_normalized(self):
+        assert classify("wvwzzz1jzxw000001") == QueryShape(VIN, "WVWZZZ1JZXW000001")
+        assert classify(" WVW ZZZ1JZ-XW000001 ") == QueryShape(VIN, "WVWZZZ1JZXW000001")
+
+    def test_vin_alphabet_excludes_i_o_q(self):
+        assert classify("WVWZZZ1JZXO000001").kind == TEXT
+
+    def test_seventeen_letters_are_text(self):
+        assert classify("Konstantynopolski").kind == TEXT
+
+    def test_phone_with_separators(self):
+        assert classify("+48 511-222-333") == QueryShape(PHONE, "48511222333")
+        assert classify("(22) 123 45 67") == QueryShape(PHONE, "221234567")
+
+    def test_plate_is_normalized(self):
+        assert classify("wa 12345") == QueryShape(PLATE, "WA12345")
+        assert classify("KR-4G712") == QueryShape(PLATE, "KR4G712")
+
+    def test_model_names_are_not_plates(self):
+        assert classify("A4").kind == TEXT
+        assert classify("Golf").kind == TEXT
+
+    def test_short_numbers_are_text(self):
+        """Models like "308" and years must keep matching names"""
+        assert classify("308").kind == TEXT
+        assert classify("2019").kind == TEXT
+
+    def test_free_text_keeps_the_query(self):
+        assert classify("jan kowalski") == QueryShape(TEXT, "jan kowalski")
+
+    def test_normalize_phone_keeps_digits(self):
+        assert normalize_phone("+48 (511) 222-333") == "48511222333"
+
+    def test_normalize_plate_strips_separators(self):
+        assert normalize_plate(" wa 123-45 ") == "WA12345"
@@ -0,0 +1,101 @@
+import pytest
+
+from app.search.routing import IndexLayout, parse_layout, read_target, routing_for, write_targets
+
+SHARED = "clients_and_vehicles"
+PENDING = "_pending"
+
+
+def tenant(mechanic_id: int) -> str:
+    return f"clients_and_vehicles_tenant_{mechanic_id}"
+
+
+def layout(aliases: dict[str, list[str]], routed=()) -> IndexLayout:
+    return IndexLayout(aliases, set(routed))
+
+
+# ============================================================================
+# LAYOUT PARSING TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestParseLayout:
+    """Tests for reading aliases and routing from GET /clients_and_vehicles*"""
+
+    def test_collects_aliases_and_routed_indices(self):
+        response = {
+            "clients_and_vehicles-20260101000000": {
+                "aliases": {"clients_and_vehicles": {}},
+                "mappings": {"_meta": {"routing": "mechanic_id"}},
+            },
+            "clients_and_vehicles-20260201000000": {
+                "aliases": {"clients_and_vehicles_pending": {}},
+                "mappings": {"_meta": {"routing": "mechanic_id"}},
+            },
+        }
+
+        parsed = parse_layout(response)
+
+        assert parsed.aliases == {
+            "clients_and_vehicles": ["clients_and_vehicles-20260101000000"],
+            "clients_and_vehicles_pending": ["clients_and_vehicles-20260201000000"],
+        }
+        assert parsed.routed == set(response)
+
+    def test_index_without_meta_is_not_routed(self):
+        """Indices from before routing was introduced, including a pre-alias concrete index"""
+        parsed = parse_layout({"clients_and_vehicles": {}})
+
+        assert parsed.aliases == {}
+        assert parsed.routed == set()
+
+
+# ============================================================================
+# TARGET RESOLUTION TESTS
+# ============================================================================
+
+@pytest.mark.unit
+class TestRouting:
+    """Tests for choosing the index and routing of reads and writes"""
+
+    def test_routed_shared_index(self):
+        current = layout({SHARED: ["shared-v2"]}, routed=["shared-v2"])
+
+        assert read_target(current, SHARED, tenant(7), 7) == (SHARED, "7")
+
+    def test_legacy_index_is_not_routed(self):
+        """Documents indexed without routing are spread over all shards"""
+        current = layout({SHARED: ["shared-v1"]})
+
+        assert read_target(current, SHARED, tenant(7), 7) == (SHARED, None)
+        assert routing_for(layout({}), SHARED, 7) is None
+
+    def test_dedicated_tenant_reads_its_own_alias(self):
+        current = layout(
+            {SHARED: ["shared-v2"], tenant(7): ["tenant7-v1"]}, routed=["shared-v2", "tenant7-v1"]
+        )
+
+        assert read_target(current, SHARED, tenant(7), 7) == (tenant(7), "7")
+        assert read_target(current, SHARED, tenant(8), 8) == (SHARED, "8")
+
+    def test_writes_are_mirrored_into_rebuild(self):
+        """During the routing migration the old index gets unrouted writes, the new one routed"""
+        current = layout({SHARED: ["shared-v1"], SHARED + PENDING: ["shared-v2"]}, routed=["shared-v2"])
+
+        assert write_targets(current, SHARED, tenant(7), 7, PENDING) == [(SHARED, None), ("shared-v2", "7")]
+
+    def test_writes_are_mirrored_into_tenant_being_moved(self):
+        current = layout(
+            {SHARED: ["shared-v2"], tenant(7) + PENDING: ["tenant7-v1"]}, routed=["shared-v2", "tenant7-v1"]
+        )
+
+        assert write_targets(current, SHARED, tenant(7), 7, PENDING) == [(SHARED, "7"), ("tenant7-v1", "7")]
+        assert write_targets(current, SHARED, tenant(8), 8, PENDING) == [(SHARED, "8")]
+
+    def test_dedicated_tenant_writes_skip_shared_rebuild(self):
+        current = layout(
+            {SHARED: ["shared-v2"], SHARED + PENDING: ["shared-v3"], tenant(7): ["tenant7-v1"]},
+            routed=["shared-v2", "shared-v3", "tenant7-v1"],
+        )
+
+        assert write_targets(current, SHARED, tenant(7), 7, PENDING) == [(tenant(7), "7")]
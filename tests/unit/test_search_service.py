@@ -0,0 +1,402 @@
+import asyncio
+
+import pytest
+from elasticsearch import ConnectionError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.models import Clients, Mechanics, SearchOutbox, Vehicles
+from app.schemas.search import SearchQuery
+from app.search.cache import SearchResultCache
+from app.search.circuit_breaker import CircuitOpenError
+from app.search.degradation import MINIMAL, DegradationController
+from tests.fixtures.clock import FakeClock
+from tests.fixtures.fake_elasticsearch import AsyncFakeElasticsearch, FakeElasticsearch
+
+
+@pytest.fixture
+def es() -> FakeElasticsearch:
+    return FakeElasticsearch()
+
+
+@pytest.fixture
+def service(search_engine_module, test_engine, db_session: Session, es: FakeElasticsearch, monkeypatch):
+    """
+    A SearchService on the fake Elasticsearch that reads the test database
+    """
+    monkeypatch.setattr(
+        search_engine_module, "SessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+    )
+    service = search_engine_module.SearchService(es=es, async_es=AsyncFakeElasticsearch(es))
+    yield service
+    service.stop_bulk_buffer()
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def create_mechanic(db: Session, email: str = "search@example.com") -> Mechanics:
+    mechanic = Mechanics(name="Mechanic", email=email, hashed_password="x")
+    db.add(mechanic)
+    db.commit()
+    return mechanic
+
+
+def create_client(db: Session, mechanic: Mechanics, name: str = "Jan", last_name: str = "Kowalski",
+                  phone: str | None = None) -> Clients:
+    client = Clients(name=name, last_name=last_name, phone=phone, mechanic_id=mechanic.id)
+    db.add(client)
+    db.commit()
+    return client
+
+
+def create_vehicle(db: Session, client: Clients, mark: str = "Toyota", model: str = "Corolla",
+                   registration_number: str | None = None) -> Vehicles:
+    vehicle = Vehicles(mark=mark, model=model, registration_number=registration_number,
+                       client_id=client.id, mechanic_id=client.mechanic_id)
+    db.add(vehicle)
+    db.commit()
+    return vehicle
+
+
+def search(service, query: str, mechanic_id: int, **kwargs):
+    return asyncio.run(service.search(query, mechanic_id, **kwargs))
+
+
+def found(page) -> list[tuple[str, int]]:
+    return [(result.type, result.id) for result in page.results]
+
+
+# ============================================================================
+# INDEXING TESTS
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.integration
+class TestOutboxDispatch:
+    """Tests for sending outbox rows to Elasticsearch"""
+
+    def test_batch_goes_out_in_one_bulk_request(self, service, db_session: Session, es: FakeElasticsearch):
+        mechanic = create_mechanic(db_session)
+        client = create_client(db_session, mechanic)
+        vehicle = create_vehicle(db_session, client)
+
+        assert service.dispatch_outbox(db_session) == 2
+
+        assert db_session.query(SearchOutbox).count() == 0
+        assert es.calls["bulk"] == 1
+        assert found(search(service, "kowalski", mechanic.id)) == [("client", client.id), ("vehicle", vehicle.id)]
+
+    def test_client_rename_updates_vehicle_owner_fields(self, service, db_session: Session,
+                                                        es: FakeElasticsearch):
+        mechanic = create_mechanic(db_session)
+        client = create_client(db_session, mechanic)
+        vehicle = create_vehicle(db_session, client)
+        service.dispatch_outbox(db_session)
+        bulks = es.calls["bulk"]
+
+        client.name, client.last_name = "Anna", "Nowak"
+        db_session.commit()
+        service.dispatch_outbox(db_session)
+
+        document = es.get(index=service.INDEX_NAME, id=f"vehicle-{vehicle.id}", routing=str(mechanic.id))["_source"]
+        assert (document["client_name"], document["client_last_name"]) == ("Anna", "Nowak")
+        # The client and its vehicles go out in the same request
+        assert es.calls["bulk"] == bulks + 1
+        assert found(search(service, "nowak", mechanic.id, doc_type="vehicle")) == [("vehicle", vehicle.id)]
+
+    def test_moved_vehicle_gets_new_owner(self, service, db_session: Session, es: FakeElasticsearch):
+        mechanic = create_mechanic(db_session)
+        client = create_client(db_session, mechanic)
+        new_owner = create_client(db_session, mechanic, name="Anna", last_name="Nowak")
+        vehicle = create_vehicle(db_session, client)
+        service.dispatch_outbox(db_session)
+
+        vehicle.client_id = new_owner.id
+        db_session.commit()
+        service.dispatch_outbox(db_session)
+
+        document = es.get(index=service.INDEX_NAME, id=f"vehicle-{vehicle.id}", routing=str(mechanic.id))["_source"]
+        assert document["client_id"] == new_owner.id
+        assert (document["client_name"], document["client_last_name"]) == ("Anna", "Nowak")
+        assert found(search(service, "kowalski", mechanic.id, doc_type="vehicle")) == []
+
+    def test_failed_bulk_keeps_rows_for_retry(self, service, db_session: Session, es: FakeElasticsearch):
+        mechanic = create_mechanic(db_session)
+        create_client(db_session, mechanic)
+        service.ensure_index()
+        es.fail(ConnectionError("down"), operations=["bulk"])
+
+        service.dispatch_outbox(db_session)
+
+        row = db_session.query(SearchOutbox).one()
+        assert row.attempts == 1
+        assert "down" in row.last_error
+
+
+# ============================================================================
+# SEARCH TESTS
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.integration
+class TestSearch:
+    """Tests for the queries SearchService builds, run on the fake"""
+
+    def test_only_the_mechanics_documents_are_found(self, service, db_session: Session):
+        mechanic = create_mechanic(db_session)
+        other = create_mechanic(db_session, email="other@example.com")
+        client = create_client(db_session, mechanic)
+        create_client(db_session, other)
+        service.dispatch_outbox(db_session)
+
+        assert found(search(service, "kowalski", mechanic.id)) == [("client", client.id)]
+
+    def test_typo_and_phone_lookup(self, service, db_session: Session):
+        mechanic = create_mechanic(db_session)
+        client = create_client(db_session, mechanic, phone="600 100 200")
+        service.dispatch_outbox(db_session)
+
+        assert found(search(service, "kowlaski", mechanic.id)) == [("client", client.id)]
+        assert found(search(service, "600 1002", mechanic.id)) == [("client", client.id)]
+
+    def test_pages_follow_the_cursor(self, service, db_session: Session):
+        mechanic = create_mechanic(db_session)
+        clients = [create_client(db_session, mechanic, name=name, last_name="Nowak")
+                   for name in ("Anna", "Ewa", "Jan")]
+        service.dispatch_outbox(db_session)
+
+        first = search(service, "nowak", mechanic.id, size=2)
+        second = search(service, "nowak", mechanic.id, size=2, cursor=first.next_cursor)
+
+        assert first.type_counts == {"client": 3, "vehicle": 0}
+        assert second.next_cursor is None
+        assert sorted(found(first) + found(second)) == [("client", client.id) for client in clients]
+
+    def test_plate_shaped_text_keeps_running_as_text(self, service, db_session: Session):
+        """"A4 B8" looks like a plate, finds no plate and its later pages stay text searches"""
+        mechanic = create_mechanic(db_session)
+        client = create_client(db_session, mechanic)
+        vehicles = [create_vehicle(db_session, client, mark="Audi", model="A4 B8") for _ in range(3)]
+        service.dispatch_outbox(db_session)
+
+        first = search(service, "A4 B8", mechanic.id, size=2)
+        second = search(service, "A4 B8", mechanic.id, size=2, cursor=first.next_cursor)
+
+        assert len(found(first)) == 2
+        assert sorted(found(first) + found(second)) == [("vehicle", vehicle.id) for vehicle in vehicles]
+
+    def test_exact_model_ranks_first(self, service, db_session: Session):
+        mechanic = create_mechanic(db_session)
+        client = create_client(db_session, mechanic)
+        longer = create_vehicle(db_session, client, mark="Volkswagen", model="Golf Plus")
+        exact = create_vehicle(db_session, client, mark="Volkswagen", model="Golf")
+        service.dispatch_outbox(db_session)
+
+        page = search(service, "golf", mechanic.id)
+
+        assert found(page) == [("vehicle", exact.id), ("vehicle", longer.id)]
+
+    def test_hydrate_attaches_records(self, service, db_session: Session):
+        mechanic = create_mechanic(db_session)
+        client = create_client(db_session, mechanic)
+        service.dispatch_outbox(db_session)
+
+        page = search(service, "kowalski", mechanic.id, hydrate=True)
+
+        assert page.results[0].client.id == client.id
+        assert page.results[0].client.last_name == "Kowalski"
+
+    def test_suggest_matches_prefix(self, service, db_session: Session):
+        mechanic = create_mechanic(db_session)
+        client = create_client(db_session, mechanic)
+        vehicle = create_vehicle(db_session, client)
+        service.dispatch_outbox(db_session)
+
+        suggestions = asyncio.run(service.suggest("coro", mechanic.id))
+
+        assert [(s.type, s.id) for s in suggestions] == [("vehicle", vehicle.id)]
+
+    def test_multi_search_is_one_round_trip(self, service, db_session: Session, es: FakeElasticsearch):
+        mechanic = create_mechanic(db_session)
+        client = create_client(db_session, mechanic)
+        vehicle = create_vehicle(db_session, client)
+        service.dispatch_outbox(db_session)
+
+        pages = asyncio.run(service.multi_search([
+            SearchQuery(q="kowalski", type="client"),
+            SearchQuery(q="kowalski", type="vehicle"),
+            SearchQuery(kind="suggest", q="toy"),
+        ], mechanic.id))
+
+        assert [found(page) for page in pages] == [
+            [("client", client.id)], [("vehicle", vehicle.id)], [("vehicle", vehicle.id)],
+        ]
+        assert es.calls["msearch"] == 1
+        assert es.calls["search"] == 0
+
+    def test_multi_search_rejects_a_bad_query(self, service, db_session: Session, monkeypatch):
+        mechanic = create_mechanic(db_session)
+        create_client(db_session, mechanic)
+        service.dispatch_outbox(db_session)
+        send = service._timed_msearch
+
+        async def second_query_rejected(index, routing, bodies):
+            responses = await send(index, routing, bodies)
+            responses[1] = {"error": {"type": "parsing_exception", "reason": "bad query"}, "status": 400}
+            return responses
+
+        monkeypatch.setattr(service, "_timed_msearch", second_query_rejected)
+
+        with pytest.raises(ValueError, match="Search query 1 failed"):
+            asyncio.run(service.multi_search([SearchQuery(q="kowalski"), SearchQuery(q="nowak")], mechanic.id))
+
+
+# ============================================================================
+# RESILIENCE TESTS
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.integration
+class TestResilience:
+    """Tests for searching while Elasticsearch fails"""
+
+    def test_degraded_results_are_not_served_once_the_load_drops(self, service, db_session: Session,
+                                                                 clock: FakeClock, monkeypatch):
+        mechanic = create_mechanic(db_session)
+        for name in ("Anna", "Ewa", "Jan", "Adam", "Ola", "Piotr", "Zofia"):
+            create_client(db_session, mechanic, name=name, last_name="Nowak")
+        service.dispatch_outbox(db_session)
+        # A fresh cache, without the settle time that follows the writes above
+        monkeypatch.setattr(service, "_cache", SearchResultCache(100, ttl=30.0, clock=clock))
+        loaded = DegradationController(latency_threshold=0.1, max_in_flight=4, cooldown=10.0, clock=clock)
+        with loaded.track():
+            clock.now += 1.0
+        assert loaded.level == MINIMAL
+
+        monkeypatch.setattr(service, "_degradation", loaded)
+        degraded = search(service, "nowak", mechanic.id)
+        degraded_suggestions = asyncio.run(service.suggest("nowak", mechanic.id))
+        monkeypatch.setattr(service, "_degradation", DegradationController(0.1, 4, 10.0, clock=clock))
+        recovered = search(service, "nowak", mechanic.id)
+        recovered_suggestions = asyncio.run(service.suggest("nowak", mechanic.id))
+
+        assert len(degraded.results) == service.DEGRADED_PAGE_SIZE
+        assert len(recovered.results) == 7
+        assert len(degraded_suggestions) == service.DEGRADED_SUGGEST_SIZE
+        assert len(recovered_suggestions) == service.DEFAULT_SUGGEST_SIZE
+
+    def test_unavailable_elasticsearch_is_served_from_fallback(self, service, db_session: Session,
+                                                              es: FakeElasticsearch):
+        mechanic = create_mechanic(db_session)
+        client = create_client(db_session, mechanic)
+        service.dispatch_outbox(db_session)
+        es.fail(503, operations=["search"])
+
+        assert found(search(service, "kowalski", mechanic.id)) == [("client", client.id)]
+
+    def test_fallback_pages_keep_plate_shaped_text_as_text(self, service, db_session: Session,
+                                                           es: FakeElasticsearch):
+        mechanic = create_mechanic(db_session)
+        client = create_client(db_session, mechanic)
+        vehicles = [create_vehicle(db_session, client, mark="Audi", model="Q5 TFSI") for _ in range(3)]
+        service.dispatch_outbox(db_session)
+        es.fail(503, operations=["search"])
+
+        first = search(service, "Q5 TFSI", mechanic.id, size=2)
+        second = search(service, "Q5 TFSI", mechanic.id, size=2, cursor=first.next_cursor)
+
+        assert first.type_counts == {"client": 0, "vehicle": 3}
+        assert sorted(found(first) + found(second)) == [("vehicle", vehicle.id) for vehicle in vehicles]
+
+    def test_malformed_cursor_is_rejected_on_the_fallback(self, service, db_session: Session,
+                                                          es: FakeElasticsearch):
+        mechanic = create_mechanic(db_session)
+        create_client(db_session, mechanic)
+        service.dispatch_outbox(db_session)
+        es.fail(503, operations=["search"])
+
+        # ["x", "client", 1]
+        with pytest.raises(ValueError):
+            search(service, "kowalski", mechanic.id, cursor="WyJ4IiwiY2xpZW50IiwxXQ")
+
+    def test_open_circuit_stops_calling_elasticsearch(self, service, db_session: Session, es: FakeElasticsearch):
+        mechanic = create_mechanic(db_session)
+        client = create_client(db_session, mechanic)
+        service.dispatch_outbox(db_session)
+        es.fail(ConnectionError("down"), operations=["search"])
+
+        for _ in range(settings.SEARCH_BREAKER_FAILURE_THRESHOLD + 3):
+            page = search(service, "kowalski", mechanic.id)
+
+        assert found(page) == [("client", client.id)]
+        assert es.calls["search"] == settings.SEARCH_BREAKER_FAILURE_THRESHOLD
+
+    def test_fail_fast_mode_raises_while_open(self, service, db_session: Session, es: FakeElasticsearch,
+                                              monkeypatch):
+        monkeypatch.setattr(settings, "SEARCH_BREAKER_OPEN_MODE", "fail_fast")
+        mechanic = create_mechanic(db_session)
+        create_client(db_session, mechanic)
+        service.dispatch_outbox(db_session)
+        es.fail(ConnectionError("down"), operations=["search"])
+        for _ in range(settings.SEARCH_BREAKER_FAILURE_THRESHOLD):
+            search(service, "kowalski", mechanic.id)
+
+        with pytest.raises(CircuitOpenError):
+            search(service, "kowalski", mechanic.id)
+
+
+# ============================================================================
+# DELETE TESTS
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.integration
+class TestDeletes:
+    """Tests for removing deleted clients and vehicles from the index"""
+
+    def test_client_is_deleted_with_vehicles_and_stragglers(self, service, db_session: Session):
+        mechanic = create_mechanic(db_session)
+        client = create_client(db_session, mechanic)
+        vehicle = create_vehicle(db_session, client)
+        create_vehicle(db_session, client, mark="Opel", model="Astra")
+        service.dispatch_outbox(db_session)
+
+        # The straggler is not among the deleted vehicles, so only the delete_by_query removes it
+        service.delete_client_and_vehicles(client.id, mechanic.id, [vehicle.id])
+        service.stop_bulk_buffer()
+
+        assert found(search(service, "kowalski", mechanic.id)) == []
+        assert found(search(service, "astra", mechanic.id)) == []
+
+    def test_delete_does_not_call_elasticsearch_on_the_request_thread(self, service, db_session: Session,
+                                                                      es: FakeElasticsearch):
+        mechanic = create_mechanic(db_session)
+        client = create_client(db_session, mechanic)
+        vehicle = create_vehicle(db_session, client)
+        calls = sum(es.calls.values())
+
+        service.delete_vehicle_and_repairs(vehicle.id, mechanic.id)
+        service.delete_client_and_vehicles(client.id, mechanic.id, [])
+
+        assert sum(es.calls.values()) == calls
+
+    def test_failed_delete_is_retried_through_the_outbox(self, service, db_session: Session,
+                                                         es: FakeElasticsearch):
+        mechanic = create_mechanic(db_session)
+        client = create_client(db_session, mechanic)
+        vehicle = create_vehicle(db_session, client, mark="Opel", model="Astra")
+        service.dispatch_outbox(db_session)
+        db_session.delete(vehicle)
+        db_session.commit()
+        es.fail(ConnectionError("down"))
+
+        service.delete_vehicle_and_repairs(vehicle.id, mechanic.id)
+        service.stop_bulk_buffer()
+
+        row = db_session.query(SearchOutbox).one()
+        assert (row.entity_type, row.entity_id) == ("vehicle", vehicle.id)
+        es.heal()
+        service.dispatch_outbox(db_session)
+        assert es.count(index=service.INDEX_NAME, query={"ids": {"values": [f"vehicle-{vehicle.id}"]}})["count"] == 0